@@ -0,0 +1,24 @@
+"""
+Production ASGI entry point for core project.
+
+Works like ``core.asgi`` but imports the API modules and builds the URL resolver
+and serializer caches before the first request. Database connections are opened
+per worker thread, so only the main thread connection is prepared here.
+Point the ASGI server at ``core.asgi_production:application``.
+"""
+
+import os
+import time
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+started = time.perf_counter()
+application = get_asgi_application()
+
+from core.warmup import report, warm_up  # noqa: E402 (needs configured settings)
+
+warm_up()
+# time from importing this module until the application was ready
+report['startup_ms'] = round((time.perf_counter() - started) * 1000, 2)
@@ -0,0 +1,44 @@
+# standard bib imports
+import time
+from django.conf import settings
+from django.utils.text import compress_string
+
+# local imports
+from core import metrics
+
+
+def compress(content, max_random_bytes=100):
+    # gzip a body and record its size reduction and cpu cost
+    start = time.thread_time()
+    compressed = compress_string(content, max_random_bytes=max_random_bytes)
+    record(len(content), len(compressed), time.thread_time() - start)
+    return compressed
+
+
+def precompress(content):
+    # gzip a body once for caching (None when it is too small to be worth it)
+    if len(content) < settings.GZIP_MIN_LENGTH:
+        return None
+    compressed = compress(content)
+    return compressed if len(compressed) < len(content) else None
+
+
+def record(size, compressed_size, cpu_seconds):
+    # add one compression to the shared counters
+    metrics.incr_many({
+        'compression.responses': 1,
+        'compression.bytes_in': size,
+        'compression.bytes_out': compressed_size,
+        'compression.cpu_us': round(cpu_seconds * 1_000_000),
+    })
+
+
+def summary(counters):
+    # derive compression ratio and cpu time per compression from the counters
+    responses = counters.get('compression.responses', 0)
+    size = counters.get('compression.bytes_in', 0)
+    return {
+        'ratio': round(counters.get('compression.bytes_out', 0) / size, 4) if size else None,
+        'cpu_ms_per_response': round(counters.get('compression.cpu_us', 0) / responses / 1000, 3) if responses else None,
+        'precompressed_responses': counters.get('compression.precompressed', 0),
+    }
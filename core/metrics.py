@@ -0,0 +1,132 @@
+# standard bib imports
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteCounterStore:
+    # shares counters between worker processes through a local sqlite file
+
+    def __init__(self, path):
+        # remember the file path and keep one connection per thread
+        self.path = str(path)
+        self.local = threading.local()
+
+    def connection(self):
+        # open (and prepare) the connection of the current thread on first use
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            self.local.conn = conn
+        return conn
+
+    def add(self, amounts):
+        # add name -> amount to the counters in one transaction (the upsert creates missing counters)
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT INTO counters (name, value) VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+                amounts.items()
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def values(self):
+        # return all counters as a name -> value mapping
+        return dict(self.connection().execute('SELECT name, value FROM counters ORDER BY name'))
+
+
+# one store per process, created lazily
+_store = None
+
+
+def get_counter_store():
+    # return the process wide counter store (a new one when the configured path changed)
+    global _store
+    if _store is None or _store.path != str(settings.METRICS_STORE_PATH):
+        _store = SQLiteCounterStore(settings.METRICS_STORE_PATH)
+    return _store
+
+
+class CounterBuffer:
+    # sums increments in process memory and writes them to the store in one transaction per interval
+
+    def __init__(self, interval):
+        # define the flush interval and the shared state
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.thread = None
+
+    def add(self, amounts):
+        # add name -> amount to the pending increments (no i/o on the request path)
+        with self.lock:
+            self.pending.update(amounts)
+            self.start_timer()
+
+    def start_timer(self):
+        # start the background thread flushing every interval (lock is held)
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name='metrics-flush', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        # flush periodically for as long as the process lives
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        # write the pending increments, keeping them for the next attempt when the store is busy
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+        if not pending:
+            return
+        try:
+            get_counter_store().add(pending)
+        except sqlite3.OperationalError:
+            logger.warning('Metrics store busy, keeping %d counter(s) buffered.', len(pending))
+            with self.lock:
+                self.pending.update(pending)
+
+
+# one buffer per process
+buffer = CounterBuffer(settings.METRICS_FLUSH_INTERVAL)
+# write whatever is left when the process shuts down
+atexit.register(buffer.flush)
+
+
+def incr(name, amount=1):
+    # add amount to a counter, creating it on first use
+    buffer.add({name: amount})
+
+
+def incr_many(amounts):
+    # add several name -> amount increments at once
+    buffer.add(amounts)
+
+
+def snapshot():
+    # return all known counters as a name -> value mapping (other processes lag by up to one flush interval)
+    buffer.flush()
+    return get_counter_store().values()
+
+
+def ratio(counters, prefix):
+    # return hits / (hits + misses) for a counter prefix, or None without traffic
+    hits = counters.get(f'{prefix}.hits', 0)
+    total = hits + counters.get(f'{prefix}.misses', 0)
+    return round(hits / total, 4) if total else None
@@ -0,0 +1,154 @@
+# standard bib imports
+import cProfile
+import random
+import threading
+import time
+from contextlib import ExitStack
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import JsonResponse
+from django.middleware.gzip import GZipMiddleware, re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+
+# local imports
+from core import compression, metrics
+from core.nplusone import detect_n_plus_one
+from core.profiling import QueryCounter, get_profile_store
+
+
+class ConcurrencyLimitMiddleware:
+    # sheds load with 503 once too many requests are in flight in this process
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        # read the limits once at startup
+        self.get_response = get_response
+        self.retry_after = getattr(settings, 'CONCURRENCY_RETRY_AFTER', 1)
+        self.slots = threading.BoundedSemaphore(getattr(settings, 'MAX_CONCURRENT_REQUESTS', 64))
+        # stay async under ASGI so async views are not pushed into a thread
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def busy_response(self):
+        # build the 503 response asking the client to retry later
+        response = JsonResponse({'error': 'Server is busy, please retry later.'}, status=503)
+        response['Retry-After'] = str(self.retry_after)
+        return response
+
+    def __call__(self, request):
+        # dispatch to the async variant when running under ASGI
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # reject immediately instead of queueing when no slot is free
+        if not self.slots.acquire(blocking=False):
+            return self.busy_response()
+        try:
+            return self.get_response(request)
+        finally:
+            self.slots.release()
+
+    async def __acall__(self, request):
+        # async variant of __call__
+        if not self.slots.acquire(blocking=False):
+            return self.busy_response()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.slots.release()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    # gzips responses above GZIP_MIN_LENGTH and serves bodies that views compressed ahead of time
+
+    def process_response(self, request, response):
+        # leave streaming, small and already encoded responses alone
+        if response.streaming or response.has_header('Content-Encoding'):
+            return super().process_response(request, response)
+        if len(response.content) < settings.GZIP_MIN_LENGTH:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return response
+        # reuse the cached gzip body when the view attached one
+        compressed = getattr(response, 'gzip_content', None)
+        if compressed is not None:
+            metrics.incr('compression.precompressed')
+        else:
+            compressed = compression.compress(response.content, self.max_random_bytes)
+            if len(compressed) >= len(response.content):
+                return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # a strong etag no longer matches the encoded bytes
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+
+class NPlusOneMiddleware:
+    # reports query templates that run more than NPLUSONE_THRESHOLD times in one request (development and staging)
+
+    def __init__(self, get_response):
+        # stay out of the middleware chain unless a mode is configured
+        if not getattr(settings, 'NPLUSONE_MODE', None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.mode = settings.NPLUSONE_MODE
+        self.threshold = settings.NPLUSONE_THRESHOLD
+
+    def __call__(self, request):
+        # count the queries of the request and report repeats when it is done
+        with detect_n_plus_one(self.threshold, self.mode, f'{request.method} {request.path}'):
+            return self.get_response(request)
+
+
+class SamplingProfilerMiddleware:
+    # profiles a sample of requests with cProfile and keeps the dumps of slow ones
+
+    def __init__(self, get_response):
+        # stay out of the middleware chain unless sampling is enabled
+        if not getattr(settings, 'PROFILE_SAMPLE_RATE', 0):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILE_SAMPLE_RATE
+        self.slow_ms = settings.PROFILE_SLOW_MS
+        self.store = get_profile_store()
+
+    def __call__(self, request):
+        # let unsampled requests through untouched
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is already active in this thread
+            return self.get_response(request)
+        queries = QueryCounter()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.get_response(request)
+        finally:
+            profiler.disable()
+        duration_ms = (time.perf_counter() - start) * 1000
+        # keep only requests slower than the threshold
+        if duration_ms >= self.slow_ms:
+            match = getattr(request, 'resolver_match', None)
+            self.store.save(profiler, {
+                'url_name': match.view_name if match else None,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(duration_ms, 1),
+                'queries': queries.count,
+                'created_at': time.time(),
+            })
+        return response
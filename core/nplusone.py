@@ -0,0 +1,102 @@
+# standard bib imports
+import logging
+import re
+import traceback
+import warnings
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# patterns that turn a concrete statement into a template
+LITERAL_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+# path fragments of frames that never count as the cause of a query
+LIBRARY_PATHS = ('site-packages', 'dist-packages', '/django/', '/rest_framework/', __file__)
+
+
+class NPlusOneWarning(UserWarning):
+    # emitted in warn mode
+    pass
+
+
+class NPlusOneError(Exception):
+    # raised in raise mode
+    pass
+
+
+def normalize_sql(sql):
+    # replace literals and placeholders so repeated lookups share one template
+    for pattern, replacement in LITERAL_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def project_stack():
+    # return the frames of our own code that led to the current query, innermost last
+    base = str(settings.BASE_DIR)
+    return [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base) and not any(part in frame.filename for part in LIBRARY_PATHS)
+    ]
+
+
+class QueryTemplateCounter:
+    # counts query templates and keeps the stack of the first repeat above the threshold
+
+    def __init__(self, threshold):
+        # remember the threshold and start with empty counts
+        self.threshold = threshold
+        self.counts = {}
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper hook: count the statement, then run it
+        template = normalize_sql(sql)
+        count = self.counts.get(template, 0) + 1
+        self.counts[template] = count
+        if count == self.threshold + 1:
+            self.stacks[template] = project_stack()
+        return execute(sql, params, many, context)
+
+    def offenders(self):
+        # return (template, count, stack) for every template over the threshold
+        return [(template, self.counts[template], stack) for template, stack in self.stacks.items()]
+
+    def report(self, label=''):
+        # describe all offenders with the project lines that issued the repeated query
+        lines = []
+        for template, count, stack in self.offenders():
+            lines.append(f'N+1 query{f" in {label}" if label else ""}: {count} x {template}')
+            lines.extend(f'  {frame.filename}:{frame.lineno} in {frame.name}: {frame.line}' for frame in stack[-5:])
+        return '\n'.join(lines)
+
+
+def handle(counter, mode, label=''):
+    # log, warn or raise depending on the configured mode
+    if not counter.offenders():
+        return
+    message = counter.report(label)
+    if mode == 'raise':
+        raise NPlusOneError(message)
+    if mode == 'warn':
+        warnings.warn(message, NPlusOneWarning, stacklevel=2)
+    else:
+        logger.warning(message)
+
+
+@contextmanager
+def detect_n_plus_one(threshold=None, mode='raise', label=''):
+    # count query templates on every database connection inside the block (for tests and scripts)
+    counter = QueryTemplateCounter(threshold or settings.NPLUSONE_THRESHOLD)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(counter))
+        yield counter
+    handle(counter, mode, label)
@@ -0,0 +1,76 @@
+# standard bib imports
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from django.conf import settings
+
+
+class QueryCounter:
+    # execute_wrapper hook counting the queries of a profiled request
+
+    def __init__(self):
+        # start at zero
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # count the statement, then run it
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class ProfileStore:
+    # keeps pstats dumps and their metadata in a directory, deleting the oldest above a size cap
+
+    def __init__(self, directory, max_bytes):
+        # remember where dumps go and how much space they may use
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def save(self, profiler, meta):
+        # write the stats and the metadata next to each other, then enforce the size cap
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(self.directory / f'{name}.prof')
+        meta = {'name': name, **meta}
+        (self.directory / f'{name}.json').write_text(json.dumps(meta))
+        self.rotate()
+        return meta
+
+    def rotate(self):
+        # delete the oldest dumps until the directory fits into max_bytes (the newest one always stays)
+        files = sorted(self.directory.glob('*.prof'), key=lambda path: path.stat().st_mtime)
+        total = sum(path.stat().st_size for path in files)
+        while len(files) > 1 and total > self.max_bytes:
+            oldest = files.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink(missing_ok=True)
+            oldest.with_suffix('.json').unlink(missing_ok=True)
+
+    def list(self):
+        # return the metadata of all stored dumps, newest first
+        if not self.directory.exists():
+            return []
+        entries = []
+        for path in self.directory.glob('*.json'):
+            try:
+                meta = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            prof = path.with_suffix('.prof')
+            if prof.exists():
+                entries.append({**meta, 'size': prof.stat().st_size})
+        return sorted(entries, key=lambda meta: meta['created_at'], reverse=True)
+
+    def path(self, name):
+        # return the dump file of a name (None for unknown or unsafe names)
+        if os.path.basename(name) != name:
+            return None
+        path = self.directory / f'{name}.prof'
+        return path if path.exists() else None
+
+
+def get_profile_store():
+    # return the store configured in the settings
+    return ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_BYTES)
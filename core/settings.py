@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,6 +52,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,8 +60,30 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.ConcurrencyLimitMiddleware',
+    'kanmind_app.middleware.ShardRoutingMiddleware',
+    'core.middleware.NPlusOneMiddleware',
+    'core.middleware.SamplingProfilerMiddleware',
 ]
 
+# maximum number of requests handled at the same time per worker process
+MAX_CONCURRENT_REQUESTS = 64
+# seconds a client is asked to wait when a request is shed
+CONCURRENCY_RETRY_AFTER = 1
+# report queries repeated more than NPLUSONE_THRESHOLD times per request: None (off), 'log', 'warn' or 'raise'
+NPLUSONE_MODE = None
+NPLUSONE_THRESHOLD = 5
+# share of requests profiled with cProfile (0 disables the profiler middleware)
+PROFILE_SAMPLE_RATE = 0
+# profiled requests at least this slow are kept in PROFILE_DIR, oldest dumps go once PROFILE_MAX_BYTES is exceeded
+PROFILE_SLOW_MS = 500
+PROFILE_DIR = BASE_DIR / 'profiles'
+PROFILE_MAX_BYTES = 50 * 1024 * 1024
+# responses smaller than this many bytes are sent uncompressed
+GZIP_MIN_LENGTH = 1024
+# maximum number of sub-requests accepted by /api/batch/
+BATCH_MAX_REQUESTS = 20
+
 
 CSRF_TRUSTED_ORIGINS = [
     'http://127.0.0.1:5500',
@@ -71,6 +95,11 @@ CORS_ALLOWED_ORIGINS = [
     'http://localhost:5500',
 ]
 
+# lets the frontend read the pagination cursors of comment threads
+CORS_EXPOSE_HEADERS = [
+    'Link',
+]
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -98,9 +127,51 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # keep connections open between requests (opened at startup by core.wsgi_production)
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# databases holding boards and everything below them, by shard number (empty or one entry = no sharding)
+# users and tokens stay in default and are copied to the other shards (see kanmind_app/signals.py)
+BOARD_SHARDS = []
+# ids created on shard n start at n << BOARD_SHARD_ID_BITS, so every id tells its shard
+BOARD_SHARD_ID_BITS = 40
+# local testing: KANMIND_SHARDS=3 adds two sqlite shards next to db.sqlite3 (prepare them with init_board_shards)
+# the test suite runs with core.settings_test, which always adds shard_1 for the shard tests
+SHARD_COUNT = int(os.environ.get('KANMIND_SHARDS', '1'))
+for number in range(1, SHARD_COUNT):
+    DATABASES[f'shard_{number}'] = {**DATABASES['default'], 'NAME': BASE_DIR / f'db_shard_{number}.sqlite3'}
+if SHARD_COUNT > 1:
+    BOARD_SHARDS = list(DATABASES)
+# test databases are files instead of shared memory so threaded tests can write to them at the same time
+for database in DATABASES.values():
+    database['TEST'] = {'NAME': BASE_DIR / f'test_{database["NAME"].name}'}
+
+DATABASE_ROUTERS = ['kanmind_app.routers.BoardShardRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# the file based cache is shared by all worker processes on a host; LocMemCache
+# ('django.core.cache.backends.locmem.LocMemCache') is enough for a single process
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    }
+}
+
+# cache alias and lifetime (seconds) of serialized board responses
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+# sqlite file shared by all worker processes for the metric counters
+METRICS_STORE_PATH = BASE_DIR / 'metrics.sqlite3'
+# seconds metric increments are summed in process memory before they are written to the store
+METRICS_FLUSH_INTERVAL = 1.0
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -121,6 +192,26 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# the first hasher is used for new hashes; stored hashes made with another hasher or
+# another iteration count are rehashed on the next successful login. only hashers whose
+# libraries are installed are listed (Argon2 and BCrypt need argon2-cffi and bcrypt)
+
+PASSWORD_HASHERS = [
+    'user_auth_app.hashers.PolicyPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# PBKDF2 iterations of new hashes (None uses Django's default)
+PASSWORD_HASH_ITERATIONS = None
+# threads hashing passwords for the async login/registration (None uses the cpu count)
+PASSWORD_HASH_WORKERS = None
+# hashing jobs allowed to queue before the async views answer 503
+PASSWORD_HASH_MAX_PENDING = 64
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -151,4 +242,38 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-}
\ No newline at end of file
+    # token bucket sizes per scope (bucket refills over the period)
+    'DEFAULT_THROTTLE_RATES': {
+        'board-read': '120/min',
+        'task-write': '60/min',
+        'login': '10/min',
+    },
+}
+
+# sqlite file shared by all worker processes for the throttle buckets
+THROTTLE_STORE_PATH = BASE_DIR / 'throttle.sqlite3'
+
+# done tasks untouched for this many days are moved to the archive tables
+TASK_ARCHIVE_AFTER_DAYS = 90
+
+# columns whose position keys grow longer than this are renumbered
+TASK_POSITION_MAX_LENGTH = 64
+
+# characters of task descriptions and comments returned by list endpoints with ?mode=list
+TEXT_PREVIEW_LENGTH = 200
+
+# number of users returned by /api/users/search/
+USER_SEARCH_MAX_RESULTS = 10
+# recent search prefixes cached per user, users cached per process and seconds a result stays valid
+USER_SEARCH_CACHE_SIZE = 32
+USER_SEARCH_CACHE_USERS = 1000
+USER_SEARCH_CACHE_TTL = 30
+
+# activity events are written in batches once this many are buffered ...
+ACTIVITY_BUFFER_SIZE = 100
+# ... or at the latest after this many seconds
+ACTIVITY_FLUSH_INTERVAL = 2.0
+
+# days returned by /api/boards/<id>/metrics/ without a range and the longest range allowed
+FLOW_METRICS_DEFAULT_DAYS = 30
+FLOW_METRICS_MAX_DAYS = 366
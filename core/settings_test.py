@@ -0,0 +1,17 @@
+"""
+Django settings for running the test suite:
+
+    python manage.py test --settings=core.settings_test
+
+Adds a second database for the shard tests (they enable sharding with override_settings).
+"""
+
+from core.settings import *  # noqa: F401,F403
+
+# the shard tests need a second board database even when KANMIND_SHARDS is not set
+if 'shard_1' not in DATABASES:
+    DATABASES['shard_1'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / 'db_shard_1.sqlite3',
+        'TEST': {'NAME': BASE_DIR / 'test_db_shard_1.sqlite3'},
+    }
@@ -0,0 +1,129 @@
+# standard bib imports
+import random
+import sqlite3
+import threading
+import time
+from django.conf import settings
+
+# third party imports
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SQLiteBucketStore:
+    # shares token buckets between worker processes through a local sqlite file
+
+    def __init__(self, path):
+        # remember the file path and keep one connection per thread
+        self.path = str(path)
+        self.local = threading.local()
+
+    def connection(self):
+        # open (and prepare) the connection of the current thread on first use
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+            )
+            self.local.conn = conn
+        return conn
+
+    def take(self, key, capacity, refill_rate, now):
+        # refill the bucket for the elapsed time and try to take one token atomically
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            conn.execute(
+                'INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, tokens
+
+    def purge(self, older_than):
+        # drop buckets that have been idle long enough to be full again
+        self.connection().execute('DELETE FROM buckets WHERE updated < ?', (older_than,))
+
+
+# one store per process, created lazily
+_store = None
+
+
+def get_bucket_store():
+    # return the process wide bucket store (a new one when the configured path changed)
+    global _store
+    if _store is None or _store.path != str(settings.THROTTLE_STORE_PATH):
+        _store = SQLiteBucketStore(settings.THROTTLE_STORE_PATH)
+    return _store
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    # restrict the throttle to these http methods (None means all methods)
+    methods = None
+    # chance per request to purge idle buckets from the store
+    purge_probability = 0.001
+
+    def get_cache_key(self, request, view):
+        # key on the auth token when present, then on the user, then on the client address
+        token = getattr(getattr(request, 'auth', None), 'key', None)
+        if token:
+            ident = f'token:{token}'
+        elif hasattr(request, 'auth') and request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return f'{self.scope}:{ident}'
+
+    def allow_request(self, request, view):
+        # skip requests this throttle does not cover
+        if self.rate is None or (self.methods and request.method not in self.methods):
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        # a full bucket holds num_requests tokens and refills over duration seconds
+        self.refill_rate = self.num_requests / self.duration
+        now = time.time()
+        store = get_bucket_store()
+        try:
+            allowed, self.tokens = store.take(self.key, self.num_requests, self.refill_rate, now)
+            if random.random() < self.purge_probability:
+                store.purge(now - self.duration)
+        except sqlite3.OperationalError:
+            # never fail requests because the throttle store is busy
+            return True
+        return allowed
+
+    def wait(self):
+        # seconds until the next token is available
+        return max(0.0, (1 - self.tokens) / self.refill_rate)
+
+
+class BoardReadThrottle(TokenBucketThrottle):
+    # limits board list and board detail reads
+    scope = 'board-read'
+    methods = ('GET', 'HEAD')
+
+
+class TaskWriteThrottle(TokenBucketThrottle):
+    # limits task and comment writes
+    scope = 'task-write'
+    methods = ('POST', 'PATCH', 'PUT', 'DELETE')
+
+
+class LoginThrottle(TokenBucketThrottle):
+    # limits login and registration attempts per client address
+    scope = 'login'
+    methods = ('POST',)
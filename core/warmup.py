@@ -0,0 +1,89 @@
+# standard bib imports
+import importlib
+import inspect
+import logging
+import time
+from django.db import connections
+from django.urls import get_resolver, URLPattern, URLResolver
+
+# third party imports
+from rest_framework.serializers import BaseSerializer
+
+logger = logging.getLogger(__name__)
+
+# modules imported ahead of the first request (views pull in serializers, permissions etc.)
+PRELOAD_MODULES = [
+    'rest_framework.views',
+    'rest_framework.authtoken.views',
+    'kanmind_app.api.serializers',
+    'kanmind_app.api.views',
+    'user_auth_app.api.serializers',
+    'user_auth_app.api.views',
+]
+# modules whose serializer classes get their fields built once
+SERIALIZER_MODULES = [
+    'kanmind_app.api.serializers',
+    'user_auth_app.api.serializers',
+]
+
+# timings of the last warm up, in milliseconds
+report = {}
+
+
+def import_modules():
+    # import the preload modules and time each one
+    timings = {}
+    for name in PRELOAD_MODULES:
+        start = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+    return timings
+
+
+def resolve_routes():
+    # build the url resolver caches and count every route
+    resolver = get_resolver()
+    resolver.reverse_dict
+    count = 0
+    pending = [resolver]
+    while pending:
+        current = pending.pop()
+        for pattern in current.url_patterns:
+            if isinstance(pattern, URLResolver):
+                pending.append(pattern)
+                pattern.reverse_dict
+            elif isinstance(pattern, URLPattern):
+                count += 1
+    return count
+
+
+def build_serializer_fields():
+    # instantiate every serializer and build its fields once (fills model meta and field mapping caches)
+    count = 0
+    for name in SERIALIZER_MODULES:
+        for _, cls in inspect.getmembers(importlib.import_module(name), inspect.isclass):
+            if issubclass(cls, BaseSerializer) and cls.__module__ == name:
+                cls().fields
+                count += 1
+    return count
+
+
+def open_connections():
+    # open the database connections (kept alive through CONN_MAX_AGE)
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def warm_up():
+    # run all warm up steps and record how long each one took
+    start = time.perf_counter()
+    report['imports'] = import_modules()
+    steps = [('routes', resolve_routes), ('serializers', build_serializer_fields), ('connections', open_connections)]
+    for name, step in steps:
+        step_start = time.perf_counter()
+        count = step()
+        report[name] = {'count': count, 'ms': round((time.perf_counter() - step_start) * 1000, 2)}
+    report['total_ms'] = round((time.perf_counter() - start) * 1000, 2)
+    logger.info('Warm up finished in %.1f ms: %s', report['total_ms'], report)
+    return report
@@ -0,0 +1,23 @@
+"""
+Production WSGI entry point for core project.
+
+Works like ``core.wsgi`` but imports the API modules, builds the URL resolver and
+serializer caches and opens the database connection before the first request.
+Point the WSGI server at ``core.wsgi_production:application``.
+"""
+
+import os
+import time
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+started = time.perf_counter()
+application = get_wsgi_application()
+
+from core.warmup import report, warm_up  # noqa: E402 (needs configured settings)
+
+warm_up()
+# time from importing this module until the application was ready
+report['startup_ms'] = round((time.perf_counter() - started) * 1000, 2)
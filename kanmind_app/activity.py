@@ -0,0 +1,104 @@
+# standard bib imports
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.utils import timezone
+
+# local imports
+from kanmind_app import sharding
+from kanmind_app.models import Boards, ActivityLog
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityBuffer:
+    # collects activity events in memory and writes them with bulk_create
+
+    def __init__(self, max_size, interval):
+        # define flush thresholds and the shared state
+        self.max_size = max_size
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.events = []
+        self.thread = None
+
+    def record(self, board_id, verb, user=None, task_id=None, **payload):
+        # queue an event once the surrounding transaction commits
+        event = ActivityLog(
+            board_id=board_id,
+            task_id=task_id,
+            user=user if user is not None and user.is_authenticated else None,
+            verb=verb,
+            payload=payload,
+            created_at=timezone.now()
+        )
+        sharding.on_commit(lambda: self.append(event))
+
+    def append(self, event):
+        # add a committed event and flush when the buffer is full
+        with self.lock:
+            self.events.append(event)
+            full = len(self.events) >= self.max_size
+            self.start_timer()
+        if full:
+            self.flush()
+
+    def start_timer(self):
+        # start the background thread flushing on the time threshold (lock is held)
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.run, name='activity-flush', daemon=True)
+            self.thread.start()
+
+    def run(self):
+        # flush periodically for as long as the process lives
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self):
+        # write all buffered events, keeping them for the next attempt on errors
+        with self.lock:
+            events, self.events = self.events, []
+        if not events:
+            return 0
+        # write the events of each board shard to that shard
+        by_shard = {}
+        for event in events:
+            by_shard.setdefault(sharding.shard_for_id(event.board_id), []).append(event)
+        written = 0
+        for alias, shard_events in by_shard.items():
+            written += self.write(alias, shard_events)
+        return written
+
+    def write(self, alias, events):
+        # bulk insert events into one database, keeping them for the next attempt on errors
+        try:
+            try:
+                with transaction.atomic(using=alias):
+                    ActivityLog.objects.using(alias).bulk_create(events, batch_size=500)
+            except IntegrityError:
+                # drop events of boards that were deleted in the meantime
+                existing = set(Boards.all_objects.using(alias).filter(id__in={e.board_id for e in events}).values_list('id', flat=True))
+                events = [e for e in events if e.board_id in existing]
+                with transaction.atomic(using=alias):
+                    ActivityLog.objects.using(alias).bulk_create(events, batch_size=500)
+        except DatabaseError:
+            logger.exception('Could not write %d activity event(s), keeping them buffered.', len(events))
+            with self.lock:
+                self.events = events + self.events
+            return 0
+        return len(events)
+
+
+# one buffer per process
+buffer = ActivityBuffer(settings.ACTIVITY_BUFFER_SIZE, settings.ACTIVITY_FLUSH_INTERVAL)
+# write whatever is left when the process shuts down
+atexit.register(buffer.flush)
+
+
+def record(board_id, verb, user=None, task_id=None, **payload):
+    # record an activity event through the process buffer
+    buffer.record(board_id, verb, user=user, task_id=task_id, **payload)
@@ -0,0 +1,113 @@
+# standard bib imports
+import json
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+
+# third party imports
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+# local imports
+from core import metrics
+from core.compression import precompress
+from kanmind_app import sharding
+
+# version keys: one per board and one per user's set of boards
+BOARD_VERSION_KEY = 'board-version:{}'
+USER_BOARDS_VERSION_KEY = 'user-boards-version:{}'
+
+
+def get_response_cache():
+    # return the cache configured for serialized responses
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def get_version(key):
+    # read a version, creating a fresh random one if it is missing or was evicted
+    cache = get_response_cache()
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def board_detail_key(board_id, variant=''):
+    # build the cache key of a board detail payload (variant) for the current board version
+    return f'board-detail-rendered:{board_id}:{variant}:{get_version(BOARD_VERSION_KEY.format(board_id))}'
+
+
+def board_list_key(user_id):
+    # build the cache key of a user's board list for the current board-set version
+    return f'board-list:{user_id}:{get_version(USER_BOARDS_VERSION_KEY.format(user_id))}'
+
+
+def get_cached(name, key):
+    # fetch a cached payload and count the hit or miss
+    payload = get_response_cache().get(key)
+    metrics.incr(f'response_cache.{name}.{"hits" if payload is not None else "misses"}')
+    return payload
+
+
+def set_cached(key, payload):
+    # store a payload under a versioned key
+    get_response_cache().set(key, payload, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def bump_versions(board_ids=(), user_ids=()):
+    # replace the versions after commit so readers never cache data of an uncommitted write
+    keys = [BOARD_VERSION_KEY.format(board_id) for board_id in board_ids]
+    keys += [USER_BOARDS_VERSION_KEY.format(user_id) for user_id in set(user_ids)]
+    if keys:
+        # random versions cannot collide with entries written under an older version
+        sharding.on_commit(lambda: get_response_cache().set_many({key: uuid.uuid4().hex for key in keys}, None))
+
+
+def board_user_ids(board):
+    # return the ids of everybody whose board list shows the board
+    return [board.owner_id, *board.members.values_list('id', flat=True)]
+
+
+def invalidate_board(board, user_ids=None):
+    # bump the board version and the board-set version of its owner and members
+    bump_versions([board.id], board_user_ids(board) if user_ids is None else user_ids)
+
+
+def render_payload(data):
+    # render a payload to json once and gzip it, so cache hits skip both steps
+    content = JSONRenderer().render(data)
+    return {'json': content, 'gzip': precompress(content)}
+
+
+class RenderedResponse(Response):
+    # a response serving json rendered (and possibly gzipped) by render_payload
+
+    def __init__(self, rendered, **kwargs):
+        # keep the rendered bodies; data is only parsed when someone reads it
+        self.rendered_json = rendered['json']
+        self.gzip_content = rendered['gzip']
+        self._data = None
+        super().__init__(None, **kwargs)
+
+    @property
+    def data(self):
+        # parse the json body on demand (batched requests and the browsable api need it)
+        if self._data is None:
+            self._data = json.loads(self.rendered_json)
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        # ignore the None passed by Response.__init__
+        if value is not None:
+            self._data = value
+
+    @property
+    def rendered_content(self):
+        # hand out the stored bytes to json clients, render normally for anything else
+        if isinstance(self.accepted_renderer, JSONRenderer):
+            self['Content-Type'] = 'application/json'
+            return self.rendered_json
+        self.gzip_content = None
+        return super().rendered_content
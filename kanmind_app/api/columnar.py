@@ -0,0 +1,55 @@
+# standard bib imports
+from django.contrib.auth.models import User
+
+# local imports
+from kanmind_app.models import Tasks
+
+# task columns read with values_list and the names they are returned under
+TASK_COLUMNS = {
+    'id': 'id',
+    'board_id': 'board',
+    'title': 'title',
+    'description': 'description',
+    'status': 'status',
+    'priority': 'priority',
+    'assignee_id': 'assignee',
+    'reviewer_id': 'reviewer',
+    'due_date': 'due_date',
+    'comments_count': 'comments_count',
+    'position': 'position',
+    'version': 'version',
+}
+# columns sent as indexes into a list of their possible values
+DICTIONARY_COLUMNS = {'status': Tasks.STATUS_CHOICES, 'priority': Tasks.PRIORITY_CHOICES}
+
+
+def encode_tasks(querysets):
+    # encode the tasks of all querysets as one array per field (rows are read as tuples, no model instances)
+    rows = []
+    for queryset in querysets:
+        rows += queryset.values_list(*TASK_COLUMNS)
+    columns = [list(values) for values in zip(*rows)] if rows else [[] for _ in TASK_COLUMNS]
+    data = dict(zip(TASK_COLUMNS.values(), columns))
+    # replace repeated strings by their index in the choices
+    choices = {}
+    for name, options in DICTIONARY_COLUMNS.items():
+        values = [value for value, _ in options]
+        codes = {value: index for index, value in enumerate(values)}
+        data[name] = [codes[value] for value in data[name]]
+        choices[name] = values
+    return {
+        'count': len(rows),
+        'columns': data,
+        'choices': choices,
+        'users': encode_users(set(data['assignee']) | set(data['reviewer'])),
+    }
+
+
+def encode_users(user_ids):
+    # encode the referenced users once, also column by column
+    rows = list(User.objects.filter(id__in=user_ids - {None}).order_by('id').values_list('id', 'email', 'first_name', 'last_name'))
+    return {
+        'id': [row[0] for row in rows],
+        'email': [row[1] for row in rows],
+        'fullname': [f'{row[2]} {row[3]}'.strip() for row in rows],
+    }
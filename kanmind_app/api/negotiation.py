@@ -0,0 +1,23 @@
+# third party imports
+from rest_framework.negotiation import DefaultContentNegotiation
+
+
+class PayloadFormatNegotiation(DefaultContentNegotiation):
+    # lets ?format= name a payload shape of the view instead of a renderer
+    payload_formats = ()
+
+    def filter_renderers(self, renderers, format):
+        # payload shapes are rendered by whatever the Accept header selects
+        if format in self.payload_formats:
+            return renderers
+        return super().filter_renderers(renderers, format)
+
+
+class NormalizedFormatNegotiation(PayloadFormatNegotiation):
+    # board detail with users side-loaded once
+    payload_formats = ('normalized',)
+
+
+class ColumnarFormatNegotiation(PayloadFormatNegotiation):
+    # task lists encoded as one array per field
+    payload_formats = ('columnar',)
@@ -0,0 +1,177 @@
+# standard bib imports
+import base64
+from datetime import datetime
+from django.db.models import Q, F
+
+# third party imports
+from rest_framework.pagination import BasePagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class KeysetPagination(BasePagination):
+    # define default and maximum number of items per page
+    page_size = 50
+    max_page_size = 200
+    # define query parameter names
+    limit_query_param = 'limit'
+    before_query_param = 'before'
+    after_query_param = 'after'
+    # define the two keyset columns (timestamp first, unique id as tie breaker)
+    timestamp_field = 'created_at'
+    id_field = 'id'
+    # list newest items first
+    descending = False
+
+    def encode_cursor(self, obj):
+        # build an opaque cursor from the timestamp and id of an object
+        raw = f"{getattr(obj, self.timestamp_field).isoformat()}|{getattr(obj, self.id_field)}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        # restore padding and split the cursor back into timestamp and id
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            timestamp, pk = raw.split('|', 1)
+            return datetime.fromisoformat(timestamp), int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({'error': 'Invalid cursor.'})
+
+    def get_limit(self, request):
+        # read the page size from the query parameters and clamp it
+        limit = request.query_params.get(self.limit_query_param)
+        if limit is None:
+            return self.page_size
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({'error': 'Limit must be an integer.'})
+        if limit < 1:
+            raise ValidationError({'error': 'Limit must be positive.'})
+        return min(limit, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # page through a single queryset
+        return self.paginate_querysets([queryset], request, view)
+
+    def paginate_querysets(self, querysets, request, view=None):
+        # page through several querysets (one per board shard) as if they were one
+        # remember request for building links
+        self.request = request
+        self.limit = self.get_limit(request)
+        before = request.query_params.get(self.before_query_param)
+        after = request.query_params.get(self.after_query_param)
+        if before and after:
+            raise ValidationError({'error': f'Use either {self.before_query_param} or {self.after_query_param}, not both.'})
+        ts, pk = self.timestamp_field, self.id_field
+        # define lookups and ordering of the forward and backward directions
+        forward, backward = ('lt', 'gt') if self.descending else ('gt', 'lt')
+        forward_order = [f'-{ts}', f'-{pk}'] if self.descending else [ts, pk]
+        backward_order = [ts, pk] if self.descending else [f'-{ts}', f'-{pk}']
+        if before:
+            # walk backwards from the cursor and flip the page afterwards
+            cursor_ts, cursor_id = self.decode_cursor(before)
+            cursor_filter = Q(**{f'{ts}__{backward}': cursor_ts}) | Q(**{ts: cursor_ts, f'{pk}__{backward}': cursor_id})
+            order = backward_order
+        else:
+            cursor_filter = Q()
+            if after:
+                # continue forwards from the cursor
+                cursor_ts, cursor_id = self.decode_cursor(after)
+                cursor_filter = Q(**{f'{ts}__{forward}': cursor_ts}) | Q(**{ts: cursor_ts, f'{pk}__{forward}': cursor_id})
+            order = forward_order
+        # fetch one extra row to find out whether another page exists
+        rows = []
+        for queryset in querysets:
+            rows.extend(queryset.filter(cursor_filter).order_by(*order)[:self.limit + 1])
+        if len(querysets) > 1:
+            # merge the pages of the querysets in the same order
+            rows.sort(key=lambda obj: (getattr(obj, ts), getattr(obj, pk)), reverse=order[0].startswith('-'))
+            rows = rows[:self.limit + 1]
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+        if before:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = bool(after), has_more
+        self.page = rows
+        return rows
+
+    def get_link(self, param, cursor):
+        # build a url pointing to the neighbouring page
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.before_query_param)
+        url = remove_query_param(url, self.after_query_param)
+        return replace_query_param(url, param, cursor)
+
+    def get_paginated_response(self, data):
+        # keep the plain list body and expose cursors through the link header
+        links = []
+        if self.page and self.has_next:
+            links.append(f'<{self.get_link(self.after_query_param, self.encode_cursor(self.page[-1]))}>; rel="next"')
+        if self.page and self.has_previous:
+            links.append(f'<{self.get_link(self.before_query_param, self.encode_cursor(self.page[0]))}>; rel="prev"')
+        headers = {'Link': ', '.join(links)} if links else None
+        return Response(data, headers=headers)
+
+
+class ArchivePagination(KeysetPagination):
+    # page archived tasks in the order they were archived
+    timestamp_field = 'archived_at'
+
+
+class ActivityPagination(KeysetPagination):
+    # page activity feeds newest first
+    descending = True
+
+
+class ColumnPagination:
+    # define default and maximum number of tasks per column
+    page_size = 10
+    max_page_size = 100
+    # define the field tasks are sorted by inside a column (nulls last, id as tie breaker)
+    order_field = 'position'
+
+    def __init__(self, order_field=None):
+        # allow choosing the sort field per request
+        self.order_field = order_field or self.order_field
+
+    def get_ordering(self):
+        # return the order_by expressions of a column
+        return [F(self.order_field).asc(nulls_last=True), F('id').asc()]
+
+    def encode_cursor(self, task):
+        # build an opaque cursor from the sort value and id of the last task of a page
+        value = getattr(task, self.order_field)
+        raw = f"{'' if value is None else value.isoformat() if hasattr(value, 'isoformat') else value}|{task.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        # split the cursor back into sort value (None for empty) and id
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+            value, pk = raw.rsplit('|', 1)
+            return (value or None), int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise ValidationError({'error': 'Invalid cursor.'})
+
+    def after_filter(self, cursor):
+        # build the filter selecting all tasks that sort after the cursor
+        value, pk = self.decode_cursor(cursor)
+        field = self.order_field
+        if value is None:
+            return Q(**{f'{field}__isnull': True, 'id__gt': pk})
+        return (
+            Q(**{f'{field}__gt': value})
+            | Q(**{field: value, 'id__gt': pk})
+            | Q(**{f'{field}__isnull': True})
+        )
+
+
+class DuePagination(KeysetPagination):
+    # page tasks by deadline; cursors use their own parameters since before/after filter the dates
+    timestamp_field = 'due_date'
+    before_query_param = 'prev'
+    after_query_param = 'next'
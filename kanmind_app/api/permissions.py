@@ -1,11 +1,24 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
+from kanmind_app.models import BoardMember
+from kanmind_app.sharding import shard_aliases
+
+
+def get_member_board_ids(user):
+    # ids of the boards the user is a member of on any shard, looked up once per user object
+    # (batched sub-requests share the user and therefore this lookup)
+    if not hasattr(user, '_member_board_ids'):
+        user._member_board_ids = set()
+        for alias in shard_aliases():
+            user._member_board_ids.update(BoardMember.objects.using(alias).filter(user=user).values_list('board_id', flat=True))
+    return user._member_board_ids
+
 
 class IsBoardMemberOrOwner(BasePermission):
     # check permissions at object level
     def has_object_permission(self, request, view, obj):
         # allow safe methods (GET, HEAD, OPTIONS) for members or owner
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
-            return obj.owner == request.user or obj.members.filter(id=request.user.id).exists()
+            return obj.owner_id == request.user.id or obj.id in get_member_board_ids(request.user)
         # allow PATCH for members or owner of the board
         if request.method == 'PATCH':
             return obj.owner == request.user or obj.members.filter(id=request.user.id).exists()
@@ -28,7 +41,7 @@ class IsTaskCreatorOrBoardOwner(BasePermission):
     # check permissions at object level
     def has_object_permission(self, request, view, obj):
         # allow DELETE only for task creator or board owner
-        if request.method == ['DELETE', 'PATCH']:
+        if request.method in ['DELETE', 'PATCH']:
             return obj.creator == request.user or obj.board.owner == request.user
         # deny other methods by default
         return False
@@ -44,7 +57,7 @@ class IsCommentAuthor(BasePermission):
     def has_object_permission(self, request, view, obj):
         # allow DELETE only for comment author
         if request.method == 'DELETE':
-            return obj.author == request.user
+            return obj.user_id == request.user.id
         # deny other methods by default
         return False
 
@@ -1,6 +1,16 @@
 from rest_framework import serializers
-from kanmind_app.models import Boards, Tasks, Comments
+from kanmind_app.models import Boards, Tasks, Comments, ArchivedTasks, ActivityLog, OverdueTasks, TaskStatusHistory
 from django.contrib.auth.models import User
+from django.utils import timezone
+from kanmind_app import activity
+from .cache import bump_versions, board_user_ids, invalidate_board
+
+
+class VersionConflict(Exception):
+    # raised when a task was changed since the version the client edited
+    def __init__(self, version):
+        super().__init__(f'Task is at version {version}.')
+        self.version = version
 
 class UserSerializer(serializers.ModelSerializer):
     # define field for user's full name
@@ -33,7 +43,7 @@ class CommentSerializer(serializers.ModelSerializer):
 
     def get_author(self, obj):
         # return author's full name
-        return f"{obj.author.first_name} {obj.author.last_name}".strip()
+        return f"{obj.user.first_name} {obj.user.last_name}".strip()
 
     def validate_content(self, value):
         # ensure content is not empty
@@ -42,6 +52,19 @@ class CommentSerializer(serializers.ModelSerializer):
         return value
     
 
+def preview_fields(fields, name):
+    # replace a large text field by its preview and length (filled by the with_preview queryset helper)
+    index = fields.index(name)
+    return fields[:index] + [f'{name}_preview', f'{name}_length'] + fields[index + 1:]
+
+class CommentListSerializer(CommentSerializer):
+    # list mode: a preview and the length of the content instead of the full text
+    content_preview = serializers.CharField(read_only=True)
+    content_length = serializers.IntegerField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = preview_fields(CommentSerializer.Meta.fields, 'content')
+
 class TasksSerializer(serializers.ModelSerializer):
     # define field for board ID (write-only for task creation)
     board = serializers.PrimaryKeyRelatedField(
@@ -66,8 +89,8 @@ class TasksSerializer(serializers.ModelSerializer):
         required=False, 
         allow_null=True
     )
-    # define field for comments count
-    comments_count = serializers.SerializerMethodField()
+    # define field for comments count (stored on the task)
+    comments_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         # link serializer to Tasks model
@@ -85,15 +108,13 @@ class TasksSerializer(serializers.ModelSerializer):
             'reviewer',
             'reviewer_id', 
             'due_date', 
-            'comments_count'
+            'comments_count',
+            'position',
+            'version'
         ]
-        # define read-only fields
-        read_only_fields = ['id', 'assignee', 'reviewer', 'comments_count']
+        # define read-only fields (positions change through the move endpoint, versions on every edit)
+        read_only_fields = ['id', 'assignee', 'reviewer', 'comments_count', 'position', 'version']
 
-    def get_comments_count(self, obj):
-        # return number of comments (placeholder, assuming Comments model exists)
-        return obj.comments.count()
-    
     def validate(self, data):
         # get board from data
         board = data.get('board', getattr(self.instance, 'board', None))
@@ -116,24 +137,135 @@ class TasksSerializer(serializers.ModelSerializer):
         board = validated_data.pop('board')
         assignee_id = validated_data.pop('assignee_id', None)
         reviewer_id = validated_data.pop('reviewer_id', None)
-        # create task with creator as current user
+        # create task with creator as current user at the end of its column
         task = Tasks.objects.create(
             board=board, 
             creator=self.context['request'].user, 
             assignee=assignee_id, 
             reviewer=reviewer_id, 
+            position=Tasks.next_position(board.id, validated_data.get('status', 'to-do')),
             **validated_data
         )
+        # start the status history of the task for the flow metrics
+        TaskStatusHistory.record(board.id, task.id, None, task.status, task.created_at)
+        # invalidate cached board payloads showing this task
+        invalidate_board(board)
         return task
 
     def update(self, instance, validated_data):
         # remove board from validated data if present
         validated_data.pop('board', None)
-        # update assignee and reviewer if provided
-        instance.assignee = validated_data.pop('assignee_id', instance.assignee)
-        instance.reviewer = validated_data.pop('reviewer_id', instance.reviewer)
-        # update other fields
-        return super().update(instance, validated_data)
+        # the version the client edited (the loaded one when the client sent none)
+        version = self.context.get('version') or instance.version
+        # remember tracked values for the activity log
+        previous = {'status': instance.status, 'assignee': instance.assignee_id, 'reviewer': instance.reviewer_id}
+        # collect only the fields whose value actually changes
+        changes = {}
+        for name in ('assignee', 'reviewer'):
+            if f'{name}_id' in validated_data:
+                user = validated_data.pop(f'{name}_id')
+                if (user.id if user else None) != getattr(instance, f'{name}_id'):
+                    changes[name] = user
+        for name, value in validated_data.items():
+            if getattr(instance, name) != value:
+                changes[name] = value
+        # move the task to the end of its new column when the status changes
+        if 'status' in changes:
+            changes['position'] = Tasks.next_position(instance.board_id, changes['status'])
+        if not changes:
+            if version != instance.version:
+                raise VersionConflict(instance.version)
+            return instance
+        # write the changes unless someone else edited the task since that version
+        changes['updated_at'] = timezone.now()
+        new_version = Tasks.update_if_version(instance.id, version, **changes)
+        if new_version is None:
+            raise VersionConflict(Tasks.objects.values_list('version', flat=True).get(id=instance.id))
+        for name, value in changes.items():
+            setattr(instance, name, value)
+        instance.version = new_version
+        # log status changes and assignments
+        self.record_activity(instance, previous)
+        # keep the status history for the flow metrics
+        TaskStatusHistory.record(instance.board_id, instance.id, previous['status'], instance.status, instance.updated_at)
+        # invalidate cached board payloads showing this task
+        invalidate_board(instance.board)
+        return instance
+
+    def record_activity(self, instance, previous):
+        # queue activity events for every tracked field that changed
+        request = self.context.get('request')
+        user = request.user if request else None
+        changes = [
+            ('status_changed', previous['status'], instance.status),
+            ('assigned', previous['assignee'], instance.assignee_id),
+            ('reviewer_changed', previous['reviewer'], instance.reviewer_id),
+        ]
+        for verb, old, new in changes:
+            if old != new:
+                activity.record(instance.board_id, verb, user=user, task_id=instance.id, old=old, new=new)
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    # define field for assignee using UserSerializer
+    assignee = UserSerializer(read_only=True)
+    # define field for reviewer using UserSerializer
+    reviewer = UserSerializer(read_only=True)
+
+    class Meta:
+        # link serializer to ArchivedTasks model
+        model = ArchivedTasks
+        # define fields to serialize (same shape as TasksSerializer plus archive date)
+        fields = [
+            'id',
+            'title',
+            'description',
+            'status',
+            'priority',
+            'assignee',
+            'reviewer',
+            'due_date',
+            'comments_count',
+            'archived_at'
+        ]
+        # archived tasks cannot be changed
+        read_only_fields = fields
+
+class TaskListSerializer(TasksSerializer):
+    # list mode: a preview and the length of the description instead of the full text
+    description_preview = serializers.CharField(read_only=True, allow_null=True)
+    description_length = serializers.IntegerField(read_only=True)
+
+    class Meta(TasksSerializer.Meta):
+        fields = preview_fields(TasksSerializer.Meta.fields, 'description')
+
+class ArchivedTaskListSerializer(ArchivedTaskSerializer):
+    # list mode: a preview and the length of the description instead of the full text
+    description_preview = serializers.CharField(read_only=True, allow_null=True)
+    description_length = serializers.IntegerField(read_only=True)
+
+    class Meta(ArchivedTaskSerializer.Meta):
+        fields = preview_fields(ArchivedTaskSerializer.Meta.fields, 'description')
+        read_only_fields = fields
+
+class NormalizedTaskSerializer(TasksSerializer):
+    # point to assignee and reviewer by id (the users are listed once next to the tasks)
+    assignee = serializers.IntegerField(source='assignee_id', read_only=True)
+    reviewer = serializers.IntegerField(source='reviewer_id', read_only=True)
+
+class NormalizedArchivedTaskSerializer(ArchivedTaskSerializer):
+    # point to assignee and reviewer by id (the users are listed once next to the tasks)
+    assignee = serializers.IntegerField(source='assignee_id', read_only=True)
+    reviewer = serializers.IntegerField(source='reviewer_id', read_only=True)
+
+class NormalizedTaskListSerializer(TaskListSerializer):
+    # list mode of the normalized format: previews and users by id
+    assignee = serializers.IntegerField(source='assignee_id', read_only=True)
+    reviewer = serializers.IntegerField(source='reviewer_id', read_only=True)
+
+class NormalizedArchivedTaskListSerializer(ArchivedTaskListSerializer):
+    # list mode of the normalized format: previews and users by id
+    assignee = serializers.IntegerField(source='assignee_id', read_only=True)
+    reviewer = serializers.IntegerField(source='reviewer_id', read_only=True)
 
 class BoardsDetailSerializer(serializers.ModelSerializer):
     # define field for owner id
@@ -154,6 +286,9 @@ class BoardsDetailSerializer(serializers.ModelSerializer):
         required=False
     )
 
+    # define nested relations that are rendered as id lists unless expanded
+    expandable_fields = ('members', 'members_data', 'tasks')
+
     # define meta class for serializer configuration
      # define meta class
     class Meta:
@@ -164,10 +299,29 @@ class BoardsDetailSerializer(serializers.ModelSerializer):
         # define read-only fields
         read_only_fields = ['id', 'owner_id', 'owner_data', 'members', 'members_data', 'tasks']
 
+    def __init__(self, *args, fields=None, expand=None, preview=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        # drop every field that was not requested
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        # replace nested serializers that were not expanded by their primary keys
+        if expand is not None:
+            for name in self.expandable_fields:
+                if name in self.fields and name not in expand:
+                    source = self.fields[name].source
+                    extra = {'source': source} if source != name else {}
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(many=True, read_only=True, **extra)
+        # list mode: expanded tasks carry description previews
+        if preview and isinstance(self.fields.get('tasks'), serializers.ListSerializer):
+            self.fields['tasks'] = TaskListSerializer(many=True, read_only=True)
+
      # define update method for PATCH requests
     def update(self, instance, validated_data):
         # extract member IDs from validated data
         members = validated_data.pop('member_ids', None)
+        # remember who saw the board before the update
+        previous_user_ids = board_user_ids(instance)
         # update board instance
         instance = super().update(instance, validated_data)
         # update members if provided
@@ -182,6 +336,8 @@ class BoardsDetailSerializer(serializers.ModelSerializer):
             if instance.owner not in instance.members.all():
                 # add owner to members
                 instance.members.add(instance.owner)
+        # invalidate cached payloads for previous and current members
+        invalidate_board(instance, previous_user_ids + board_user_ids(instance))
         # return updated instance
         return instance
         
@@ -222,19 +378,27 @@ class BoardSerializer(serializers.ModelSerializer):
         extra_kwargs = {'title': {'required': True}}
 
     def get_member_count(self, obj):
-        # return count of board members
+        # return count of board members (annotated by the list view)
+        if hasattr(obj, 'member_total'):
+            return obj.member_total
         return obj.members.count()
 
     def get_ticket_count(self, obj):
         # return total count of tasks for the board
+        if hasattr(obj, 'ticket_total'):
+            return obj.ticket_total
         return obj.tasks.count()
 
     def get_tasks_to_do_count(self, obj):
         # return count of tasks in 'to-do' status
+        if hasattr(obj, 'to_do_total'):
+            return obj.to_do_total
         return obj.tasks.filter(status='to-do').count()
 
     def get_tasks_high_prio_count(self, obj):
         # return count of tasks with high priority
+        if hasattr(obj, 'high_prio_total'):
+            return obj.high_prio_total
         return obj.tasks.filter(priority='high').count()
 
     def create(self, validated_data):
@@ -246,4 +410,33 @@ class BoardSerializer(serializers.ModelSerializer):
         for member in members:
             if member != self.context['request'].user:  # prevent adding owner twice
                 board.members.add(member)
-        return board
\ No newline at end of file
+        # invalidate the board lists of everybody who sees the new board
+        bump_versions([board.id], [board.owner_id, *(member.id for member in members)])
+        return board
+
+
+class ActivityLogSerializer(serializers.ModelSerializer):
+    # define field for the acting user
+    user = UserSerializer(read_only=True)
+    # define field for created_at in ISO format
+    created_at = serializers.DateTimeField(format="%Y-%m-%dT%H:%M:%SZ", read_only=True)
+
+    class Meta:
+        # link serializer to ActivityLog model
+        model = ActivityLog
+        # define fields to serialize
+        fields = ['id', 'created_at', 'verb', 'task_id', 'user', 'payload']
+        # the log is append-only
+        read_only_fields = fields
+
+class OverdueTaskSerializer(serializers.ModelSerializer):
+    # define field for assignee using UserSerializer
+    assignee = UserSerializer(read_only=True)
+
+    class Meta:
+        # link serializer to OverdueTasks model
+        model = OverdueTasks
+        # define fields to serialize
+        fields = ['task_id', 'board', 'title', 'status', 'priority', 'assignee', 'due_date', 'days_overdue', 'snapshot_date']
+        # snapshots are written by the snapshot_overdue_tasks command only
+        read_only_fields = fields
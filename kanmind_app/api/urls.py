@@ -5,13 +5,25 @@ from django.urls import path
 from .views import (
     BoardListCreateView, 
     BoardDetailView, 
+    BoardArchiveView,
+    BoardColumnsView,
+    BoardActivityView,
+    BoardMetricsView,
     EmailCheckView, 
+    UserSearchView,
     TasksAssignedToMeView, 
     TasksReviewingView,
+    TasksDueView,
+    TasksOverdueView,
     TasksCreateView,
     TasksDetailView,
+    TaskMoveView,
     TaskCommentsView,
-    TaskCommentDetailView
+    TaskCommentDetailView,
+    MetricsView,
+    ProfileListView,
+    ProfileDetailView,
+    BatchView
     )
 
 urlpatterns = [
@@ -19,18 +31,42 @@ urlpatterns = [
     path('boards/', BoardListCreateView.as_view(), name='boards-list-create'),
     # link /boards/<board_id>/ endpoint to BoardsDetailView
     path('boards/<int:board_id>/', BoardDetailView.as_view(), name='boards-detail'),
+    # link /boards/<board_id>/archive/ endpoint to BoardArchiveView
+    path('boards/<int:board_id>/archive/', BoardArchiveView.as_view(), name='boards-archive'),
+    # link /boards/<board_id>/columns/ endpoint to BoardColumnsView
+    path('boards/<int:board_id>/columns/', BoardColumnsView.as_view(), name='boards-columns'),
+    # link /boards/<board_id>/activity/ endpoint to BoardActivityView
+    path('boards/<int:board_id>/activity/', BoardActivityView.as_view(), name='boards-activity'),
+    # link /boards/<board_id>/metrics/ endpoint to BoardMetricsView
+    path('boards/<int:board_id>/metrics/', BoardMetricsView.as_view(), name='boards-metrics'),
     # link /email-check/ endpoint to EmailCheckView
     path('email-check/', EmailCheckView.as_view(), name='email-check'),
+    # link /users/search/ endpoint to UserSearchView
+    path('users/search/', UserSearchView.as_view(), name='users-search'),
     # link /tasks/assigned-to-me/ endpoint to TasksAssignedToMeView
     path('tasks/assigned-to-me/', TasksAssignedToMeView.as_view(), name='tasks-assigned-to-me'),
     # link /tasks/reviewing/ endpoint to TasksReviewingView
     path('tasks/reviewing/', TasksReviewingView.as_view(), name='tasks-reviewing'),
+    # link /tasks/due/ endpoint to TasksDueView
+    path('tasks/due/', TasksDueView.as_view(), name='tasks-due'),
+    # link /tasks/overdue/ endpoint to TasksOverdueView
+    path('tasks/overdue/', TasksOverdueView.as_view(), name='tasks-overdue'),
     # link /tasks/ endpoint to TasksCreateView
     path('tasks/', TasksCreateView.as_view(), name='tasks-create'),
     # link /tasks/<task_id>/ endpoint to TasksDetailView
     path('tasks/<int:task_id>/', TasksDetailView.as_view(), name='tasks-detail'),
+    # link /tasks/<task_id>/move/ endpoint to TaskMoveView
+    path('tasks/<int:task_id>/move/', TaskMoveView.as_view(), name='tasks-move'),
     # link /tasks/<task_id>/comments/ endpoint to TaskCommentsView
     path('tasks/<int:task_id>/comments/', TaskCommentsView.as_view(), name='task-comments'),
     # link /tasks/<task_id>/comments/<comment_id>/ endpoint to TaskCommentDetailView
     path('tasks/<int:task_id>/comments/<int:comment_id>/', TaskCommentDetailView.as_view(), name='task-comment-detail'),
+    # link /metrics/ endpoint to MetricsView
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    # link /profiles/ endpoint to ProfileListView
+    path('profiles/', ProfileListView.as_view(), name='profiles'),
+    # link /profiles/<name>/ endpoint to ProfileDetailView
+    path('profiles/<str:name>/', ProfileDetailView.as_view(), name='profiles-detail'),
+    # link /batch/ endpoint to BatchView
+    path('batch/', BatchView.as_view(), name='batch'),
 ]
\ No newline at end of file
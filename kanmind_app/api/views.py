@@ -1,100 +1,260 @@
 # standard bib imports
+import logging
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+from urllib.parse import urlsplit
 from django.db import models
-from django.db.models import Q
+from django.db.models import Q, F, Prefetch, Count, Window, Min
+from django.db.models.functions import RowNumber, Length, Coalesce, Substr
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.conf import settings
+from django.http import HttpRequest, QueryDict, FileResponse
+from django.urls import resolve, Resolver404
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 
 # third party imports
+from rest_framework.authentication import BaseAuthentication
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
 # local imports
-from kanmind_app.models import Boards, Tasks, Comments
-from .serializers import BoardSerializer, BoardsDetailSerializer, UserSerializer, TasksSerializer, CommentSerializer
-from .permissions import IsBoardMemberOrOwner, IsTaskCreatorOrBoardOwner, IsCommentAuthor
+from core import metrics, compression
+from core.profiling import get_profile_store
+from core.throttling import BoardReadThrottle, TaskWriteThrottle
+from kanmind_app.models import Boards, BoardMember, Tasks, Comments, BoardPurge, OverdueTasks, TaskStatusHistory, BoardFlowMetrics
+from kanmind_app.positions import key_between
+from kanmind_app import activity, sharding
+from kanmind_app.sharding import shard_aliases, shard_for_id, shard_for_new_board, shard_from_kwargs, current_shard, use_shard
+from user_auth_app.models import UserSearchKey
+from user_auth_app.search import normalize, prefix_range, UserSearchCache, KEY_MAX_LENGTH
+from .serializers import BoardSerializer, BoardsDetailSerializer, UserSerializer, TasksSerializer, CommentSerializer, ArchivedTaskSerializer, ActivityLogSerializer, OverdueTaskSerializer, VersionConflict, NormalizedTaskSerializer, NormalizedArchivedTaskSerializer, NormalizedTaskListSerializer, NormalizedArchivedTaskListSerializer, TaskListSerializer, ArchivedTaskListSerializer, CommentListSerializer
+from .negotiation import NormalizedFormatNegotiation, ColumnarFormatNegotiation
+from .columnar import encode_tasks
+from .permissions import IsBoardMemberOrOwner, IsTaskCreatorOrBoardOwner, IsCommentAuthor, get_member_board_ids
+from .pagination import KeysetPagination, ArchivePagination, ColumnPagination, ActivityPagination, DuePagination
+from .cache import board_detail_key, board_list_key, get_cached, set_cached, bump_versions, board_user_ids, invalidate_board, render_payload, RenderedResponse
+
+logger = logging.getLogger(__name__)
 
 
 class BoardListCreateView(APIView):
     # defines the required permission class
     permission_classes = [IsBoardMemberOrOwner]
+    # define throttle class
+    throttle_classes = [BoardReadThrottle]
 
     def get(self, request):
-        # filters boards where the user is either the owner or a member
-        boards = Boards.objects.filter(
-            models.Q(owner=request.user) | models.Q(members=request.user)
-        ).distinct()
-        # serializes the filtered boards
-        serializer = BoardSerializer(boards, many=True)
+        # serve the cached list while the user's board-set version is unchanged
+        key = board_list_key(request.user.id)
+        data = get_cached('board_list', key)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+        data = []
+        for alias in shard_aliases():
+            # filters boards where the user is either the owner or a member
+            boards = Boards.objects.using(alias).filter(id__in=member_board_ids(request.user))
+            # count members and tasks in this query instead of once per board
+            members = BoardMember.objects.filter(board=models.OuterRef('pk')).values('board').annotate(total=Count('id')).values('total')
+            boards = boards.annotate(
+                member_total=Coalesce(models.Subquery(members), 0),
+                ticket_total=Count('tasks'),
+                to_do_total=Count('tasks', filter=Q(tasks__status='to-do')),
+                high_prio_total=Count('tasks', filter=Q(tasks__priority='high')),
+            )
+            # serializes the filtered boards of this shard
+            data += BoardSerializer(boards, many=True).data
+        # store the payload under the current version
+        set_cached(key, data)
         # returns the serialized data with status 200
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(data, status=status.HTTP_200_OK)
 
     def post(self, request):
         # creates a serializer with the request data
         serializer = BoardSerializer(data=request.data, context={'request': request})
         # checks if the data is valid
         if serializer.is_valid():
-            # saves the new board
-            serializer.save()
+            # saves the new board on the shard of its owner
+            with use_shard(shard_for_new_board(request.user)):
+                serializer.save()
             # returns the data of the new board with status 201
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         # returns an error if the data is invalid
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     
+def get_list_param(request, name):
+    # split a comma separated query parameter into a list (None when absent)
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def list_mode(request):
+    # ?mode=list asks for previews of large text fields instead of the full text
+    return request.query_params.get('mode') == 'list'
+
+
+def with_preview(queryset, name):
+    # leave a large text column unloaded and select a short preview and its length instead
+    return queryset.defer(name).annotate(**{
+        f'{name}_preview': Substr(name, 1, settings.TEXT_PREVIEW_LENGTH),
+        f'{name}_length': Coalesce(Length(name), 0),
+    })
+
+
+def member_board_ids(user):
+    # subquery selecting the ids of all active boards the user owns or belongs to
+    return Boards.objects.filter(Q(owner=user) | Q(members=user)).values('id')
+
+
 # define board detail view
 class BoardDetailView(APIView):
     # define required permission class
     permission_classes = [IsBoardMemberOrOwner]
+    # define throttle class
+    throttle_classes = [BoardReadThrottle]
+
+    # allow ?format=normalized next to the renderer formats
+    content_negotiation_class = NormalizedFormatNegotiation
+
+    # define fields returned by GET and by PATCH
+    get_fields = ['id', 'title', 'owner_id', 'members', 'tasks']
+    patch_fields = ['id', 'title', 'owner_data', 'members_data']
 
     # define method to get board by id
-    def get_object(self, board_id):
+    def get_object(self, board_id, fields=(), expand=(), normalized=False, preview=False):
+        # load only the relations the requested fields need
+        queryset = Boards.objects.all()
+        if 'owner_data' in fields or (normalized and 'owner_id' in fields):
+            queryset = queryset.select_related('owner')
+        if 'members' in fields or 'members_data' in fields:
+            queryset = queryset.prefetch_related('members')
+        if 'tasks' in fields:
+            if normalized:
+                # users of normalized tasks are loaded once for the users map
+                tasks = with_preview(Tasks.objects.all(), 'description') if preview else Tasks.objects.all()
+            elif 'tasks' in expand:
+                tasks = Tasks.objects.select_related('assignee', 'reviewer')
+                if preview:
+                    tasks = with_preview(tasks, 'description')
+            else:
+                tasks = Tasks.objects.only('id', 'board_id')
+            tasks = tasks.order_by('status', 'position', 'id')
+            queryset = queryset.prefetch_related(Prefetch('tasks', queryset=tasks))
         # try to retrieve board instance
         try:
             # return board object
-            return Boards.objects.get(id=board_id)
+            return queryset.get(id=board_id)
         # handle case where board does not exist
         except Boards.DoesNotExist:
             return None
 
     def get(self, request, board_id):
+        # check whether archived tasks should be listed too
+        include_archived = request.query_params.get('include_archived', '').lower() in ('1', 'true', 'yes')
+        # read sparse fieldset and expansion (without both the full payload is returned)
+        fields = get_list_param(request, 'fields')
+        expand = get_list_param(request, 'expand')
+        if fields is None and expand is None:
+            expand = ['members', 'tasks']
+        fields = fields or self.get_fields
+        expand = expand or []
+        # reject unknown field names
+        unknown = (set(fields) - set(self.get_fields)) | (set(expand) - {'members', 'tasks'})
+        if unknown:
+            return Response({'error': f'Unknown fields: {", ".join(sorted(unknown))}'}, status=status.HTTP_400_BAD_REQUEST)
+        # the normalized format lists every user once instead of expanding them
+        normalized = request.query_params.get('format') == 'normalized'
+        if normalized:
+            expand = []
+        # list mode ships description previews of expanded and normalized tasks
+        preview = list_mode(request) and 'tasks' in fields and (normalized or 'tasks' in expand)
+        # serve the cached payload to users who could see this board version
+        variant = f"{'archived' if include_archived else ''}|{','.join(sorted(fields))}|{','.join(sorted(expand))}"
+        if normalized:
+            variant += '|normalized'
+        if preview:
+            variant += '|preview'
+        key = board_detail_key(board_id, variant)
+        cached = get_cached('board_detail', key)
+        if cached is not None and request.user.id in cached['user_ids']:
+            return RenderedResponse(cached, status=status.HTTP_200_OK)
         # get board instance
-        board = self.get_object(board_id)
+        board = self.get_object(board_id, fields, expand, normalized, preview)
         # return 404 if board not found
         if not board:
             # return error response
             return Response({'error': 'Board not found'}, status=status.HTTP_404_NOT_FOUND)
         # check permissions
         self.check_object_permissions(request, board)
-        # serialize board
-        serializer = BoardsDetailSerializer(board)
-        # return required fields for get
-        return Response({
-            # include board id
-            'id': serializer.data['id'],
-            # include board title
-            'title': serializer.data['title'],
-            # include owner id
-            'owner_id': serializer.data['owner_id'],
-            # include members
-            'members': serializer.data['members'],
-            # include tasks
-            'tasks': serializer.data['tasks']
-        }, status=status.HTTP_200_OK)
+        # serialize only the requested fields in the requested order
+        serializer = BoardsDetailSerializer(board, fields=fields, expand=expand, preview=preview)
+        data = {name: serializer.data[name] for name in fields}
+        if normalized:
+            data = self.normalize(board, data, include_archived, preview)
+        # append archived tasks on request
+        elif include_archived and 'tasks' in fields:
+            archived = board.archived_tasks.order_by('archived_at', 'id')
+            if preview:
+                archived = ArchivedTaskListSerializer(with_preview(archived.select_related('assignee', 'reviewer'), 'description'), many=True).data
+            elif 'tasks' in expand:
+                archived = ArchivedTaskSerializer(archived.select_related('assignee', 'reviewer'), many=True).data
+            else:
+                archived = list(archived.values_list('id', flat=True))
+            data['tasks'] = data['tasks'] + archived
+        # store the rendered and gzipped payload together with the users allowed to read it
+        rendered = render_payload(data)
+        set_cached(key, {'user_ids': board_user_ids(board), **rendered})
+        return RenderedResponse(rendered, status=status.HTTP_200_OK)
+
+    def normalize(self, board, data, include_archived, preview=False):
+        # replace nested users by ids and list every referenced user once in a users map
+        users = {}
+        if 'owner_id' in data:
+            users[board.owner.id] = board.owner
+        if 'members' in data:
+            users.update((member.id, member) for member in board.members.all())
+        if 'tasks' in data:
+            # list mode ships description previews here too
+            serializer = NormalizedTaskListSerializer if preview else NormalizedTaskSerializer
+            tasks = serializer(board.tasks.all(), many=True).data
+            if include_archived:
+                archived = board.archived_tasks.order_by('archived_at', 'id')
+                if preview:
+                    tasks += NormalizedArchivedTaskListSerializer(with_preview(archived, 'description'), many=True).data
+                else:
+                    tasks += NormalizedArchivedTaskSerializer(archived, many=True).data
+            data['tasks'] = tasks
+            # load assignees and reviewers that are no member any more in one query
+            missing = {task[name] for task in tasks for name in ('assignee', 'reviewer')} - set(users) - {None}
+            users.update((user.id, user) for user in User.objects.filter(id__in=missing))
+        data['users'] = {str(user['id']): user for user in UserSerializer(users.values(), many=True).data}
+        return data
 
     def patch(self, request, board_id):
         # get board instance
-        board = self.get_object(board_id)
+        board = self.get_object(board_id, ['owner_data'])
         # return 404 if board not found
         if not board:
             # return error response
             return Response({'error': 'Board not found'}, status=status.HTTP_404_NOT_FOUND)
         # check permissions
         self.check_object_permissions(request, board)
-        # create serializer with request data
-        serializer = BoardsDetailSerializer(board, data=request.data, partial=True)
+        # create serializer limited to the patch response and the writable fields
+        serializer = BoardsDetailSerializer(
+            board,
+            data=request.data,
+            partial=True,
+            fields=self.patch_fields + ['member_ids'],
+            expand=['members_data']
+        )
         # check if data is valid
         if serializer.is_valid():
             # try to save updated board
@@ -102,16 +262,7 @@ class BoardDetailView(APIView):
                 # save serializer
                 serializer.save()
                 # return required fields for patch
-                return Response({
-                    # include board id
-                    'id': serializer.data['id'],
-                    # include board title
-                    'title': serializer.data['title'],
-                    # include owner data
-                    'owner_data': serializer.data['owner_data'],
-                    # include members data
-                    'members_data': serializer.data['members_data']
-                }, status=status.HTTP_200_OK)
+                return Response({name: serializer.data[name] for name in self.patch_fields}, status=status.HTTP_200_OK)
             # handle serialization errors
             except Exception as e:
                 # return error response
@@ -128,12 +279,201 @@ class BoardDetailView(APIView):
             return Response({'error': 'Board not found'}, status=status.HTTP_404_NOT_FOUND)
         # check permissions
         self.check_object_permissions(request, board)
-        # delete board
-        board.delete()
+        # invalidate cached payloads of the board and its members
+        invalidate_board(board)
+        # hide the board now and leave the actual deletion to the purge job
+        with sharding.atomic():
+            board.deleted_at = timezone.now()
+            board.save(update_fields=['deleted_at'])
+            BoardPurge.objects.get_or_create(board_id=board.id)
         # return null with status 204
         return Response(None, status=status.HTTP_204_NO_CONTENT)
     
 
+class BoardArchiveView(APIView):
+    # define required permission classes
+    permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+    # define throttle class
+    throttle_classes = [BoardReadThrottle]
+
+    def get(self, request, board_id):
+        # get board instance
+        try:
+            board = Boards.objects.get(id=board_id)
+        except Boards.DoesNotExist:
+            return Response({'error': 'Board not found'}, status=status.HTTP_404_NOT_FOUND)
+        # check permissions
+        self.check_object_permissions(request, board)
+        # get one page of archived tasks of the board
+        paginator = ArchivePagination()
+        tasks = paginator.paginate_queryset(board.archived_tasks.select_related('assignee', 'reviewer'), request, self)
+        # serialize archived tasks
+        serializer = ArchivedTaskSerializer(tasks, many=True)
+        # return serialized page with cursor links and status 200
+        return paginator.get_paginated_response(serializer.data)
+
+
+class BoardColumnsView(APIView):
+    # define required permission classes
+    permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+    # define throttle class
+    throttle_classes = [BoardReadThrottle]
+    # define fields a column can be sorted by (first one is the default)
+    order_fields = ['position', 'due_date']
+
+    def get(self, request, board_id):
+        # get board instance
+        try:
+            board = Boards.objects.get(id=board_id)
+        except Boards.DoesNotExist:
+            return Response({'error': 'Board not found'}, status=status.HTTP_404_NOT_FOUND)
+        # check permissions
+        self.check_object_permissions(request, board)
+        # read sort field and number of tasks per column
+        order = request.query_params.get('order', self.order_fields[0])
+        if order not in self.order_fields:
+            return Response({'error': f'Order must be one of: {", ".join(self.order_fields)}'}, status=status.HTTP_400_BAD_REQUEST)
+        paginator = ColumnPagination(order)
+        try:
+            limit = min(int(request.query_params.get('limit', paginator.page_size)), paginator.max_page_size)
+        except ValueError:
+            return Response({'error': 'Limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1:
+            return Response({'error': 'Limit must be positive.'}, status=status.HTTP_400_BAD_REQUEST)
+        tasks = Tasks.objects.filter(board=board).select_related('assignee', 'reviewer')
+        # load more tasks of a single column after a cursor
+        column = request.query_params.get('status')
+        cursor = request.query_params.get('after')
+        if cursor:
+            if column not in dict(Tasks.STATUS_CHOICES):
+                return Response({'error': 'A valid status is required with after.'}, status=status.HTTP_400_BAD_REQUEST)
+            column_tasks = tasks.filter(status=column)
+            page = list(column_tasks.filter(paginator.after_filter(cursor)).order_by(*paginator.get_ordering())[:limit + 1])
+            columns = {column: {'total': column_tasks.count(), 'tasks': page}}
+        else:
+            # number the tasks of every column and count them in one query
+            ranked = tasks.annotate(
+                row=Window(RowNumber(), partition_by=F('status'), order_by=paginator.get_ordering()),
+                total=Window(Count('id'), partition_by=F('status')),
+            ).filter(row__lte=limit + 1).order_by('status', 'row')
+            if column:
+                ranked = ranked.filter(status=column)
+            columns = {}
+            for task in ranked:
+                entry = columns.setdefault(task.status, {'total': task.total, 'tasks': []})
+                entry['tasks'].append(task)
+        # build the response in the order of the status choices
+        data = []
+        for value, label in Tasks.STATUS_CHOICES:
+            if column and value != column:
+                continue
+            entry = columns.get(value, {'total': 0, 'tasks': []})
+            page = entry['tasks'][:limit]
+            has_more = len(entry['tasks']) > limit
+            data.append({
+                'status': value,
+                'total': entry['total'],
+                'tasks': TasksSerializer(page, many=True).data,
+                'next': paginator.encode_cursor(page[-1]) if has_more else None,
+            })
+        # return columns with status 200
+        return Response(data, status=status.HTTP_200_OK)
+
+
+class BoardActivityView(APIView):
+    # define required permission classes
+    permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+    # define throttle class
+    throttle_classes = [BoardReadThrottle]
+
+    def get(self, request, board_id):
+        # get board instance
+        try:
+            board = Boards.objects.get(id=board_id)
+        except Boards.DoesNotExist:
+            return Response({'error': 'Board not found'}, status=status.HTTP_404_NOT_FOUND)
+        # check permissions
+        self.check_object_permissions(request, board)
+        # write pending events of this process so the feed includes them
+        activity.buffer.flush()
+        # get one page of the feed, newest first
+        paginator = ActivityPagination()
+        events = paginator.paginate_queryset(board.activity.select_related('user'), request, self)
+        # serialize events
+        serializer = ActivityLogSerializer(events, many=True)
+        # return serialized page with cursor links and status 200
+        return paginator.get_paginated_response(serializer.data)
+
+
+class BoardMetricsView(APIView):
+    # define required permission classes
+    permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+    # define throttle class
+    throttle_classes = [BoardReadThrottle]
+    # rollup columns returned per day
+    count_fields = ['to_do', 'in_progress', 'review', 'done', 'created', 'completed']
+
+    def get_range(self, request):
+        # read the inclusive date range (the last FLOW_METRICS_DEFAULT_DAYS days by default)
+        days = {}
+        for name in ('from', 'to'):
+            value = request.query_params.get(name)
+            if value is None:
+                continue
+            try:
+                days[name] = parse_date(value)
+            except ValueError:
+                days[name] = None
+            if days[name] is None:
+                raise ValidationError(f'{name} must be a date (YYYY-MM-DD).')
+        end = days.get('to') or timezone.localdate()
+        start = days.get('from') or end - timedelta(days=settings.FLOW_METRICS_DEFAULT_DAYS - 1)
+        if start > end:
+            raise ValidationError('from must not be after to.')
+        if (end - start).days >= settings.FLOW_METRICS_MAX_DAYS:
+            raise ValidationError(f'The range must not exceed {settings.FLOW_METRICS_MAX_DAYS} days.')
+        return start, end
+
+    def cycle_time_hours(self, total, count):
+        # average cycle time in hours (None without completed tasks)
+        return round(total / count / 3600, 2) if count else None
+
+    def get(self, request, board_id):
+        # get board instance
+        try:
+            board = Boards.objects.get(id=board_id)
+        except Boards.DoesNotExist:
+            return Response({'error': 'Board not found'}, status=status.HTTP_404_NOT_FOUND)
+        # check permissions
+        self.check_object_permissions(request, board)
+        try:
+            start, end = self.get_range(request)
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        # read the precomputed daily rows (one row per day, never the raw history)
+        rows = BoardFlowMetrics.objects.filter(board=board, day__gte=start, day__lte=end).order_by('day')
+        days = []
+        totals = Counter()
+        for row in rows.values('day', 'cycle_time_total', 'cycle_time_count', *self.count_fields):
+            totals.update({name: row[name] for name in ('created', 'completed', 'cycle_time_total', 'cycle_time_count')})
+            day = {name: row[name] for name in ['day'] + self.count_fields}
+            day['avg_cycle_time_hours'] = self.cycle_time_hours(row['cycle_time_total'], row['cycle_time_count'])
+            days.append(day)
+        data = {
+            'board': board.id,
+            'from': start,
+            'to': end,
+            'days': days,
+            'totals': {
+                'created': totals['created'],
+                'completed': totals['completed'],
+                'avg_cycle_time_hours': self.cycle_time_hours(totals['cycle_time_total'], totals['cycle_time_count']),
+            },
+        }
+        # return the series with status 200
+        return Response(data, status=status.HTTP_200_OK)
+
+
 class EmailCheckView(APIView):
     # define required permission class
     permission_classes = [IsAuthenticated]
@@ -161,15 +501,82 @@ class EmailCheckView(APIView):
             return Response({'error': 'Email not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+# recent search results per user (in process, short lived)
+search_cache = UserSearchCache(settings.USER_SEARCH_CACHE_SIZE, settings.USER_SEARCH_CACHE_USERS, settings.USER_SEARCH_CACHE_TTL)
+
+
+class UserSearchView(APIView):
+    # define required permission class
+    permission_classes = [IsAuthenticated]
+    # define shortest accepted prefix and how many matches are ranked at most
+    min_length = 2
+    max_candidates = 200
+
+    def get(self, request):
+        # normalize (and cut) the prefix the same way the search keys were built
+        prefix = normalize(request.query_params.get('q', ''))[:KEY_MAX_LENGTH]
+        if len(prefix) < self.min_length:
+            return Response({'error': f'q must have at least {self.min_length} characters.'}, status=status.HTTP_400_BAD_REQUEST)
+        # serve repeated prefixes from the per-user cache
+        results = search_cache.get(request.user.id, prefix)
+        if results is None:
+            results = self.search(request.user, prefix)
+            search_cache.set(request.user.id, prefix, results)
+        # return ranked users with status 200
+        return Response(results, status=status.HTTP_200_OK)
+
+    def search(self, user, prefix):
+        # find users with a key starting with the prefix through the key index (shortest key = closest match)
+        keys = (
+            UserSearchKey.objects.filter(**prefix_range(prefix))
+            .exclude(user=user)
+            .values('user_id')
+            .annotate(closest=Min(Length('key')))
+            .values_list('user_id', 'closest')
+        )
+        # count the boards every colleague shares with the searching user (on every shard)
+        shared = set()
+        for alias in shard_aliases():
+            mine = member_board_ids(user)
+            shared.update(BoardMember.objects.using(alias).filter(board_id__in=mine).values_list('user_id', 'board_id'))
+            shared.update(Boards.objects.using(alias).filter(id__in=mine).values_list('owner_id', 'id'))
+        common = {}
+        for user_id, board_id in shared:
+            common[user_id] = common.get(user_id, 0) + 1
+        # look at colleagues first so the candidate cap never drops them
+        matches = dict(keys.filter(user_id__in=common)[:self.max_candidates])
+        if len(matches) < self.max_candidates:
+            matches.update(keys[:self.max_candidates - len(matches)])
+        if not matches:
+            return []
+        # rank by boards in common, then by how closely the prefix matched
+        users = User.objects.filter(id__in=matches, is_active=True)
+        users = sorted(users, key=lambda u: (-common.get(u.id, 0), matches[u.id], u.email))
+        data = UserSerializer(users[:settings.USER_SEARCH_MAX_RESULTS], many=True).data
+        return [{**item, 'boards_in_common': common.get(item['id'], 0)} for item in data]
+
+
 class TasksAssignedToMeView(APIView):
     # define required permission class
     permission_classes = [IsAuthenticated]
+    # allow ?format=columnar next to the renderer formats
+    content_negotiation_class = ColumnarFormatNegotiation
 
     def get(self, request):
-        # filter tasks where user is assignee
-        tasks = Tasks.objects.filter(assignee=request.user)
-        # serialize filtered tasks
-        serializer = TasksSerializer(tasks, many=True)
+        # filter tasks where user is assignee on every shard
+        querysets = [
+            Tasks.objects.using(alias).filter(assignee=request.user, board__deleted_at__isnull=True).order_by('id')
+            for alias in shard_aliases()
+        ]
+        # return one array per field on request
+        if request.query_params.get('format') == 'columnar':
+            return Response(encode_tasks(querysets), status=status.HTTP_200_OK)
+        tasks = []
+        for queryset in querysets:
+            queryset = queryset.select_related('assignee', 'reviewer')
+            tasks += with_preview(queryset, 'description') if list_mode(request) else queryset
+        # serialize filtered tasks (previews only in list mode)
+        serializer = (TaskListSerializer if list_mode(request) else TasksSerializer)(tasks, many=True)
         # return serialized data with status 200
         return Response(serializer.data, status=status.HTTP_200_OK)
  
@@ -177,21 +584,111 @@ class TasksAssignedToMeView(APIView):
 class TasksReviewingView(APIView):
     # define required permission class
     permission_classes = [IsAuthenticated]
+    # allow ?format=columnar next to the renderer formats
+    content_negotiation_class = ColumnarFormatNegotiation
 
     def get(self, request):
-        # filter tasks where user is reviewer
-        tasks = Tasks.objects.filter(reviewer=request.user)
-        # serialize filtered tasks
-        serializer = TasksSerializer(tasks, many=True)
+        # filter tasks where user is reviewer on every shard
+        querysets = [
+            Tasks.objects.using(alias).filter(reviewer=request.user, board__deleted_at__isnull=True).order_by('id')
+            for alias in shard_aliases()
+        ]
+        # return one array per field on request
+        if request.query_params.get('format') == 'columnar':
+            return Response(encode_tasks(querysets), status=status.HTTP_200_OK)
+        tasks = []
+        for queryset in querysets:
+            queryset = queryset.select_related('assignee', 'reviewer')
+            tasks += with_preview(queryset, 'description') if list_mode(request) else queryset
+        # serialize filtered tasks (previews only in list mode)
+        serializer = (TaskListSerializer if list_mode(request) else TasksSerializer)(tasks, many=True)
         # return serialized data with status 200
         return Response(serializer.data, status=status.HTTP_200_OK)
     
 
+class TasksDueView(APIView):
+    # define required permission class
+    permission_classes = [IsAuthenticated]
+    # define throttle class
+    throttle_classes = [BoardReadThrottle]
+
+    def get(self, request):
+        # read the optional date range (both bounds are exclusive)
+        bounds = {}
+        for name, lookup in (('after', 'due_date__gt'), ('before', 'due_date__lt')):
+            value = request.query_params.get(name)
+            if value is None:
+                continue
+            try:
+                bounds[lookup] = parse_date(value)
+            except ValueError:
+                bounds[lookup] = None
+            if bounds[lookup] is None:
+                return Response({'error': f'{name} must be a date (YYYY-MM-DD).'}, status=status.HTTP_400_BAD_REQUEST)
+        # only open tasks by default so the partial due date index can be used
+        statuses = get_list_param(request, 'status')
+        if statuses and any(value not in dict(Tasks.STATUS_CHOICES) for value in statuses):
+            return Response({'error': 'Unknown status.'}, status=status.HTTP_400_BAD_REQUEST)
+        querysets = []
+        for alias in shard_aliases():
+            tasks = Tasks.objects.using(alias).filter(board_id__in=member_board_ids(request.user), due_date__isnull=False, **bounds)
+            if statuses:
+                tasks = tasks.filter(status__in=statuses)
+            if not statuses or 'done' not in statuses:
+                tasks = tasks.filter(~Q(status='done'))
+            tasks = tasks.select_related('assignee', 'reviewer')
+            querysets.append(with_preview(tasks, 'description') if list_mode(request) else tasks)
+        # page through the tasks of all shards ordered by due date
+        paginator = DuePagination()
+        page = paginator.paginate_querysets(querysets, request, view=self)
+        serializer = (TaskListSerializer if list_mode(request) else TasksSerializer)(page, many=True)
+        # return serialized tasks with status 200 and the cursors in the link header
+        return paginator.get_paginated_response(serializer.data)
+
+
+class TasksOverdueView(APIView):
+    # define required permission class
+    permission_classes = [IsAuthenticated]
+    # define throttle class
+    throttle_classes = [BoardReadThrottle]
+
+    def get(self, request):
+        # read the snapshot day (the latest snapshot of any shard by default)
+        day = request.query_params.get('date')
+        if day is None:
+            days = [OverdueTasks.objects.using(alias).aggregate(day=models.Max('snapshot_date'))['day'] for alias in shard_aliases()]
+            day = max((value for value in days if value), default=None)
+        else:
+            try:
+                day = parse_date(day)
+            except ValueError:
+                day = None
+            if day is None:
+                return Response({'error': 'date must be a date (YYYY-MM-DD).'}, status=status.HTTP_400_BAD_REQUEST)
+        # list the precomputed rows of that day from every shard, most overdue first
+        rows = []
+        for alias in shard_aliases():
+            snapshots = OverdueTasks.objects.using(alias).filter(board_id__in=member_board_ids(request.user), snapshot_date=day)
+            rows += snapshots.select_related('assignee')
+        rows.sort(key=lambda row: (-row.days_overdue, row.task_id))
+        serializer = OverdueTaskSerializer(rows, many=True)
+        # return serialized rows with status 200
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
 class TasksCreateView(APIView):
     # define required permission class
     permission_classes = [IsAuthenticated]
+    # define throttle class
+    throttle_classes = [TaskWriteThrottle]
 
     def post(self, request):
+        # work on the shard of the target board
+        board_id = request.data.get('board')
+        with use_shard(shard_for_id(board_id) if str(board_id).isdigit() else current_shard()):
+            return self.create(request)
+
+    def create(self, request):
         # create serializer with request data
         serializer = TasksSerializer(data=request.data, context={'request': request})
         # check if data is valid
@@ -212,13 +709,56 @@ class TasksCreateView(APIView):
 class TasksDetailView(APIView):
     # define required permission classes
     permission_classes = [IsAuthenticated, IsTaskCreatorOrBoardOwner]
+    # define throttle class
+    throttle_classes = [TaskWriteThrottle]
 
     def get_object(self, task_id):
         # retrieve task by ID or return None
         try:
-            return Tasks.objects.get(id=task_id)
+            return Tasks.objects.get(id=task_id, board__deleted_at__isnull=True)
+        except Tasks.DoesNotExist:
+            return None
+
+    def get_throttles(self):
+        # reads use the read budget, edits the write budget
+        if self.request.method == 'GET':
+            return [BoardReadThrottle()]
+        return super().get_throttles()
+
+    def get(self, request, task_id):
+        # get task instance with the users it shows
+        try:
+            task = Tasks.objects.select_related('board', 'assignee', 'reviewer').get(id=task_id, board__deleted_at__isnull=True)
         except Tasks.DoesNotExist:
+            return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+        # check if user is member or owner of the board
+        if not (task.board.owner_id == request.user.id or task.board_id in get_member_board_ids(request.user)):
+            return Response({'error': 'You must be a member or owner of the board to view this task.'}, status=status.HTTP_403_FORBIDDEN)
+        # answer 304 when the client already has this version
+        etag = f'"{task.version}"'
+        known = [value.strip().removeprefix('W/') for value in request.headers.get('If-None-Match', '').split(',')]
+        if etag in known:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            # return the full task, description included, with status 200
+            response = Response(TasksSerializer(task).data, status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        return response
+
+    def get_version(self, request):
+        # read the edited version from If-Match ("3", W/"3" or * for any) or the version field (None when missing)
+        value = request.headers.get('If-Match')
+        if value is None:
+            value = request.data.get('version')
+            if value is None:
+                return None
+        value = str(value).strip()
+        if value == '*':
             return None
+        value = value.removeprefix('W/').strip('"')
+        if not value.isdigit() or int(value) < 1:
+            raise ValidationError('If-Match and version must be a task version.')
+        return int(value)
 
     def patch(self, request, task_id):
         # get task instance
@@ -229,14 +769,28 @@ class TasksDetailView(APIView):
         # # check if user is member or owner of the board
         # if not (task.board.owner == request.user or task.board.members.filter(id=request.user.id).exists()):
         #     return Response({'error': 'You must be a member or owner of the board to update this task.'}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            version = self.get_version(request)
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
         # create serializer with request data
-        serializer = TasksSerializer(task, data=request.data, partial=True, context={'request': request})
+        serializer = TasksSerializer(task, data=request.data, partial=True, context={'request': request, 'version': version})
         # check if data is valid
         if serializer.is_valid():
-            # save updated task
-            serializer.save()
-            # return updated task data with status 200
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            # save updated task in one conditional update
+            try:
+                serializer.save()
+            except VersionConflict as e:
+                # someone else edited the task first: the client has to reload and retry
+                response = Response({'error': 'Task was changed by someone else.', 'version': e.version}, status=status.HTTP_409_CONFLICT)
+                response['ETag'] = f'"{e.version}"'
+                return response
+            except Tasks.DoesNotExist:
+                return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+            # return updated task data with status 200 and its version as etag
+            response = Response(serializer.data, status=status.HTTP_200_OK)
+            response['ETag'] = f'"{task.version}"'
+            return response
         # return errors if data is invalid
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -248,20 +802,90 @@ class TasksDetailView(APIView):
             return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
         # check permissions (handled by IsTaskCreatorOrBoardOwner)
         self.check_object_permissions(request, task)
-        # delete task
+        # invalidate cached payloads showing this task
+        invalidate_board(task.board)
+        # delete task and close its status history
         task.delete()
+        TaskStatusHistory.record(task.board_id, task_id, task.status, None)
         # return null with status 204
         return Response(None, status=status.HTTP_204_NO_CONTENT)
     
 
+class TaskMoveView(APIView):
+    # define required permission class
+    permission_classes = [IsAuthenticated]
+    # define throttle class
+    throttle_classes = [TaskWriteThrottle]
+
+    def get_neighbour(self, task, task_id, status):
+        # retrieve a neighbour card of the same column or None
+        if task_id in (None, ''):
+            return None
+        try:
+            return Tasks.objects.exclude(id=task.id).only('id', 'position').get(id=task_id, board_id=task.board_id, status=status)
+        except (Tasks.DoesNotExist, ValueError):
+            raise ValidationError('Neighbour task not found in the target column.')
+
+    def get_position(self, task, status, after_id, before_id):
+        # compute a key between the card above (after) and the card below (before)
+        after = self.get_neighbour(task, after_id, status)
+        before = self.get_neighbour(task, before_id, status)
+        if after is None and before is None:
+            return Tasks.next_position(task.board_id, status)
+        return key_between(after.position if after else None, before.position if before else None)
+
+    def post(self, request, task_id):
+        # get task instance
+        try:
+            task = Tasks.objects.select_related('board').get(id=task_id, board__deleted_at__isnull=True)
+        except Tasks.DoesNotExist:
+            return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+        # check if user is member or owner of the board
+        if not (task.board.owner == request.user or task.board.members.filter(id=request.user.id).exists()):
+            return Response({'error': 'You must be a member or owner of the board to move this task.'}, status=status.HTTP_403_FORBIDDEN)
+        # read target column and neighbours
+        new_status = request.data.get('status', task.status)
+        if new_status not in dict(Tasks.STATUS_CHOICES):
+            return Response({'error': 'Invalid status.'}, status=status.HTTP_400_BAD_REQUEST)
+        after_id, before_id = request.data.get('after_id'), request.data.get('before_id')
+        try:
+            try:
+                position = self.get_position(task, new_status, after_id, before_id)
+            except ValueError:
+                # neighbours share a key or are out of order: renumber the column and retry
+                Tasks.rebalance_column(task.board_id, new_status)
+                position = self.get_position(task, new_status, after_id, before_id)
+        except ValidationError as e:
+            return Response({'error': e.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # write only the moved row
+        moved_at = timezone.now()
+        Tasks.objects.filter(id=task.id).update(status=new_status, position=position, updated_at=moved_at, version=F('version') + 1)
+        # log column changes
+        if new_status != task.status:
+            activity.record(task.board_id, 'status_changed', user=request.user, task_id=task.id, old=task.status, new=new_status)
+            TaskStatusHistory.record(task.board_id, task.id, task.status, new_status, moved_at)
+        # renumber the column once keys get too long
+        if len(position) > settings.TASK_POSITION_MAX_LENGTH:
+            Tasks.rebalance_column(task.board_id, new_status)
+            position = Tasks.objects.values_list('position', flat=True).get(id=task.id)
+        # invalidate cached board payloads showing this task
+        invalidate_board(task.board)
+        # return new place of the task with status 200
+        return Response({'id': task.id, 'status': new_status, 'position': position}, status=status.HTTP_200_OK)
+
+
 class TaskCommentsView(APIView):
     # define required permission classes
     permission_classes = [IsAuthenticated, IsBoardMemberOrOwner]
+    # define throttle class
+    throttle_classes = [TaskWriteThrottle]
 
     def get_task(self, task_id):
         # retrieve task by ID or return None
         try:
-            return Tasks.objects.get(id=task_id)
+            return Tasks.objects.get(id=task_id, board__deleted_at__isnull=True)
         except Tasks.DoesNotExist:
             return None
 
@@ -274,12 +898,16 @@ class TaskCommentsView(APIView):
         # check if user is member or owner of the board
         if not (task.board.owner == request.user or task.board.members.filter(id=request.user.id).exists()):
             return Response({'error': 'You must be a member or owner of the board to view comments.'}, status=status.HTTP_403_FORBIDDEN)
-        # get all comments for the task
-        comments = task.comments.all()
-        # serialize comments
-        serializer = CommentSerializer(comments, many=True)
-        # return serialized data with status 200
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        # get one page of comments for the task with their authors in the same query
+        paginator = KeysetPagination()
+        comments = task.comments.select_related('user')
+        if list_mode(request):
+            comments = with_preview(comments, 'content')
+        comments = paginator.paginate_queryset(comments, request, self)
+        # serialize comments (previews only in list mode)
+        serializer = (CommentListSerializer if list_mode(request) else CommentSerializer)(comments, many=True)
+        # return serialized page with cursor links and status 200
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request, task_id):
         # get task instance
@@ -294,12 +922,20 @@ class TaskCommentsView(APIView):
         serializer = CommentSerializer(data=request.data, context={'request': request})
         # check if data is valid
         if serializer.is_valid():
-            # create comment with current user as author
-            comment = Comments.objects.create(
-                task=task,
-                author=request.user,
-                content=serializer.validated_data['content']
-            )
+            # create comment and bump the stored counter in one transaction
+            with sharding.atomic():
+                # create comment with current user as author
+                comment = Comments.objects.create(
+                    task=task,
+                    user=request.user,
+                    content=serializer.validated_data['content']
+                )
+                # increment in the database so parallel posts cannot lose updates
+                Tasks.objects.filter(id=task.id).update(comments_count=F('comments_count') + 1)
+                # the board detail shows comment counts
+                bump_versions([task.board_id])
+                # log the comment
+                activity.record(task.board_id, 'commented', user=request.user, task_id=task.id, comment_id=comment.id)
             # serialize created comment
             comment_serializer = CommentSerializer(comment)
             # return created comment data with status 201
@@ -311,11 +947,13 @@ class TaskCommentsView(APIView):
 class TaskCommentDetailView(APIView):
     # define required permission classes
     permission_classes = [IsAuthenticated, IsCommentAuthor]
+    # define throttle class
+    throttle_classes = [TaskWriteThrottle]
 
     def get_task(self, task_id):
         # retrieve task by ID or return None
         try:
-            return Tasks.objects.get(id=task_id)
+            return Tasks.objects.get(id=task_id, board__deleted_at__isnull=True)
         except Tasks.DoesNotExist:
             return None
 
@@ -326,6 +964,28 @@ class TaskCommentDetailView(APIView):
         except Comments.DoesNotExist:
             return None
 
+    def get_throttles(self):
+        # reads use the read budget, deletes the write budget
+        if self.request.method == 'GET':
+            return [BoardReadThrottle()]
+        return super().get_throttles()
+
+    def get(self, request, task_id, comment_id):
+        # get task instance
+        task = self.get_task(task_id)
+        # return 404 if task not found
+        if not task:
+            return Response({'error': 'Task not found'}, status=status.HTTP_404_NOT_FOUND)
+        # check if user is member or owner of the board
+        if not (task.board.owner_id == request.user.id or task.board_id in get_member_board_ids(request.user)):
+            return Response({'error': 'You must be a member or owner of the board to view comments.'}, status=status.HTTP_403_FORBIDDEN)
+        # get comment instance with its author
+        comment = self.get_comment(task, comment_id)
+        if not comment:
+            return Response({'error': 'Comment not found'}, status=status.HTTP_404_NOT_FOUND)
+        # return the full comment with status 200
+        return Response(CommentSerializer(comment).data, status=status.HTTP_200_OK)
+
     def delete(self, request, task_id, comment_id):
         # get task instance
         task = self.get_task(task_id)
@@ -339,7 +999,137 @@ class TaskCommentDetailView(APIView):
             return Response({'error': 'Comment not found'}, status=status.HTTP_404_NOT_FOUND)
         # check permissions (handled by IsCommentAuthor)
         self.check_object_permissions(request, comment)
-        # delete comment
-        comment.delete()
+        # delete comment and decrement the stored counter in one transaction
+        with sharding.atomic():
+            # only the request that actually removed the row decrements the counter
+            deleted, _ = Comments.objects.filter(id=comment.id).delete()
+            if deleted:
+                Tasks.objects.filter(id=task.id).update(comments_count=F('comments_count') - 1)
+                # the board detail shows comment counts
+                bump_versions([task.board_id])
         # return null with status 204
-        return Response(None, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        return Response(None, status=status.HTTP_204_NO_CONTENT)
+
+
+class MetricsView(APIView):
+    # define required permission class
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        # read all counters shared through the metrics store
+        counters = metrics.snapshot()
+        # return counters and derived hit rates with status 200
+        return Response({
+            'counters': counters,
+            'hit_rates': {
+                'board_list': metrics.ratio(counters, 'response_cache.board_list'),
+                'board_detail': metrics.ratio(counters, 'response_cache.board_detail'),
+            },
+            'compression': compression.summary(counters),
+        }, status=status.HTTP_200_OK)
+
+
+class ProfileListView(APIView):
+    # define required permission class
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        # list the kept profiles of slow requests, newest first
+        return Response(get_profile_store().list(), status=status.HTTP_200_OK)
+
+
+class ProfileDetailView(APIView):
+    # define required permission class
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, name):
+        # download one pstats dump (load it with pstats.Stats or snakeviz)
+        path = get_profile_store().path(name)
+        if path is None:
+            return Response({'error': 'Profile not found'}, status=status.HTTP_404_NOT_FOUND)
+        return FileResponse(path.open('rb'), as_attachment=True, filename=path.name)
+
+
+def build_sub_request(request, path, query):
+    # build a GET request for the url conf that reuses the caller's headers
+    sub = HttpRequest()
+    sub.method = 'GET'
+    sub.path = sub.path_info = path
+    sub.META = {**request.META, 'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query}
+    sub.GET = QueryDict(query)
+    return sub
+
+
+class BatchAuthentication(BaseAuthentication):
+    # authenticates a sub-request as the user and token of the batch request (no second token lookup)
+
+    def __init__(self, user, auth):
+        # remember the credentials the batch request was authenticated with
+        self.user = user
+        self.auth = auth
+
+    def authenticate(self, request):
+        # return the batch request's credentials
+        return self.user, self.auth
+
+
+class BatchView(APIView):
+    # runs several GET requests in one round trip; the sub-requests call the views directly, so they
+    # pass the views' authentication, permissions and throttles but skip the middleware (concurrency
+    # limit, N+1 detector, profiler, compression), which only sees the batch request itself
+
+    # define required permission class
+    permission_classes = [IsAuthenticated]
+
+    def run(self, request, item):
+        # resolve and run one sub-request, returning its status, headers and body
+        if isinstance(item, str):
+            item = {'path': item}
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return status.HTTP_400_BAD_REQUEST, {}, {'error': 'Each request needs a path.'}
+        if item.get('method', 'GET').upper() != 'GET':
+            return status.HTTP_405_METHOD_NOT_ALLOWED, {}, {'error': 'Only GET requests can be batched.'}
+        url = urlsplit(item['path'])
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return status.HTTP_404_NOT_FOUND, {}, {'error': 'Not found'}
+        # only synchronous API views can run inside this request
+        if not issubclass(getattr(match.func, 'cls', type), APIView) or match.func.cls is BatchView:
+            return status.HTTP_400_BAD_REQUEST, {}, {'error': 'This endpoint cannot be batched.'}
+        # the same view, authenticated with the credentials of the batch request
+        authentication = partial(BatchAuthentication, request.user, request.auth)
+        view = match.func.cls.as_view(**{**match.func.initkwargs, 'authentication_classes': [authentication]})
+        sub = build_sub_request(request._request, url.path, url.query)
+        sub.resolver_match = match
+        try:
+            with use_shard(shard_from_kwargs(match.kwargs) or current_shard()):
+                response = view(sub, *match.args, **match.kwargs)
+        except Exception:
+            logger.exception('Batched request to %s failed.', item['path'])
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, {}, {'error': 'Internal server error'}
+        # file downloads (profiles) have no data to embed; release their file here (response.close() would
+        # also send request_finished, which closes the database connections the batch request still uses)
+        if not isinstance(response, Response):
+            file = getattr(response, 'file_to_stream', None)
+            if file is not None:
+                file.close()
+            return status.HTTP_400_BAD_REQUEST, {}, {'error': 'This endpoint cannot be batched.'}
+        # keep the headers clients need (pagination links and retry hints)
+        headers = {name: response[name] for name in ('Link', 'Retry-After') if response.has_header(name)}
+        return response.status_code, headers, response.data
+
+    def post(self, request):
+        # read the list of sub-requests
+        items = request.data.get('requests') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Send a non-empty list of requests.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            return Response({'error': f'At most {settings.BATCH_MAX_REQUESTS} requests per batch.'}, status=status.HTTP_400_BAD_REQUEST)
+        # run the sub-requests one after another inside this request
+        results = []
+        for item in items:
+            code, headers, body = self.run(request, item)
+            results.append({'status': code, 'headers': headers, 'body': body})
+        # return all responses in request order with status 200
+        return Response(results, status=status.HTTP_200_OK)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class KanmindAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'kanmind_app'
+
+    def ready(self):
+        # copy users to the board shards when sharding is configured
+        from . import signals  # noqa: F401
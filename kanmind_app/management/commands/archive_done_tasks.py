@@ -0,0 +1,61 @@
+# standard bib imports
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+# local imports
+from kanmind_app import sharding
+from kanmind_app.models import Boards, Tasks, Comments, ArchivedTasks, ArchivedComments
+from kanmind_app.api.cache import invalidate_board
+
+# task fields copied into the archive table
+TASK_FIELDS = [
+    'id', 'board_id', 'title', 'description', 'status', 'priority', 'assignee_id',
+    'reviewer_id', 'creator_id', 'due_date', 'comments_count', 'created_at', 'updated_at',
+]
+# comment fields copied into the archive table
+COMMENT_FIELDS = ['id', 'task_id', 'user_id', 'content', 'created_at']
+
+
+class Command(BaseCommand):
+    help = 'Moves done tasks older than TASK_ARCHIVE_AFTER_DAYS and their comments into the archive tables.'
+
+    def add_arguments(self, parser):
+        # override the configured age
+        parser.add_argument('--days', type=int, default=None, help='Archive done tasks not updated for this many days.')
+        # define how many tasks are moved per transaction
+        parser.add_argument('--batch-size', type=int, default=200, help='Tasks moved per transaction.')
+
+    def handle(self, *args, **options):
+        # archive on every board shard
+        days = options['days'] if options['days'] is not None else settings.TASK_ARCHIVE_AFTER_DAYS
+        cutoff = timezone.now() - timedelta(days=days)
+        for alias in sharding.each_shard():
+            self.archive(cutoff, options['batch_size'])
+
+    def archive(self, cutoff, batch_size):
+        # select done tasks that have not been touched since the cutoff
+        candidates = Tasks.objects.filter(status='done', updated_at__lt=cutoff).order_by('id')
+        moved = 0
+        board_ids = set()
+        while True:
+            ids = list(candidates.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with sharding.atomic():
+                # read the tasks again under lock: tasks reopened or edited since the ids were picked stay where they are
+                tasks = list(candidates.filter(id__in=ids).select_for_update().values(*TASK_FIELDS))
+                ids = [row['id'] for row in tasks]
+                # copy tasks and comments, then remove the originals
+                ArchivedTasks.objects.bulk_create([ArchivedTasks(**row) for row in tasks])
+                comments = Comments.objects.filter(task_id__in=ids).values(*COMMENT_FIELDS)
+                ArchivedComments.objects.bulk_create([ArchivedComments(**row) for row in comments], batch_size=500)
+                board_ids.update(row['board_id'] for row in tasks)
+                Comments.objects.filter(task_id__in=ids).delete()
+                Tasks.objects.filter(id__in=ids).delete()
+            moved += len(ids)
+        # drop cached board payloads that still contain the moved tasks
+        for board in Boards.all_objects.filter(id__in=board_ids):
+            invalidate_board(board)
+        self.stdout.write(self.style.SUCCESS(f'{moved} task(s) archived from {len(board_ids)} board(s).'))
@@ -0,0 +1,62 @@
+# standard bib imports
+import time
+from datetime import date, timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils.text import compress_string
+
+# third party imports
+from rest_framework.renderers import JSONRenderer
+
+# local imports
+from kanmind_app.models import Boards, Tasks
+from kanmind_app.api.columnar import encode_tasks
+from kanmind_app.api.serializers import TasksSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compares encode time and size of the default and the columnar task list format.'
+
+    def add_arguments(self, parser):
+        # define data size and repetitions
+        parser.add_argument('--tasks', type=int, default=5000, help='Tasks in the list.')
+        parser.add_argument('--rounds', type=int, default=5, help='Encodings per format (the fastest one counts).')
+
+    def handle(self, *args, **options):
+        # create a throwaway user, board and tasks and always remove them again
+        user = User.objects.create_user(username='bench-task-encoding', email='bench-task-encoding@example.com', first_name='Bench', last_name='User')
+        board = Boards.objects.create(title='bench', owner=user)
+        statuses = [value for value, _ in Tasks.STATUS_CHOICES]
+        priorities = [value for value, _ in Tasks.PRIORITY_CHOICES]
+        Tasks.objects.bulk_create([
+            Tasks(
+                board=board, title=f'Task {number}', description='Benchmark task description.',
+                status=statuses[number % len(statuses)], priority=priorities[number % len(priorities)],
+                assignee=user, reviewer=user, creator=user, due_date=date.today() + timedelta(days=number % 30),
+                position=f'a{number}'
+            )
+            for number in range(options['tasks'])
+        ], batch_size=500)
+        tasks = Tasks.objects.filter(assignee=user).order_by('id')
+        try:
+            results = {
+                'default': self.bench(lambda: TasksSerializer(tasks.select_related('assignee', 'reviewer'), many=True).data, options['rounds']),
+                'columnar': self.bench(lambda: encode_tasks([tasks]), options['rounds']),
+            }
+        finally:
+            board.delete()
+            user.delete()
+        for name, (seconds, content) in results.items():
+            self.stdout.write(
+                f'{name:>8}: {seconds * 1000:8.1f} ms, {len(content):9d} bytes, {len(compress_string(content, max_random_bytes=0)):8d} bytes gzipped'
+            )
+
+    def bench(self, build, rounds):
+        # time building and rendering the payload (query included, as in a request)
+        best, content = None, None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            content = JSONRenderer().render(build())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best, content
@@ -0,0 +1,87 @@
+# standard bib imports
+import random
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.db.models.functions import Length
+from django.test.utils import CaptureQueriesContext
+
+# third party imports
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+# local imports
+from kanmind_app.models import Boards, Tasks
+from kanmind_app.positions import sequential_keys
+from kanmind_app.api.views import TaskMoveView
+
+
+class Rollback(Exception):
+    # raised to discard the benchmark data
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks drag-and-drop moves inside a large column (all data is rolled back).'
+
+    def add_arguments(self, parser):
+        # define column size and number of moves
+        parser.add_argument('--size', type=int, default=10000, help='Number of cards in the column.')
+        parser.add_argument('--moves', type=int, default=1000, help='Number of random moves.')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed.')
+
+    def handle(self, *args, **options):
+        # run everything in a transaction that is rolled back at the end
+        try:
+            with transaction.atomic():
+                self.run(options['size'], options['moves'], random.Random(options['seed']))
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, size, moves, rng):
+        # build a column with sequential keys
+        user = User.objects.create(username='bench-task-moves')
+        board = Boards.objects.create(title='bench', owner=user)
+        Tasks.objects.bulk_create(
+            [Tasks(board=board, title=f'card {i}', position=key) for i, key in enumerate(sequential_keys(size))],
+            batch_size=1000
+        )
+        # keep the column order in memory to pick neighbours like a client would
+        order = list(Tasks.objects.filter(board=board).order_by('position').values_list('id', flat=True))
+        # send every move through the real endpoint (without throttling)
+        factory = APIRequestFactory()
+        view = TaskMoveView.as_view(throttle_classes=[])
+        queries = 0
+        renumbered_columns = 0
+        # rows an integer renumbering scheme would have rewritten for the same moves
+        renumbered = 0
+        start = time.perf_counter()
+        for _ in range(moves):
+            task_id = order.pop(rng.randrange(len(order)))
+            index = rng.randint(0, len(order))
+            renumbered += len(order) - index + 1
+            after_id = order[index - 1] if index > 0 else None
+            before_id = order[index] if index < len(order) else None
+            request = factory.post(
+                f'/api/tasks/{task_id}/move/', {'status': 'to-do', 'after_id': after_id, 'before_id': before_id}, format='json'
+            )
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as captured:
+                response = view(request, task_id=task_id)
+            if response.status_code != 200:
+                raise CommandError(f'Move failed with status {response.status_code}: {response.data}')
+            queries += len(captured.captured_queries)
+            # a renumbered column rewrites every card with one bulk update (CASE per row)
+            renumbered_columns += any('CASE' in query['sql'] for query in captured.captured_queries)
+            order.insert(index, task_id)
+        elapsed = time.perf_counter() - start
+        written = moves + renumbered_columns * size
+        longest = Tasks.objects.filter(board=board).aggregate(n=Max(Length('position')))['n']
+        self.stdout.write(
+            f'{moves} moves in a {size} card column: {elapsed * 1000 / moves:.3f} ms/move, '
+            f'{written / moves:.1f} row(s) written per move (renumbering: {renumbered / moves:.0f}), '
+            f'{queries / moves:.1f} queries per move ({queries} in total), '
+            f'{renumbered_columns} column renumbering(s), longest key {longest} chars'
+        )
@@ -0,0 +1,63 @@
+# standard bib imports
+import time
+import tracemalloc
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+# third party imports
+from rest_framework.renderers import JSONRenderer
+
+# local imports
+from kanmind_app.models import Boards, Tasks
+from kanmind_app.api.serializers import TasksSerializer, TaskListSerializer
+from kanmind_app.api.views import with_preview
+
+
+class Command(BaseCommand):
+    help = 'Compares memory, time and size of full task lists and list mode previews on a board with large descriptions.'
+
+    def add_arguments(self, parser):
+        # define data size and repetitions
+        parser.add_argument('--tasks', type=int, default=500, help='Tasks on the board.')
+        parser.add_argument('--description-kb', type=int, default=20, help='Size of every description in KB.')
+        parser.add_argument('--rounds', type=int, default=3, help='Runs per mode (the fastest one counts).')
+
+    def handle(self, *args, **options):
+        # create a throwaway user, board and tasks and always remove them again
+        user = User.objects.create_user(username='bench-task-previews', email='bench-task-previews@example.com')
+        board = Boards.objects.create(title='bench', owner=user)
+        description = ('Lorem ipsum dolor sit amet. ' * (options['description_kb'] * 40))[:options['description_kb'] * 1024]
+        Tasks.objects.bulk_create([
+            Tasks(board=board, title=f'Task {number}', description=description, assignee=user, reviewer=user, creator=user)
+            for number in range(options['tasks'])
+        ], batch_size=100)
+        tasks = Tasks.objects.filter(board=board).select_related('assignee', 'reviewer').order_by('id')
+        try:
+            results = {
+                # clone the queryset every run so no run reuses the rows of the one before
+                'full': self.bench(lambda: TasksSerializer(tasks.all(), many=True).data, options['rounds']),
+                'list': self.bench(lambda: TaskListSerializer(with_preview(tasks, 'description'), many=True).data, options['rounds']),
+            }
+        finally:
+            board.delete()
+            user.delete()
+        for name, (seconds, peak, size) in results.items():
+            self.stdout.write(
+                f'{name:>4}: {seconds * 1000:8.1f} ms ({options["tasks"] / seconds:8.0f} tasks/s), '
+                f'peak {peak / 1024 / 1024:7.1f} MB, {size:10d} bytes'
+            )
+
+    def bench(self, build, rounds):
+        # time loading, serializing and rendering the list (query included, as in a request)
+        best, size = None, 0
+        for _ in range(rounds):
+            start = time.perf_counter()
+            size = len(JSONRenderer().render(build()))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        # trace the peak memory in an extra run (tracing would distort the timing)
+        tracemalloc.start()
+        JSONRenderer().render(build())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return best, peak, size
@@ -0,0 +1,77 @@
+# standard bib imports
+import json
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# script run in a fresh interpreter: import an entry point and time its first request
+PROBE = '''
+import importlib, io, json, sys, time
+entry_point, path, token, host = sys.argv[1:5]
+start = time.perf_counter()
+module = importlib.import_module(entry_point)
+ready = time.perf_counter()
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': host,
+    'SERVER_PORT': '80', 'HTTP_HOST': host, 'SERVER_PROTOCOL': 'HTTP/1.1',
+    'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+    'wsgi.version': (1, 0), 'wsgi.multithread': False, 'wsgi.multiprocess': True, 'wsgi.run_once': False,
+}
+if token:
+    environ['HTTP_AUTHORIZATION'] = 'Token ' + token
+status = []
+b''.join(module.application(environ, lambda s, headers, exc_info=None: status.append(s)))
+done = time.perf_counter()
+from core import warmup
+print(json.dumps({
+    'startup_ms': round((ready - start) * 1000, 2),
+    'first_request_ms': round((done - ready) * 1000, 2),
+    'status': status[0],
+    'warmup': warmup.report,
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Measures startup time and first request latency of the WSGI entry points in fresh processes.'
+
+    def add_arguments(self, parser):
+        # define the request that is timed
+        parser.add_argument('--path', default='/api/boards/', help='Path of the first request.')
+        parser.add_argument('--token', default='', help='Auth token so the request reaches the database.')
+        parser.add_argument('--host', default='localhost', help='Host header of the request.')
+        # define the entry points and the latency budget
+        parser.add_argument('--entry-points', nargs='+', default=['core.wsgi', 'core.wsgi_production'])
+        parser.add_argument('--max-first-request-ms', type=float, default=250, help='Fail when the last entry point is slower.')
+        parser.add_argument('--runs', type=int, default=3, help='Fresh processes per entry point (median is used).')
+
+    def probe(self, entry_point, options):
+        # run the probe in a new interpreter and return its measurements
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE, entry_point, options['path'], options['token'], options['host']],
+            cwd=settings.BASE_DIR, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'{entry_point} failed:\n{result.stderr}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        # measure every entry point a few times and report the medians
+        medians = {}
+        for entry_point in options['entry_points']:
+            runs = sorted((self.probe(entry_point, options) for _ in range(options['runs'])), key=lambda r: r['first_request_ms'])
+            median = runs[len(runs) // 2]
+            medians[entry_point] = median
+            self.stdout.write(
+                f"{entry_point}: startup {median['startup_ms']} ms, first request {median['first_request_ms']} ms ({median['status']})"
+            )
+            for module, ms in median['warmup'].get('imports', {}).items():
+                self.stdout.write(f'    import {module}: {ms} ms')
+        # check the budget against the last (production) entry point
+        last = medians[options['entry_points'][-1]]
+        if last['first_request_ms'] > options['max_first_request_ms']:
+            raise CommandError(
+                f"First request took {last['first_request_ms']} ms, budget is {options['max_first_request_ms']} ms."
+            )
+        self.stdout.write(self.style.SUCCESS('First request latency within budget.'))
@@ -0,0 +1,59 @@
+# standard bib imports
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models.fields import AutoFieldMixin
+
+# local imports
+from kanmind_app.sharding import shard_aliases
+from kanmind_app.signals import replicate_users
+
+
+class Command(BaseCommand):
+    help = 'Migrates every board shard, moves its id sequences into its own id range and copies the users onto it.'
+
+    def add_arguments(self, parser):
+        # define how many users are copied per query
+        parser.add_argument('--batch-size', type=int, default=500, help='Users copied per batch.')
+
+    def handle(self, *args, **options):
+        # prepare the shards in order; shard 0 keeps the ids it already has
+        for number, alias in enumerate(shard_aliases()):
+            call_command('migrate', database=alias, verbosity=0)
+            start = number << settings.BOARD_SHARD_ID_BITS
+            if number:
+                self.seed_sequences(alias, start)
+                self.copy_users(alias, options['batch_size'])
+            self.stdout.write(f'{alias}: ids from {start}')
+        self.stdout.write(self.style.SUCCESS(f'{len(shard_aliases())} shard(s) ready.'))
+
+    def seed_sequences(self, alias, start):
+        # make the auto increment ids of every board table continue at start (or above existing rows)
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            for model in apps.get_app_config('kanmind_app').get_models():
+                if not isinstance(model._meta.pk, AutoFieldMixin):
+                    continue
+                table, column = model._meta.db_table, model._meta.pk.column
+                if connection.vendor == 'sqlite':
+                    cursor.execute(
+                        'INSERT INTO sqlite_sequence (name, seq) SELECT %s, 0 '
+                        'WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)', [table, table]
+                    )
+                    cursor.execute('UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s', [start, table])
+                elif connection.vendor == 'postgresql':
+                    cursor.execute(
+                        f'SELECT setval(pg_get_serial_sequence(%s, %s), GREATEST(%s, (SELECT COALESCE(MAX("{column}"), 0) FROM "{table}")))',
+                        [table, column, start]
+                    )
+                else:
+                    raise CommandError(f'Cannot move id sequences on {connection.vendor}.')
+
+    def copy_users(self, alias, batch_size):
+        # copy all users of default onto the shard
+        users = User.objects.using('default').order_by('id')
+        for offset in range(0, users.count(), batch_size):
+            replicate_users(list(users[offset:offset + batch_size]), [alias])
@@ -0,0 +1,63 @@
+# standard bib imports
+import time
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+# local imports
+from kanmind_app import sharding
+from kanmind_app.models import Boards, BoardMember, Tasks, Comments, BoardPurge, ArchivedTasks, ArchivedComments, ActivityLog, OverdueTasks, TaskStatusHistory, BoardFlowMetrics
+
+
+class Command(BaseCommand):
+    help = 'Deletes soft deleted boards in small batches with short transactions.'
+
+    def add_arguments(self, parser):
+        # define how many rows are deleted per transaction
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows deleted per transaction.')
+        # define the pause between batches so other writers can take the lock
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to sleep between batches.')
+        # keep running and poll for new work
+        parser.add_argument('--loop', action='store_true', help='Keep polling for newly deleted boards.')
+        parser.add_argument('--interval', type=float, default=30, help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        # process pending purges once or until interrupted
+        while True:
+            for alias in sharding.each_shard():
+                for purge in BoardPurge.objects.filter(finished_at__isnull=True).order_by('created_at'):
+                    self.purge_board(purge, options['batch_size'], options['pause'])
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def delete_in_batches(self, purge, queryset, counter, batch_size, pause):
+        # delete rows of the queryset batch by batch and record the progress
+        while True:
+            ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return
+            with sharding.atomic():
+                deleted = queryset.model.objects.filter(id__in=ids).delete()[1].get(queryset.model._meta.label, 0)
+                if counter:
+                    BoardPurge.objects.filter(id=purge.id).update(**{counter: F(counter) + deleted})
+            time.sleep(pause)
+
+    def purge_board(self, purge, batch_size, pause):
+        # remove the board bottom up: comments, tasks, members, logs and snapshots and finally the board row (which cascades nothing then)
+        board_id = purge.board_id
+        self.delete_in_batches(purge, Comments.objects.filter(task__board_id=board_id), 'comments_deleted', batch_size, pause)
+        self.delete_in_batches(purge, Tasks.objects.filter(board_id=board_id), 'tasks_deleted', batch_size, pause)
+        self.delete_in_batches(purge, ArchivedComments.objects.filter(task__board_id=board_id), 'comments_deleted', batch_size, pause)
+        self.delete_in_batches(purge, ArchivedTasks.objects.filter(board_id=board_id), 'tasks_deleted', batch_size, pause)
+        self.delete_in_batches(purge, BoardMember.objects.filter(board_id=board_id), 'members_deleted', batch_size, pause)
+        for model in (ActivityLog, TaskStatusHistory, OverdueTasks, BoardFlowMetrics):
+            self.delete_in_batches(purge, model.objects.filter(board_id=board_id), None, batch_size, pause)
+        with sharding.atomic():
+            Boards.all_objects.filter(id=board_id, deleted_at__isnull=False).delete()
+            BoardPurge.objects.filter(id=purge.id).update(finished_at=timezone.now())
+        purge.refresh_from_db()
+        self.stdout.write(
+            f'board {board_id}: {purge.comments_deleted} comments, '
+            f'{purge.tasks_deleted} tasks, {purge.members_deleted} members deleted'
+        )
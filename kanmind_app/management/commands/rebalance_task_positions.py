@@ -0,0 +1,38 @@
+# standard bib imports
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.db.models.functions import Length
+
+# local imports
+from kanmind_app import sharding
+from kanmind_app.models import Tasks
+
+
+class Command(BaseCommand):
+    help = 'Renumbers task columns whose position keys got too long or collide.'
+
+    def add_arguments(self, parser):
+        # override the configured key length limit
+        parser.add_argument('--max-length', type=int, default=None, help='Renumber columns with longer keys.')
+
+    def handle(self, *args, **options):
+        # rebalance every board shard
+        max_length = options['max_length'] or settings.TASK_POSITION_MAX_LENGTH
+        for alias in sharding.each_shard():
+            self.rebalance(max_length)
+
+    def rebalance(self, max_length):
+        # find columns with long keys and columns with duplicate keys
+        long_keys = Tasks.objects.annotate(key_length=Length('position')).filter(key_length__gt=max_length)
+        columns = set(long_keys.values_list('board_id', 'status').distinct())
+        duplicates = (
+            Tasks.objects.values('board_id', 'status', 'position')
+            .annotate(n=Count('id')).filter(n__gt=1).values_list('board_id', 'status')
+        )
+        columns.update(duplicates)
+        # renumber every affected column in its own transaction
+        for board_id, status in sorted(columns):
+            count = Tasks.rebalance_column(board_id, status)
+            self.stdout.write(f'board {board_id} / {status}: {count} task(s) renumbered')
+        self.stdout.write(self.style.SUCCESS(f'{len(columns)} column(s) rebalanced.'))
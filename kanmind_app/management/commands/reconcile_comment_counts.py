@@ -0,0 +1,47 @@
+# standard bib imports
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, F
+from django.db.models.functions import Coalesce
+
+# local imports
+from kanmind_app import sharding
+from kanmind_app.models import Tasks, Comments
+
+
+class Command(BaseCommand):
+    help = 'Recomputes Tasks.comments_count from the comments table and fixes any drift.'
+
+    def add_arguments(self, parser):
+        # only report drift without writing
+        parser.add_argument('--dry-run', action='store_true', help='Report drifted tasks without fixing them.')
+        # limit the number of rows fixed per transaction
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of tasks fixed per transaction.')
+
+    def handle(self, *args, **options):
+        # reconcile every board shard
+        for alias in sharding.each_shard():
+            self.reconcile(options)
+
+    def reconcile(self, options):
+        # count the real number of comments per task in a subquery
+        actual = Comments.objects.filter(task=OuterRef('pk')).order_by().values('task').annotate(c=Count('id')).values('c')
+        drifted = (
+            Tasks.objects.annotate(actual=Coalesce(Subquery(actual), 0))
+            .exclude(comments_count=F('actual'))
+            .values_list('id', 'comments_count', 'actual')
+        )
+        rows = list(drifted)
+        for task_id, stored, real in rows:
+            self.stdout.write(f'task {task_id}: stored {stored}, actual {real}')
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'{len(rows)} drifted task(s) found.'))
+            return
+        # fix in small transactions, recounting inside each one so concurrent writes are respected
+        ids = [row[0] for row in rows]
+        batch_size = options['batch_size']
+        for start in range(0, len(ids), batch_size):
+            with sharding.atomic():
+                Tasks.objects.filter(id__in=ids[start:start + batch_size]).update(
+                    comments_count=Coalesce(Subquery(actual), 0)
+                )
+        self.stdout.write(self.style.SUCCESS(f'{len(rows)} task(s) reconciled.'))
@@ -0,0 +1,122 @@
+# standard bib imports
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from django.utils import timezone
+
+# local imports
+from kanmind_app import sharding
+from kanmind_app.models import Boards, TaskStatusHistory, BoardFlowMetrics
+
+# rollup columns counting the tasks of each status
+STATUS_COLUMNS = {'to-do': 'to_do', 'in-progress': 'in_progress', 'review': 'review', 'done': 'done'}
+
+
+class Command(BaseCommand):
+    help = 'Adds the task status transitions since the last run to the daily flow metrics of every board.'
+
+    def add_arguments(self, parser):
+        # define how many rows are read and written per query
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows read and inserted per query.')
+        # define how many days are computed and written together
+        parser.add_argument('--window-days', type=int, default=31, help='Days computed and written per transaction.')
+        # allow recomputing everything from the full history
+        parser.add_argument('--rebuild', action='store_true', help='Drop all rollups and start from the first transition.')
+
+    def handle(self, *args, **options):
+        # roll up every board shard up to today
+        today = timezone.localdate()
+        for alias in sharding.each_shard():
+            self.rollup(today, options['rebuild'], options['batch_size'], max(options['window_days'], 1))
+
+    def rollup(self, today, rebuild, batch_size, window):
+        # continue at the last rolled up day (it may have been incomplete) or at the first transition
+        last = None if rebuild else BoardFlowMetrics.objects.aggregate(day=Max('day'))['day']
+        if last is None:
+            first = TaskStatusHistory.objects.aggregate(at=Min('changed_at'))['at']
+            if first is None:
+                self.stdout.write('No status history to roll up.')
+                return
+            start = timezone.localdate(first)
+        else:
+            start = last
+        latest = TaskStatusHistory.objects.aggregate(at=Max('changed_at'))['at']
+        end = max(timezone.localdate(latest), today) if latest else today
+        # start from the counts at the end of the day before (rows exist for every day since a board's first transition)
+        state = {}
+        if not rebuild:
+            previous = BoardFlowMetrics.objects.filter(day=start - timedelta(days=1))
+            for row in previous.values('board_id', *STATUS_COLUMNS.values()):
+                state[row.pop('board_id')] = row
+        deleted = set(Boards.all_objects.filter(deleted_at__isnull=False).values_list('id', flat=True))
+        # compute and replace one window of days at a time, so only the board counts and one window are in memory
+        written = 0
+        window_start = start
+        while window_start <= end:
+            window_end = min(window_start + timedelta(days=window - 1), end)
+            rows = self.window_rows(state, deleted, window_start, window_end, batch_size)
+            with sharding.atomic():
+                BoardFlowMetrics.objects.filter(day__gte=window_start, day__lte=window_end).delete()
+                BoardFlowMetrics.objects.bulk_create(rows, batch_size=batch_size)
+            written += len(rows)
+            window_start = window_end + timedelta(days=1)
+        # a rebuild also drops rows outside the recomputed days
+        if rebuild:
+            BoardFlowMetrics.objects.exclude(day__gte=start, day__lte=end).delete()
+        self.stdout.write(self.style.SUCCESS(f'{written} flow metric row(s) written for {start} to {end}.'))
+
+    def window_rows(self, state, deleted, start, end, batch_size):
+        # carry the counts forward day by day and add each day's transitions (updates state in place)
+        deltas = self.collect(start, end, batch_size)
+        rows = []
+        for offset in range((end - start).days + 1):
+            current = start + timedelta(days=offset)
+            changes = deltas.get(current, {})
+            for board_id, counter in changes.items():
+                counts = state.setdefault(board_id, dict.fromkeys(STATUS_COLUMNS.values(), 0))
+                for column in STATUS_COLUMNS.values():
+                    counts[column] += counter[column]
+            for board_id, counts in state.items():
+                if board_id in deleted:
+                    continue
+                counter = changes.get(board_id, Counter())
+                rows.append(BoardFlowMetrics(
+                    board_id=board_id, day=current, created=counter['created'], completed=counter['completed'],
+                    cycle_time_total=counter['cycle_time_total'], cycle_time_count=counter['cycle_time_count'], **counts
+                ))
+        return rows
+
+    def collect(self, start, end, batch_size):
+        # sum up the transitions from start to end (inclusive) per day and board
+        deltas = defaultdict(lambda: defaultdict(Counter))
+        completions = defaultdict(list)
+        since = timezone.make_aware(datetime.combine(start, time.min))
+        until = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+        transitions = TaskStatusHistory.objects.filter(changed_at__gte=since, changed_at__lt=until).order_by().values_list(
+            'board_id', 'task_id', 'old_status', 'new_status', 'changed_at'
+        )
+        for board_id, task_id, old_status, new_status, changed_at in transitions.iterator(chunk_size=batch_size):
+            day = timezone.localdate(changed_at)
+            counter = deltas[day][board_id]
+            if old_status:
+                counter[STATUS_COLUMNS[old_status]] -= 1
+            if new_status:
+                counter[STATUS_COLUMNS[new_status]] += 1
+            if old_status is None:
+                counter['created'] += 1
+            if new_status == 'done':
+                counter['completed'] += 1
+                # tasks created as done have no cycle time
+                if old_status is not None:
+                    completions[task_id].append((board_id, day, changed_at))
+        # measure cycle times from the creation row of each completed task
+        task_ids = list(completions)
+        for offset in range(0, len(task_ids), batch_size):
+            created = TaskStatusHistory.objects.filter(task_id__in=task_ids[offset:offset + batch_size], old_status__isnull=True)
+            for task_id, created_at in created.values_list('task_id', 'changed_at'):
+                for board_id, day, done_at in completions[task_id]:
+                    counter = deltas[day][board_id]
+                    counter['cycle_time_total'] += max((done_at - created_at).total_seconds(), 0)
+                    counter['cycle_time_count'] += 1
+        return deltas
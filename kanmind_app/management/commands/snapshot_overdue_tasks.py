@@ -0,0 +1,54 @@
+# standard bib imports
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+# local imports
+from kanmind_app import sharding
+from kanmind_app.models import Tasks, OverdueTasks
+
+# task fields copied into the snapshot table
+TASK_FIELDS = ['id', 'board_id', 'assignee_id', 'title', 'status', 'priority', 'due_date']
+
+
+class Command(BaseCommand):
+    help = 'Stores the open tasks that are past their due date as the overdue snapshot of a day.'
+
+    def add_arguments(self, parser):
+        # define the snapshot day and how long old snapshots are kept
+        parser.add_argument('--date', default=None, help='Snapshot day (YYYY-MM-DD), today by default.')
+        parser.add_argument('--keep-days', type=int, default=30, help='Delete snapshots older than this many days.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows inserted per query.')
+
+    def handle(self, *args, **options):
+        # resolve the snapshot day
+        day = timezone.localdate()
+        if options['date']:
+            try:
+                day = parse_date(options['date'])
+            except ValueError:
+                day = None
+            if day is None:
+                raise CommandError('--date must be a date (YYYY-MM-DD).')
+        for alias in sharding.each_shard():
+            self.snapshot(day, options['keep_days'], options['batch_size'])
+
+    def snapshot(self, day, keep_days, batch_size):
+        # read overdue open tasks through the partial due date index
+        tasks = Tasks.objects.filter(
+            ~Q(status='done'), due_date__isnull=False, due_date__lt=day, board__deleted_at__isnull=True
+        ).order_by('due_date', 'id').values(*TASK_FIELDS)
+        rows = [
+            OverdueTasks(snapshot_date=day, task_id=task.pop('id'), days_overdue=(day - task['due_date']).days, **task)
+            for task in tasks.iterator(chunk_size=batch_size)
+        ]
+        # replace the day's snapshot and drop expired ones in one transaction
+        with sharding.atomic():
+            OverdueTasks.objects.filter(snapshot_date=day).delete()
+            OverdueTasks.objects.bulk_create(rows, batch_size=batch_size)
+            expired, _ = OverdueTasks.objects.filter(snapshot_date__lt=day - timedelta(days=keep_days)).delete()
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(rows)} overdue task(s) stored for {day}, {expired} expired row(s) removed.'
+        ))
@@ -0,0 +1,31 @@
+# standard bib imports
+from django.core.exceptions import MiddlewareNotUsed
+
+# local imports
+from kanmind_app.sharding import select_shard, reset_shard, shard_from_kwargs, sharding_enabled
+
+
+class ShardRoutingMiddleware:
+    # selects the board shard of a request from the board, task or comment id in its url
+
+    def __init__(self, get_response):
+        # only needed when boards are spread over several databases
+        if not sharding_enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # run the request and forget the selected shard afterwards
+        request.shard_token = None
+        try:
+            return self.get_response(request)
+        finally:
+            if request.shard_token is not None:
+                reset_shard(request.shard_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # select the shard before the view (and its permission checks) runs
+        alias = shard_from_kwargs(view_kwargs)
+        if alias:
+            request.shard_token = select_shard(alias)
+        return None
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-19 02:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_comments_count(apps, schema_editor):
+    # copy the current number of comments into the new column
+    alias = schema_editor.connection.alias
+    Tasks = apps.get_model('kanmind_app', 'Tasks')
+    Comments = apps.get_model('kanmind_app', 'Comments')
+    counts = Comments.objects.using(alias).filter(task=OuterRef('pk')).order_by().values('task').annotate(c=Count('id')).values('c')
+    Tasks.objects.using(alias).update(comments_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_app', '0002_comments_task_keyset_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasks',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_comments_count, migrations.RunPython.noop),
+    ]
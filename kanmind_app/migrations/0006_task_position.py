@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+from kanmind_app.positions import sequential_keys
+
+
+def backfill_positions(apps, schema_editor):
+    # number every existing column in id order
+    alias = schema_editor.connection.alias
+    Tasks = apps.get_model('kanmind_app', 'Tasks')
+    columns = Tasks.objects.using(alias).values_list('board_id', 'status').distinct()
+    for board_id, status in columns:
+        tasks = list(Tasks.objects.using(alias).filter(board_id=board_id, status=status).order_by('id').only('id'))
+        for task, key in zip(tasks, sequential_keys(len(tasks))):
+            task.position = key
+        Tasks.objects.using(alias).bulk_update(tasks, ['position'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_app', '0005_task_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasks',
+            name='position',
+            field=models.CharField(default='a0', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='tasks',
+            index=models.Index(fields=['board', 'status', 'position'], name='tasks_column_position_idx'),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_app', '0006_task_position'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(blank=True, null=True)),
+                ('verb', models.CharField(choices=[('status_changed', 'Status changed'), ('assigned', 'Assigned'), ('reviewer_changed', 'Reviewer changed'), ('commented', 'Commented')], max_length=30)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField()),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='kanmind_app.boards')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activity', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'activity_log',
+                'indexes': [models.Index(fields=['board', 'created_at', 'id'], name='activity_board_feed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_app', '0007_activity_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OverdueTasks',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField()),
+                ('task_id', models.BigIntegerField()),
+                ('title', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('to-do', 'To Do'), ('in-progress', 'In Progress'), ('review', 'Review'), ('done', 'Done')], max_length=20)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=20)),
+                ('due_date', models.DateField()),
+                ('days_overdue', models.PositiveIntegerField()),
+            ],
+            options={
+                'db_table': 'overdue_tasks',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tasks',
+            index=models.Index(condition=models.Q(models.Q(('status', 'done'), _negated=True), ('due_date__isnull', False)), fields=['due_date', 'id'], name='tasks_open_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='overduetasks',
+            name='assignee',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='overdue_tasks', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='overduetasks',
+            name='board',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='overdue_tasks', to='kanmind_app.boards'),
+        ),
+        migrations.AddIndex(
+            model_name='overduetasks',
+            index=models.Index(fields=['snapshot_date', 'board'], name='overdue_tasks_board_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='overduetasks',
+            constraint=models.UniqueConstraint(fields=('snapshot_date', 'task_id'), name='overdue_tasks_unique_task'),
+        ),
+    ]
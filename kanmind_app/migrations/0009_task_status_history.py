@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_history(apps, schema_editor):
+    # start the history of every existing task with its current status at its creation time
+    alias = schema_editor.connection.alias
+    Tasks = apps.get_model('kanmind_app', 'Tasks')
+    TaskStatusHistory = apps.get_model('kanmind_app', 'TaskStatusHistory')
+    rows = Tasks.objects.using(alias).values_list('id', 'board_id', 'status', 'created_at')
+    TaskStatusHistory.objects.using(alias).bulk_create([
+        TaskStatusHistory(task_id=task_id, board_id=board_id, new_status=status, changed_at=created_at)
+        for task_id, board_id, status, created_at in rows.iterator(chunk_size=500)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_app', '0008_overdue_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BoardFlowMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('to_do', models.IntegerField(default=0)),
+                ('in_progress', models.IntegerField(default=0)),
+                ('review', models.IntegerField(default=0)),
+                ('done', models.IntegerField(default=0)),
+                ('created', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('cycle_time_total', models.FloatField(default=0)),
+                ('cycle_time_count', models.PositiveIntegerField(default=0)),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flow_metrics', to='kanmind_app.boards')),
+            ],
+            options={
+                'db_table': 'board_flow_metrics',
+                'constraints': [models.UniqueConstraint(fields=('board', 'day'), name='board_flow_metrics_unique_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskStatusHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('old_status', models.CharField(blank=True, choices=[('to-do', 'To Do'), ('in-progress', 'In Progress'), ('review', 'Review'), ('done', 'Done')], max_length=20, null=True)),
+                ('new_status', models.CharField(blank=True, choices=[('to-do', 'To Do'), ('in-progress', 'In Progress'), ('review', 'Review'), ('done', 'Done')], max_length=20, null=True)),
+                ('changed_at', models.DateTimeField()),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_history', to='kanmind_app.boards')),
+            ],
+            options={
+                'db_table': 'task_status_history',
+                'indexes': [models.Index(fields=['changed_at', 'id'], name='status_history_time_idx'), models.Index(fields=['task_id', 'changed_at'], name='status_history_task_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_history, migrations.RunPython.noop),
+    ]
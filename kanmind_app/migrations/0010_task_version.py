@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kanmind_app', '0009_task_status_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasks',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
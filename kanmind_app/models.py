@@ -1,6 +1,15 @@
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.contrib.auth.models import User
 
+from .positions import key_between, sequential_keys
+from .sharding import shard_for_id
+
+class ActiveBoardsManager(models.Manager):
+    # hides boards that were soft deleted and wait for the purge job
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 class Boards(models.Model):
     # defines the title of the board
     title = models.CharField(max_length=255)
@@ -12,6 +21,13 @@ class Boards(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     # stores the update date of the board
     updated_at = models.DateTimeField(auto_now=True)
+    # stores when the board was soft deleted (null while the board is active)
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    # default manager only returns active boards
+    objects = ActiveBoardsManager()
+    # manager including soft deleted boards (used by the purge job)
+    all_objects = models.Manager()
 
     class Meta:
         # defines the name of the table in the database
@@ -73,6 +89,12 @@ class Tasks(models.Model):
     )
     # define due date for the task
     due_date = models.DateField(null=True, blank=True)
+    # stores the number of comments (maintained atomically by the comment endpoints)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    # stores the fractional index of the task inside its column (see positions.py)
+    position = models.CharField(max_length=255, default='a0')
+    # counts the edits of the task (used to detect concurrent edits)
+    version = models.PositiveIntegerField(default=1)
     # store task creation date
     created_at = models.DateTimeField(auto_now_add=True)
     # store task update date
@@ -81,6 +103,51 @@ class Tasks(models.Model):
     class Meta:
         # define database table name
         db_table = 'tasks'
+        indexes = [
+            # supports reading a column in card order
+            models.Index(fields=['board', 'status', 'position'], name='tasks_column_position_idx'),
+            # supports deadline queries; only open tasks with a due date are indexed
+            models.Index(
+                fields=['due_date', 'id'],
+                condition=~models.Q(status='done') & models.Q(due_date__isnull=False),
+                name='tasks_open_due_idx'
+            ),
+        ]
+
+    @classmethod
+    def next_position(cls, board_id, status):
+        # return a key placing a task at the end of a column
+        # the last key is read without a lock (sqlite has no select_for_update), so tasks created in the same
+        # column at the same time can get the same key; ties are ordered by id, a move next to a tied task
+        # renumbers the column, and rebalance_task_positions renumbers every column with duplicate keys
+        last = cls.objects.filter(board_id=board_id, status=status).aggregate(last=models.Max('position'))['last']
+        return key_between(last, None)
+
+    @classmethod
+    def rebalance_column(cls, board_id, status):
+        # renumber a whole column with short keys, keeping the current order
+        alias = shard_for_id(board_id)
+        with transaction.atomic(using=alias):
+            tasks = list(cls.objects.using(alias).filter(board_id=board_id, status=status).order_by('position', 'id').only('id', 'position'))
+            for task, key in zip(tasks, sequential_keys(len(tasks))):
+                task.position = key
+            cls.objects.using(alias).bulk_update(tasks, ['position'], batch_size=500)
+        return len(tasks)
+
+    @classmethod
+    def update_if_version(cls, task_id, version, **changes):
+        # write changes in one conditional update that only matches the expected version (returns the new version or None)
+        updated = cls.objects.filter(id=task_id, version=version).update(version=models.F('version') + 1, **changes)
+        return version + 1 if updated else None
+
+    def save(self, *args, **kwargs):
+        # never write back a possibly stale comments_count on updates of existing tasks
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comments_count'
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         # returns a readable representation of the task
@@ -101,7 +168,200 @@ class Comments(models.Model):
         db_table = 'comments'
         # order comments by creation date
         ordering = ['created_at']
+        # supports keyset pagination of a task's comments over (created_at, id)
+        indexes = [models.Index(fields=['task', 'created_at', 'id'], name='comments_task_keyset_idx')]
 
     def __str__(self):
         # return readable representation of the comment
-        return f"Comment by {self.user} on {self.task}"
\ No newline at end of file
+        return f"Comment by {self.user} on {self.task}"
+
+class BoardPurge(models.Model):
+    # stores the id of the soft deleted board (kept after the board row is gone)
+    board_id = models.BigIntegerField(unique=True)
+    # stores how many rows the purge job removed so far
+    comments_deleted = models.PositiveIntegerField(default=0)
+    tasks_deleted = models.PositiveIntegerField(default=0)
+    members_deleted = models.PositiveIntegerField(default=0)
+    # stores when the board was queued and when the purge finished
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        # defines the name of the table in the database
+        db_table = 'board_purges'
+
+    def __str__(self):
+        # returns a readable representation of the purge job
+        return f"Purge of board {self.board_id}"
+
+class ArchivedTasks(models.Model):
+    # keeps the id the task had in the tasks table
+    id = models.BigIntegerField(primary_key=True)
+    # link archived task to its board
+    board = models.ForeignKey(Boards, on_delete=models.CASCADE, related_name='archived_tasks')
+    # copies of the task fields
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Tasks.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Tasks.PRIORITY_CHOICES)
+    assignee = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_assigned_tasks')
+    reviewer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_reviewed_tasks')
+    creator = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_created_tasks')
+    due_date = models.DateField(null=True, blank=True)
+    comments_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    # store when the task was moved into the archive
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # define database table name
+        db_table = 'archived_tasks'
+        # supports browsing a board's archive page by page
+        indexes = [models.Index(fields=['board', 'archived_at', 'id'], name='archived_tasks_board_idx')]
+
+    def __str__(self):
+        # returns a readable representation of the archived task
+        return self.title
+
+class ArchivedComments(models.Model):
+    # keeps the id the comment had in the comments table
+    id = models.BigIntegerField(primary_key=True)
+    # link archived comment to its archived task
+    task = models.ForeignKey(ArchivedTasks, on_delete=models.CASCADE, related_name='comments')
+    # link archived comment to its author
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_comments')
+    # copies of the comment fields
+    content = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        # define database table name
+        db_table = 'archived_comments'
+        # order comments by creation date
+        ordering = ['created_at']
+
+    def __str__(self):
+        # return readable representation of the archived comment
+        return f"Archived comment by {self.user} on {self.task}"
+
+class ActivityLog(models.Model):
+    # defines the kinds of recorded events
+    VERB_CHOICES = (
+        ('status_changed', 'Status changed'),
+        ('assigned', 'Assigned'),
+        ('reviewer_changed', 'Reviewer changed'),
+        ('commented', 'Commented'),
+    )
+    # link event to a board
+    board = models.ForeignKey(Boards, on_delete=models.CASCADE, related_name='activity')
+    # stores the id of the task (no foreign key so the log outlives deleted or archived tasks)
+    task_id = models.BigIntegerField(null=True, blank=True)
+    # link event to the acting user
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='activity')
+    # define kind of event
+    verb = models.CharField(max_length=30, choices=VERB_CHOICES)
+    # stores event details such as old and new values
+    payload = models.JSONField(default=dict, blank=True)
+    # stores when the event happened (set when recorded, not when flushed)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        # define database table name
+        db_table = 'activity_log'
+        # supports reading a board feed page by page
+        indexes = [models.Index(fields=['board', 'created_at', 'id'], name='activity_board_feed_idx')]
+
+    def __str__(self):
+        # returns a readable representation of the event
+        return f"{self.verb} on board {self.board_id}"
+
+class OverdueTasks(models.Model):
+    # stores the day the snapshot was taken for
+    snapshot_date = models.DateField()
+    # stores the id of the task (no foreign key so old snapshots outlive archived tasks)
+    task_id = models.BigIntegerField()
+    # link snapshot row to the board and the assignee of the task
+    board = models.ForeignKey(Boards, on_delete=models.CASCADE, related_name='overdue_tasks')
+    assignee = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='overdue_tasks')
+    # copies of the task fields a reminder or dashboard needs
+    title = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=Tasks.STATUS_CHOICES)
+    priority = models.CharField(max_length=20, choices=Tasks.PRIORITY_CHOICES)
+    due_date = models.DateField()
+    # stores how many days the task was overdue on the snapshot date
+    days_overdue = models.PositiveIntegerField()
+
+    class Meta:
+        # define database table name
+        db_table = 'overdue_tasks'
+        # a task appears at most once per snapshot
+        constraints = [models.UniqueConstraint(fields=['snapshot_date', 'task_id'], name='overdue_tasks_unique_task')]
+        # supports reading one day's snapshot per board
+        indexes = [models.Index(fields=['snapshot_date', 'board'], name='overdue_tasks_board_idx')]
+
+    def __str__(self):
+        # returns a readable representation of the snapshot row
+        return f"{self.title} overdue on {self.snapshot_date}"
+
+class TaskStatusHistory(models.Model):
+    # link transition to the board of the task
+    board = models.ForeignKey(Boards, on_delete=models.CASCADE, related_name='status_history')
+    # stores the id of the task (no foreign key so the history outlives deleted or archived tasks)
+    task_id = models.BigIntegerField()
+    # stores the status before and after the change (null before creation and after deletion)
+    old_status = models.CharField(max_length=20, choices=Tasks.STATUS_CHOICES, null=True, blank=True)
+    new_status = models.CharField(max_length=20, choices=Tasks.STATUS_CHOICES, null=True, blank=True)
+    # stores when the status changed
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        # define database table name
+        db_table = 'task_status_history'
+        indexes = [
+            # supports the rollup job reading transitions since its last run
+            models.Index(fields=['changed_at', 'id'], name='status_history_time_idx'),
+            # supports looking up when a task was created to measure its cycle time
+            models.Index(fields=['task_id', 'changed_at'], name='status_history_task_idx'),
+        ]
+
+    @classmethod
+    def record(cls, board_id, task_id, old_status, new_status, changed_at=None):
+        # store one transition (no row when the status did not change)
+        if old_status == new_status:
+            return None
+        return cls.objects.create(
+            board_id=board_id, task_id=task_id, old_status=old_status, new_status=new_status,
+            changed_at=changed_at or timezone.now()
+        )
+
+    def __str__(self):
+        # returns a readable representation of the transition
+        return f"Task {self.task_id}: {self.old_status} -> {self.new_status}"
+
+class BoardFlowMetrics(models.Model):
+    # link rollup row to the board
+    board = models.ForeignKey(Boards, on_delete=models.CASCADE, related_name='flow_metrics')
+    # stores the day the row sums up
+    day = models.DateField()
+    # stores how many tasks were in each status at the end of the day
+    to_do = models.IntegerField(default=0)
+    in_progress = models.IntegerField(default=0)
+    review = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    # stores how many tasks were created and moved into done during the day
+    created = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    # stores the summed cycle time (creation to done) of the completed tasks and how many were measured
+    cycle_time_total = models.FloatField(default=0)
+    cycle_time_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # define database table name
+        db_table = 'board_flow_metrics'
+        # one row per board and day (also serves reading a board's date range)
+        constraints = [models.UniqueConstraint(fields=['board', 'day'], name='board_flow_metrics_unique_day')]
+
+    def __str__(self):
+        # returns a readable representation of the rollup row
+        return f"Flow of board {self.board_id} on {self.day}"
@@ -0,0 +1,151 @@
+# fractional indexing: every task gets a string key and a moved task gets a key between
+# its new neighbours, so a move only rewrites the moved row. keys consist of an integer
+# part (head character encodes its length) followed by an optional fraction that never
+# ends in '0'. keys compare correctly with plain byte-wise string comparison.
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+# key placed in an empty column
+INTEGER_ZERO = 'a0'
+# smallest integer part, nothing can be placed before it without a fraction
+SMALLEST_INTEGER = 'A' + '0' * 26
+
+
+def midpoint(a, b):
+    # return a fraction strictly between a and b (b=None means no upper bound)
+    if b is not None:
+        # keep the common prefix and recurse on the remainder
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else '0') == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # the first digits are consecutive
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + midpoint(a[1:], None)
+
+
+def integer_length(head):
+    # return the length of the integer part announced by its head character
+    if 'a' <= head <= 'z':
+        return ord(head) - ord('a') + 2
+    if 'A' <= head <= 'Z':
+        return ord('Z') - ord(head) + 2
+    raise ValueError(f'Invalid position key head: {head!r}')
+
+
+def integer_part(key):
+    # return the integer part of a key
+    length = integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f'Invalid position key: {key!r}')
+    return key[:length]
+
+
+def validate_key(key):
+    # reject keys that cannot be produced by key_between
+    if key == SMALLEST_INTEGER:
+        raise ValueError(f'Invalid position key: {key!r}')
+    if key[len(integer_part(key)):].endswith('0'):
+        raise ValueError(f'Invalid position key: {key!r}')
+
+
+def increment_integer(x):
+    # return the next integer part or None when the key space is exhausted
+    head, digits = x[0], list(x[1:])
+    carry = True
+    for i in range(len(digits) - 1, -1, -1):
+        value = DIGITS.index(digits[i]) + 1
+        if value == len(DIGITS):
+            digits[i] = '0'
+        else:
+            digits[i] = DIGITS[value]
+            carry = False
+            break
+    if not carry:
+        return head + ''.join(digits)
+    if head == 'Z':
+        return INTEGER_ZERO
+    if head == 'z':
+        return None
+    head = chr(ord(head) + 1)
+    if head > 'a':
+        digits.append('0')
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+
+def decrement_integer(x):
+    # return the previous integer part or None when the key space is exhausted
+    head, digits = x[0], list(x[1:])
+    borrow = True
+    for i in range(len(digits) - 1, -1, -1):
+        value = DIGITS.index(digits[i]) - 1
+        if value == -1:
+            digits[i] = DIGITS[-1]
+        else:
+            digits[i] = DIGITS[value]
+            borrow = False
+            break
+    if not borrow:
+        return head + ''.join(digits)
+    if head == 'a':
+        return 'Z' + DIGITS[-1]
+    if head == 'A':
+        return None
+    head = chr(ord(head) - 1)
+    if head < 'Z':
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + ''.join(digits)
+
+
+def key_between(a, b):
+    # return a key strictly between a and b (None means the start or end of the column)
+    if a is not None:
+        validate_key(a)
+    if b is not None:
+        validate_key(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f'Position {a!r} is not before {b!r}')
+    if a is None:
+        if b is None:
+            return INTEGER_ZERO
+        int_b = integer_part(b)
+        if int_b == SMALLEST_INTEGER:
+            return int_b + midpoint('', b[len(int_b):])
+        if int_b < b:
+            return int_b
+        result = decrement_integer(int_b)
+        if result is None:
+            raise ValueError('Cannot place a task before the first position')
+        return result
+    int_a = integer_part(a)
+    if b is None:
+        result = increment_integer(int_a)
+        return int_a + midpoint(a[len(int_a):], None) if result is None else result
+    int_b = integer_part(b)
+    if int_a == int_b:
+        return int_a + midpoint(a[len(int_a):], b[len(int_b):])
+    result = increment_integer(int_a)
+    if result is None:
+        raise ValueError('Cannot place a task after the last position')
+    if result < b:
+        return result
+    return int_a + midpoint(a[len(int_a):], None)
+
+
+def sequential_keys(count):
+    # return count short, evenly increasing keys for (re)numbering a whole column
+    keys = []
+    key = None
+    for _ in range(count):
+        key = key_between(key, None)
+        keys.append(key)
+    return keys
@@ -0,0 +1,59 @@
+# standard bib imports
+from django.db import DEFAULT_DB_ALIAS
+
+# local imports
+from kanmind_app.sharding import current_shard, shard_for_id, sharding_enabled
+
+# apps whose models live on the board shards
+SHARDED_APPS = {'kanmind_app'}
+# user tables copied to every shard so board queries can join them there
+REPLICATED_MODELS = {'auth.user'}
+
+
+def shard_of_instance(instance):
+    # return the shard an object of a sharded model lives on (None when unknown)
+    if instance._meta.app_label not in SHARDED_APPS:
+        return None
+    if instance._state.db:
+        return instance._state.db
+    for name in ('board_id', 'task_id'):
+        value = getattr(instance, name, None)
+        if value is not None:
+            return shard_for_id(value)
+    return None
+
+
+class BoardShardRouter:
+    # sends boards and everything below them to the shard of the board, everything else to default
+
+    def db_for_read(self, model, **hints):
+        # board data: the shard of the related object or of the running request
+        if not sharding_enabled():
+            return None
+        instance = hints.get('instance')
+        shard = shard_of_instance(instance) if instance is not None else None
+        if model._meta.app_label in SHARDED_APPS:
+            return shard or current_shard()
+        # users reached from board data are read from the replica on that shard
+        if model._meta.label_lower in REPLICATED_MODELS and shard:
+            return shard
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # board data goes to its shard, users are written to default and replicated from there
+        if not sharding_enabled():
+            return None
+        if model._meta.app_label in SHARDED_APPS:
+            instance = hints.get('instance')
+            return (shard_of_instance(instance) if instance is not None else None) or current_shard()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # boards point at users that live in default and in every replica
+        if sharding_enabled():
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # every database gets the full schema (shards need the user tables for the replicas)
+        return None
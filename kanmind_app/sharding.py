@@ -0,0 +1,88 @@
+# standard bib imports
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+# shard of the code currently running (set per request from the url, or explicitly)
+_current = ContextVar('kanmind_shard', default=None)
+# url kwargs whose ids tell the shard of a request
+SHARD_KWARGS = ('board_id', 'task_id', 'comment_id')
+
+
+def shard_aliases():
+    # return the database aliases holding boards (just the default database without sharding)
+    return list(settings.BOARD_SHARDS) or [DEFAULT_DB_ALIAS]
+
+
+def sharding_enabled():
+    # boards are only spread out with more than one shard configured
+    return len(settings.BOARD_SHARDS) > 1
+
+
+def shard_for_id(object_id):
+    # ids of shard n start at n << BOARD_SHARD_ID_BITS, so the high bits name the shard
+    aliases = shard_aliases()
+    index = int(object_id) >> settings.BOARD_SHARD_ID_BITS
+    return aliases[index] if 0 <= index < len(aliases) else aliases[0]
+
+
+def shard_for_new_board(owner):
+    # keep all boards created by one owner on the same shard
+    aliases = shard_aliases()
+    return aliases[owner.id % len(aliases)]
+
+
+def shard_from_kwargs(kwargs):
+    # return the shard named by the ids in url kwargs (None when there is none)
+    for name in SHARD_KWARGS:
+        if kwargs.get(name) is not None:
+            return shard_for_id(kwargs[name])
+    return None
+
+
+def current_shard():
+    # return the shard the running code works on
+    return _current.get() or shard_aliases()[0]
+
+
+def select_shard(alias):
+    # route board data queries without an explicit database to alias (returns a token for reset_shard)
+    return _current.set(alias)
+
+
+def reset_shard(token):
+    # go back to the shard selected before select_shard
+    _current.reset(token)
+
+
+@contextmanager
+def use_shard(alias):
+    # select alias for the duration of the block
+    token = select_shard(alias)
+    try:
+        yield alias
+    finally:
+        reset_shard(token)
+
+
+def each_shard():
+    # run the loop body once per shard with that shard selected
+    for alias in shard_aliases():
+        with use_shard(alias):
+            yield alias
+
+
+def fan_out(function, *args, **kwargs):
+    # call function on every shard and return the results in shard order
+    return [function(*args, **kwargs) for _ in each_shard()]
+
+
+def atomic():
+    # transaction on the current shard
+    return transaction.atomic(using=current_shard())
+
+
+def on_commit(callback):
+    # run callback after the transaction of the current shard commits
+    transaction.on_commit(callback, using=current_shard())
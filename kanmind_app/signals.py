@@ -0,0 +1,47 @@
+# standard bib imports
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+# local imports
+from kanmind_app.sharding import shard_aliases, sharding_enabled
+
+# user fields copied to the shards (passwords stay in default only)
+REPLICATED_FIELDS = ['username', 'first_name', 'last_name', 'email', 'is_active', 'is_staff', 'is_superuser', 'date_joined']
+
+
+def replicate_users(users, aliases=None):
+    # insert or refresh the replicas of users on every shard except default
+    for alias in aliases or shard_aliases():
+        if alias == DEFAULT_DB_ALIAS:
+            continue
+        existing = set(User.objects.using(alias).filter(id__in=[user.id for user in users]).values_list('id', flat=True))
+        for user in users:
+            if user.id in existing:
+                User.objects.using(alias).filter(id=user.id).update(**{name: getattr(user, name) for name in REPLICATED_FIELDS})
+        # bulk_create sends no signals, so the replicas never replicate themselves
+        User.objects.using(alias).bulk_create([
+            User(id=user.id, password='!', **{name: getattr(user, name) for name in REPLICATED_FIELDS})
+            for user in users if user.id not in existing
+        ])
+
+
+@receiver(post_save, sender=User)
+def replicate_saved_user(sender, instance, using, update_fields=None, raw=False, **kwargs):
+    # copy users written to default onto the shards
+    if raw or using != DEFAULT_DB_ALIAS or not sharding_enabled():
+        return
+    if update_fields is not None and not set(REPLICATED_FIELDS) & set(update_fields):
+        return
+    replicate_users([instance])
+
+
+@receiver(post_delete, sender=User)
+def delete_replicas(sender, instance, using, **kwargs):
+    # remove the replicas (and with them the user's board data) from the shards
+    if using != DEFAULT_DB_ALIAS or not sharding_enabled():
+        return
+    for alias in shard_aliases():
+        if alias != DEFAULT_DB_ALIAS:
+            User.objects.using(alias).filter(id=instance.id).delete()
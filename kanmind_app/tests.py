@@ -1,3 +1,1297 @@
-from django.test import TestCase
+# standard bib imports
+import asyncio
+import gzip
+import json
+import os
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.http import FileResponse, HttpResponse
+from django.db import connection, connections, transaction, DatabaseError
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
-# Create your tests here.
+# third party imports
+from rest_framework.authtoken.models import Token
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, APITestCase, APITransactionTestCase
+
+# local imports
+from core import metrics, compression
+from core.middleware import ConcurrencyLimitMiddleware
+from core.nplusone import detect_n_plus_one, NPlusOneError
+from core.profiling import ProfileStore
+from core.throttling import TokenBucketThrottle, BoardReadThrottle
+from kanmind_app import activity, sharding
+from kanmind_app.api.columnar import TASK_COLUMNS
+from kanmind_app.api.views import TasksDetailView
+from kanmind_app.management.commands.init_board_shards import Command as InitBoardShards
+from kanmind_app.models import Boards, BoardMember, Tasks, Comments, BoardPurge, ArchivedTasks, ArchivedComments, ActivityLog, OverdueTasks, TaskStatusHistory, BoardFlowMetrics
+from kanmind_app.positions import key_between, sequential_keys
+from kanmind_app.sharding import shard_for_id, shard_for_new_board
+from kanmind_app.signals import replicate_users
+from user_auth_app.models import UserSearchKey
+
+# settings every test runs with: a private cache and fast password hashes
+TEST_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+}
+
+
+class KanmindTestMixin:
+    # unthrottled api clients and helpers to build boards
+    # tests of the throttles themselves set this to keep them active
+    throttled = False
+
+    def setUp(self):
+        # the throttle buckets and metric counters live in files shared with the dev server
+        super().setUp()
+        if not self.throttled:
+            patcher = mock.patch.object(TokenBucketThrottle, 'allow_request', return_value=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        stores = self.settings(
+            METRICS_STORE_PATH=Path(directory.name) / 'metrics.sqlite3',
+            THROTTLE_STORE_PATH=Path(directory.name) / 'throttle.sqlite3'
+        )
+        stores.enable()
+        self.addCleanup(stores.disable)
+        # ids repeat after rollbacks, so cached payloads must not outlive a test
+        for cache in caches.all():
+            cache.clear()
+
+    def make_user(self, name):
+        # create a user with a token
+        user = User.objects.create_user(username=name, email=f'{name}@example.com')
+        Token.objects.create(user=user)
+        return user
+
+    def client_for(self, user):
+        # api client authenticated with the user's token
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {user.auth_token.key}')
+        return client
+
+    def make_board(self, owner, members=()):
+        # create a board with members
+        board = Boards.objects.create(title='Board', owner=owner)
+        BoardMember.objects.bulk_create([BoardMember(board=board, user=member) for member in members])
+        return board
+
+    def make_task(self, board, **fields):
+        # create a task at the end of its column (on the board's shard)
+        fields.setdefault('title', 'Task')
+        fields.setdefault('creator', board.owner)
+        return board.tasks.create(**fields)
+
+    def run_parallel(self, calls, threads=8):
+        # run the calls from several threads at once (every thread opens its own connections)
+        def run(call):
+            try:
+                return call()
+            finally:
+                connections.close_all()
+        with ThreadPoolExecutor(threads) as executor:
+            return list(executor.map(run, calls))
+
+
+@override_settings(**TEST_SETTINGS)
+class KanmindTestCase(KanmindTestMixin, APITestCase):
+    pass
+
+
+@override_settings(**TEST_SETTINGS)
+class KanmindTransactionTestCase(KanmindTestMixin, APITransactionTestCase):
+
+    def tearDown(self):
+        # write buffered activity before the tables are flushed
+        activity.buffer.flush()
+        super().tearDown()
+
+
+class CommentCountConcurrencyTests(KanmindTransactionTestCase):
+
+    def test_parallel_posts_and_deletes_keep_the_count(self):
+        owner = self.make_user('owner')
+        task = self.make_task(self.make_board(owner))
+        url = f'/api/tasks/{task.id}/comments/'
+        client = self.client_for(owner)
+        existing = [client.post(url, {'content': f'old {number}'}, format='json').data['id'] for number in range(20)]
+
+        def post(number):
+            return lambda: self.client_for(owner).post(url, {'content': f'new {number}'}, format='json').status_code
+
+        def delete(comment_id):
+            return lambda: self.client_for(owner).delete(f'{url}{comment_id}/').status_code
+
+        # every old comment is deleted twice at the same time as the new ones are posted
+        calls = [post(number) for number in range(30)] + [delete(comment_id) for comment_id in existing * 2]
+        statuses = self.run_parallel(calls)
+
+        self.assertEqual(statuses.count(201), 30)
+        self.assertEqual(statuses.count(204) + statuses.count(404), 40)
+        task.refresh_from_db()
+        self.assertEqual(task.comments.count(), 30)
+        self.assertEqual(task.comments_count, task.comments.count())
+        out = StringIO()
+        call_command('reconcile_comment_counts', stdout=out)
+        self.assertIn('0 task(s) reconciled.', out.getvalue())
+
+    def test_reconcile_fixes_drift(self):
+        owner = self.make_user('owner')
+        task = self.make_task(self.make_board(owner))
+        self.client_for(owner).post(f'/api/tasks/{task.id}/comments/', {'content': 'hello'}, format='json')
+        Tasks.objects.filter(id=task.id).update(comments_count=5)
+        out = StringIO()
+        call_command('reconcile_comment_counts', stdout=out)
+        self.assertIn(f'task {task.id}: stored 5, actual 1', out.getvalue())
+        self.assertIn('1 task(s) reconciled.', out.getvalue())
+        task.refresh_from_db()
+        self.assertEqual(task.comments_count, 1)
+
+
+class MetricsTests(KanmindTestCase):
+
+    def test_parallel_increments_are_not_lost(self):
+        self.run_parallel([lambda: metrics.incr('test.requests') for _ in range(200)])
+        metrics.incr('test.bytes', 512)
+        counters = metrics.snapshot()
+        self.assertEqual(counters['test.requests'], 200)
+        self.assertEqual(counters['test.bytes'], 512)
+
+    def test_increments_are_written_in_one_transaction(self):
+        buffer = metrics.CounterBuffer(interval=60)
+        with mock.patch.object(metrics.SQLiteCounterStore, 'add') as add:
+            buffer.add({'test.a': 1, 'test.b': 2})
+            buffer.add({'test.a': 3})
+            add.assert_not_called()
+            buffer.flush()
+        add.assert_called_once_with({'test.a': 4, 'test.b': 2})
+
+    def test_ratio(self):
+        self.assertIsNone(metrics.ratio({}, 'cache'))
+        self.assertEqual(metrics.ratio({'cache.hits': 3, 'cache.misses': 1}, 'cache'), 0.75)
+
+
+class NPlusOneTests(KanmindTestCase):
+    # list endpoints load the rows they show with a fixed number of queries
+
+    def setUp(self):
+        # eight boards with eight tasks each, every task with its own assignee, reviewer and commenters
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.users = [self.make_user(f'member{number}') for number in range(8)]
+        self.boards = [self.make_board(self.owner, self.users) for _ in range(8)]
+        self.tasks = [
+            self.make_task(board, assignee=self.owner if number % 2 else user, reviewer=user if number % 2 else self.owner)
+            for board in self.boards for number, user in enumerate(self.users)
+        ]
+        Comments.objects.bulk_create([Comments(task=self.tasks[0], user=user, content='Comment') for user in self.users])
+        self.client = self.client_for(self.owner)
+
+    def assert_no_n_plus_one(self, url, **params):
+        # request the url and fail on queries repeated more than NPLUSONE_THRESHOLD times
+        with detect_n_plus_one(mode='raise', label=url):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_board_list(self):
+        response = self.assert_no_n_plus_one('/api/boards/')
+        self.assertEqual(len(response.data), 8)
+
+    def test_board_detail(self):
+        response = self.assert_no_n_plus_one(f'/api/boards/{self.boards[0].id}/', expand='members,tasks')
+        data = response.json()
+        self.assertEqual(len(data['tasks']), 8)
+        self.assertEqual(len(data['members']), 8)
+
+    def test_assigned_to_me(self):
+        response = self.assert_no_n_plus_one('/api/tasks/assigned-to-me/')
+        self.assertEqual(len(response.data), 32)
+
+    def test_reviewing(self):
+        response = self.assert_no_n_plus_one('/api/tasks/reviewing/')
+        self.assertEqual(len(response.data), 32)
+
+    def test_comments(self):
+        response = self.assert_no_n_plus_one(f'/api/tasks/{self.tasks[0].id}/comments/')
+        self.assertEqual(len(response.data), 8)
+
+    def test_lazy_relations_are_reported(self):
+        with self.assertRaisesMessage(NPlusOneError, 'N+1 query'):
+            with detect_n_plus_one(mode='raise'):
+                [task.assignee.email for task in Tasks.objects.filter(board=self.boards[0])]
+
+
+@override_settings(BOARD_SHARDS=['default', 'shard_1'])
+class ShardingTests(KanmindTestCase):
+    # shard_1 is defined by core.settings_test
+    databases = {'default', 'shard_1'}
+
+    def setUp(self):
+        # shard_1 hands out ids from 1 << BOARD_SHARD_ID_BITS, as after init_board_shards
+        super().setUp()
+        InitBoardShards().seed_sequences('shard_1', 1 << settings.BOARD_SHARD_ID_BITS)
+        # consecutive ids: one owner per shard (boards go to shard owner.id % 2)
+        self.owners = [self.make_user('alice'), self.make_user('bob')]
+        self.member = self.make_user('carol')
+        self.boards = []
+        for owner in self.owners:
+            response = self.client_for(owner).post('/api/boards/', {'title': owner.username, 'members': [self.member.id]}, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.boards.append(Boards.objects.using(shard_for_new_board(owner)).get(id=response.data['id']))
+
+    def test_new_boards_go_to_the_shard_of_their_owner(self):
+        self.assertEqual({board._state.db for board in self.boards}, {'default', 'shard_1'})
+        for owner, board in zip(self.owners, self.boards):
+            alias = shard_for_new_board(owner)
+            self.assertEqual(board._state.db, alias)
+            self.assertEqual(shard_for_id(board.id), alias)
+            self.assertEqual(board.id >> settings.BOARD_SHARD_ID_BITS, ['default', 'shard_1'].index(alias))
+            other = 'default' if alias == 'shard_1' else 'shard_1'
+            self.assertFalse(Boards.objects.using(other).filter(id=board.id).exists())
+
+    def test_urls_route_by_the_high_bits_of_their_id(self):
+        client = self.client_for(self.member)
+        for board in self.boards:
+            task = self.make_task(board, title=f'task on {board._state.db}')
+            comment = task.comments.create(user=self.member, content='Comment')
+            self.assertEqual(task._state.db, board._state.db)
+            self.assertEqual(comment._state.db, board._state.db)
+            self.assertEqual(client.get(f'/api/boards/{board.id}/').json()['title'], board.title)
+            self.assertEqual(client.get(f'/api/tasks/{task.id}/').data['title'], task.title)
+            self.assertEqual(client.get(f'/api/tasks/{task.id}/comments/{comment.id}/').data['id'], comment.id)
+
+    def test_users_are_copied_to_every_shard(self):
+        users = [*self.owners, self.member]
+        self.assertEqual(
+            set(User.objects.using('shard_1').values_list('id', 'email')),
+            {(user.id, user.email) for user in users}
+        )
+        # replicas hold no password
+        self.assertFalse(User.objects.using('shard_1').exclude(password='!').exists())
+        # queryset updates send no signal, replicate_users refreshes the replicas
+        User.objects.filter(id=self.member.id).update(email='carol@example.org')
+        replicate_users(User.objects.filter(id=self.member.id))
+        self.assertEqual(User.objects.using('shard_1').get(id=self.member.id).email, 'carol@example.org')
+
+    def test_task_lists_merge_all_shards(self):
+        tasks = [
+            self.make_task(board, assignee=self.member, reviewer=self.member, due_date=timezone.localdate() + timedelta(days=number))
+            for number, board in enumerate(sorted(self.boards, key=lambda board: board.id))
+        ]
+        self.assertEqual({task._state.db for task in tasks}, {'default', 'shard_1'})
+        # shards are listed in id order, due tasks by due date
+        expected = [task.id for task in tasks]
+        client = self.client_for(self.member)
+        for url in ('/api/tasks/assigned-to-me/', '/api/tasks/reviewing/', '/api/tasks/due/'):
+            self.assertEqual([item['id'] for item in client.get(url).data], expected, url)
+
+
+class InitBoardShardsTests(KanmindTransactionTestCase):
+    # the upgrade path: an existing single database gets a new shard with init_board_shards
+    databases = {'default', 'shard_1'}
+
+    def setUp(self):
+        # shard_1 as a fresh database that has not run the backfill migrations yet
+        super().setUp()
+        call_command('migrate', 'user_auth_app', '0001', database='shard_1', verbosity=0)
+        call_command('migrate', 'kanmind_app', '0002', database='shard_1', verbosity=0)
+        self.addCleanup(call_command, 'migrate', database='shard_1', verbosity=0)
+
+    def test_backfills_stay_on_the_migrated_shard(self):
+        owner = self.make_user('owner')
+        board = self.make_board(owner)
+        tasks = [self.make_task(board, title=f'Task {number}') for number in range(2)]
+        # a position the backfill would renumber if it ran against default
+        Tasks.objects.filter(id=tasks[0].id).update(position='a5')
+        keys = set(UserSearchKey.objects.values_list('user_id', 'key'))
+        out = StringIO()
+        with override_settings(BOARD_SHARDS=['default', 'shard_1']):
+            call_command('init_board_shards', stdout=out)
+        self.assertIn('2 shard(s) ready.', out.getvalue())
+        self.assertEqual(set(UserSearchKey.objects.values_list('user_id', 'key')), keys)
+        self.assertEqual(Tasks.objects.get(id=tasks[0].id).position, 'a5')
+        self.assertEqual(list(User.objects.using('shard_1').values_list('id', flat=True)), [owner.id])
+
+
+class FlowMetricsTests(KanmindTestCase):
+
+    def setUp(self):
+        # a board of its owner
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.board = self.make_board(self.owner)
+        self.client = self.client_for(self.owner)
+
+    def at(self, day, hour=12):
+        # aware datetime on a day of the test month
+        return timezone.make_aware(datetime(2026, 3, day, hour))
+
+    def transition(self, task_id, old_status, new_status, day, hour=12, board=None):
+        # store a transition at a fixed time
+        TaskStatusHistory.objects.create(
+            board=board or self.board, task_id=task_id, old_status=old_status, new_status=new_status, changed_at=self.at(day, hour)
+        )
+
+    def rollup(self, day, *args):
+        # run the rollup job as if it were noon of a day of the test month
+        with mock.patch('django.utils.timezone.now', return_value=self.at(day)):
+            call_command('rollup_flow_metrics', *args, stdout=StringIO())
+        return list(BoardFlowMetrics.objects.order_by('board_id', 'day').values(
+            'board_id', 'day', 'to_do', 'in_progress', 'review', 'done', 'created', 'completed', 'cycle_time_total', 'cycle_time_count'
+        ))
+
+    def history(self, task_id):
+        # transitions of a task in order
+        return list(TaskStatusHistory.objects.filter(task_id=task_id).order_by('changed_at', 'id').values_list('old_status', 'new_status'))
+
+    def test_task_endpoints_record_transitions(self):
+        response = self.client.post('/api/tasks/', {'board': self.board.id, 'title': 'Task', 'status': 'to-do', 'priority': 'low'}, format='json')
+        self.assertEqual(response.status_code, 201)
+        task_id = response.data['id']
+        self.assertEqual(self.client.post(f'/api/tasks/{task_id}/move/', {'status': 'in-progress'}, format='json').status_code, 200)
+        self.assertEqual(self.client.patch(f'/api/tasks/{task_id}/', {'status': 'review'}, format='json').status_code, 200)
+        # edits without a status change add no row
+        self.assertEqual(self.client.patch(f'/api/tasks/{task_id}/', {'title': 'Renamed'}, format='json').status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/tasks/{task_id}/').status_code, 204)
+        self.assertEqual(self.history(task_id), [(None, 'to-do'), ('to-do', 'in-progress'), ('in-progress', 'review'), ('review', None)])
+
+    def test_incremental_runs_match_a_rebuild(self):
+        other = self.make_board(self.owner)
+        self.transition(1, None, 'to-do', 1)
+        self.transition(2, None, 'to-do', 1, board=other)
+        self.transition(1, 'to-do', 'in-progress', 2)
+        self.transition(3, None, 'done', 3)
+        self.rollup(3)
+        # the rest of the day of the first run and the days after it
+        self.transition(2, 'to-do', 'done', 3, hour=18, board=other)
+        self.transition(1, 'in-progress', 'review', 4)
+        self.transition(1, 'review', 'done', 6)
+        self.transition(3, 'done', None, 6)
+        incremental = self.rollup(8, '--window-days', '2')
+        rebuilt = self.rollup(8, '--rebuild')
+        self.assertEqual(incremental, rebuilt)
+        self.assertEqual(len(rebuilt), 16)
+        last = BoardFlowMetrics.objects.get(board=self.board, day=date(2026, 3, 8))
+        self.assertEqual((last.to_do, last.in_progress, last.review, last.done), (0, 0, 0, 1))
+
+    def test_cycle_time_skips_tasks_created_as_done(self):
+        self.transition(1, None, 'to-do', 1, hour=10)
+        self.transition(1, 'to-do', 'done', 2, hour=10)
+        self.transition(2, None, 'done', 2)
+        self.rollup(2)
+        day = BoardFlowMetrics.objects.get(board=self.board, day=date(2026, 3, 2))
+        self.assertEqual((day.created, day.completed, day.done), (1, 2, 2))
+        self.assertEqual((day.cycle_time_total, day.cycle_time_count), (86400, 1))
+        response = self.client.get(f'/api/boards/{self.board.id}/metrics/', {'from': '2026-03-01', 'to': '2026-03-02'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totals'], {'created': 2, 'completed': 2, 'avg_cycle_time_hours': 24.0})
+
+    def test_metrics_range_validation(self):
+        url = f'/api/boards/{self.board.id}/metrics/'
+        response = self.client.get(url, {'from': '2026-03-02', 'to': '2026-03-01'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'from must not be after to.'})
+        response = self.client.get(url, {'from': '2025-01-01', 'to': '2026-01-02'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'The range must not exceed 366 days.'})
+        self.assertEqual(self.client.get(url, {'from': '2025-01-01', 'to': '2026-01-01'}).status_code, 200)
+        self.assertEqual(self.client.get(url, {'from': 'yesterday'}).status_code, 400)
+
+
+class TaskVersionTests(KanmindTestCase):
+
+    def get_version(self, data=None, **headers):
+        # parse the edited version of a PATCH request
+        request = APIRequestFactory().patch('/api/tasks/1/', data or {}, format='json', **headers)
+        return TasksDetailView().get_version(Request(request, parsers=[JSONParser()]))
+
+    def test_get_version(self):
+        self.assertIsNone(self.get_version())
+        self.assertIsNone(self.get_version(HTTP_IF_MATCH='*'))
+        self.assertEqual(self.get_version(HTTP_IF_MATCH='"3"'), 3)
+        self.assertEqual(self.get_version(HTTP_IF_MATCH='W/"3"'), 3)
+        self.assertEqual(self.get_version({'version': 2}), 2)
+        # the header wins over the body
+        self.assertEqual(self.get_version({'version': 2}, HTTP_IF_MATCH='"5"'), 5)
+        for value in ('"abc"', '"0"', '"-1"', ''):
+            with self.assertRaisesMessage(ValidationError, 'If-Match and version must be a task version.'):
+                self.get_version(HTTP_IF_MATCH=value)
+        with self.assertRaises(ValidationError):
+            self.get_version({'version': 'latest'})
+
+    def test_stale_version_conflicts(self):
+        owner = self.make_user('owner')
+        task = self.make_task(self.make_board(owner))
+        client = self.client_for(owner)
+        response = client.patch(f'/api/tasks/{task.id}/', {'title': 'First'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual((response.status_code, response['ETag']), (200, '"2"'))
+        response = client.patch(f'/api/tasks/{task.id}/', {'title': 'Second'}, format='json', HTTP_IF_MATCH='"1"')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data, {'error': 'Task was changed by someone else.', 'version': 2})
+        self.assertEqual(response['ETag'], '"2"')
+        task.refresh_from_db()
+        self.assertEqual((task.title, task.version), ('First', 2))
+
+
+class ConcurrentTaskEditTests(KanmindTransactionTestCase):
+    # many editors append to one description with If-Match and retry on 409
+
+    threads = 8
+    edits = 10
+    retries = 200
+
+    def edit(self, user, task_id, editor):
+        # read-modify-write the description, retrying with the new version on conflicts
+        client = self.client_for(user)
+        result = {'applied': 0, 'conflicts': 0}
+        for number in range(self.edits):
+            for _ in range(self.retries):
+                version, description = Tasks.objects.values_list('version', 'description').get(id=task_id)
+                response = client.patch(
+                    f'/api/tasks/{task_id}/', {'description': f'{description} {editor}-{number}'.strip()},
+                    format='json', HTTP_IF_MATCH=f'"{version}"'
+                )
+                if response.status_code == 200:
+                    result['applied'] += 1
+                    break
+                self.assertEqual(response.status_code, 409, response.data)
+                result['conflicts'] += 1
+        return result
+
+    def test_no_edit_is_lost(self):
+        user = self.make_user('editor')
+        task = self.make_task(self.make_board(user), description='')
+        results = self.run_parallel([lambda editor=editor: self.edit(user, task.id, editor) for editor in range(self.threads)], self.threads)
+        task.refresh_from_db()
+        # every applied edit appended one marker and raised the version by one
+        applied = sum(result['applied'] for result in results)
+        markers = task.description.split()
+        self.assertEqual(applied, self.threads * self.edits)
+        self.assertEqual(len(markers), applied)
+        self.assertEqual(set(markers), {f'{editor}-{number}' for editor in range(self.threads) for number in range(self.edits)})
+        self.assertEqual(task.version, applied + 1)
+
+
+class NormalizedBoardTests(KanmindTestCase):
+
+    def setUp(self):
+        # a board whose tasks point at its members and at a user who is no member
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.member = self.make_user('member')
+        self.outsider = self.make_user('outsider')
+        self.board = self.make_board(self.owner, [self.member])
+        self.make_task(self.board, assignee=self.member, reviewer=self.owner)
+        self.make_task(self.board, assignee=self.outsider, reviewer=self.member)
+        self.make_task(self.board)
+        self.url = f'/api/boards/{self.board.id}/'
+        self.client = self.client_for(self.member)
+
+    def get(self, **params):
+        # read the board and count the queries
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json(), len(queries)
+
+    def test_users_are_listed_once(self):
+        data, _ = self.get(format='normalized')
+        self.assertEqual(set(data['users']), {str(self.owner.id), str(self.member.id), str(self.outsider.id)})
+        self.assertEqual(data['users'][str(self.outsider.id)], {'id': self.outsider.id, 'email': 'outsider@example.com', 'fullname': ''})
+        self.assertEqual(data['owner_id'], self.owner.id)
+        self.assertEqual(
+            [(task['assignee'], task['reviewer']) for task in data['tasks']],
+            [(self.member.id, self.owner.id), (self.outsider.id, self.member.id), (None, None)]
+        )
+
+    def test_unknown_format_is_not_found(self):
+        self.assertEqual(self.client.get(self.url, {'format': 'bogus'}).status_code, 404)
+
+    def test_normalized_payload_is_cached_separately(self):
+        nested, _ = self.get()
+        self.assertNotIn('users', nested)
+        self.assertEqual(nested['tasks'][0]['assignee']['id'], self.member.id)
+        normalized, uncached = self.get(format='normalized')
+        self.assertIn('users', normalized)
+        cached, hit = self.get(format='normalized')
+        self.assertEqual(cached, normalized)
+        self.assertLess(hit, uncached)
+        self.assertEqual(self.get()[0], nested)
+
+
+class ColumnarTaskListTests(KanmindTestCase):
+
+    def setUp(self):
+        # tasks of every status and priority, with and without assignee and reviewer
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.member = User.objects.create_user(username='member', email='member@example.com', first_name='Mia', last_name='Member')
+        Token.objects.create(user=self.member)
+        self.board = self.make_board(self.owner, [self.member])
+        statuses = [value for value, _ in Tasks.STATUS_CHOICES]
+        priorities = [value for value, _ in Tasks.PRIORITY_CHOICES]
+        for number in range(6):
+            self.make_task(
+                self.board, title=f'Task {number}', description=f'Description {number}',
+                status=statuses[number % len(statuses)], priority=priorities[number % len(priorities)],
+                assignee=self.member, reviewer=self.member if number % 2 else None,
+                due_date=date(2026, 3, number + 1) if number % 3 else None,
+            )
+        self.make_task(self.board, title='Not assigned', reviewer=self.member)
+
+    def decode(self, payload):
+        # turn the columnar payload back into one dict per task, users expanded like the default format
+        columns, choices = payload['columns'], payload['choices']
+        users = {
+            user_id: {'id': user_id, 'email': email, 'fullname': fullname}
+            for user_id, email, fullname in zip(payload['users']['id'], payload['users']['email'], payload['users']['fullname'])
+        }
+        rows = []
+        for index in range(payload['count']):
+            row = {name: columns[name][index] for name in TASK_COLUMNS.values()}
+            for name in choices:
+                row[name] = choices[name][row[name]]
+            for name in ('assignee', 'reviewer'):
+                row[name] = users.get(row[name])
+            rows.append(row)
+        return rows
+
+    def test_columnar_round_trips_to_the_default_rows(self):
+        client = self.client_for(self.member)
+        for url, count in (('/api/tasks/assigned-to-me/', 6), ('/api/tasks/reviewing/', 4)):
+            default = client.get(url).json()
+            payload = client.get(url, {'format': 'columnar'}).json()
+            self.assertEqual(payload['count'], count)
+            decoded = self.decode(payload)
+            # the default format only accepts the board on writes
+            self.assertEqual([row.pop('board') for row in decoded], [self.board.id] * count)
+            self.assertEqual(decoded, [{name: row[name] for name in decoded[0]} for row in default], url)
+
+    def test_status_and_priority_are_indexes(self):
+        payload = self.client_for(self.member).get('/api/tasks/assigned-to-me/', {'format': 'columnar'}).json()
+        self.assertEqual(payload['choices'], {'status': ['to-do', 'in-progress', 'review', 'done'], 'priority': ['low', 'medium', 'high']})
+        self.assertEqual(payload['columns']['status'], [0, 1, 2, 3, 0, 1])
+        self.assertEqual(payload['columns']['priority'], [0, 1, 2, 0, 1, 2])
+        self.assertEqual(payload['columns']['reviewer'], [None, self.member.id] * 3)
+        self.assertEqual(payload['users'], {'id': [self.member.id], 'email': ['member@example.com'], 'fullname': ['Mia Member']})
+
+    def test_empty_list(self):
+        payload = self.client_for(self.owner).get('/api/tasks/assigned-to-me/', {'format': 'columnar'}).json()
+        self.assertEqual(payload['count'], 0)
+        self.assertEqual(payload['columns'], {name: [] for name in TASK_COLUMNS.values()})
+        self.assertEqual(payload['users'], {'id': [], 'email': [], 'fullname': []})
+        self.assertEqual(self.decode(payload), [])
+
+
+class ListModeTests(KanmindTestCase):
+
+    def setUp(self):
+        # a task with a long description and a long comment, a short task and a user outside the board
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.outsider = self.make_user('outsider')
+        self.board = self.make_board(self.owner)
+        self.text = 'Lorem ipsum dolor sit amet. ' * 20
+        self.task = self.make_task(self.board, description=self.text, assignee=self.owner)
+        self.make_task(self.board, description=None, assignee=self.owner)
+        self.comment = self.task.comments.create(user=self.owner, content=self.text)
+        self.client = self.client_for(self.owner)
+
+    def assert_previews(self, rows, name, texts):
+        # previews are cut to TEXT_PREVIEW_LENGTH, lengths count the full text and the full text is left out
+        limit = settings.TEXT_PREVIEW_LENGTH
+        self.assertEqual([row[f'{name}_preview'] for row in rows], [text[:limit] if text else text for text in texts])
+        self.assertEqual([row[f'{name}_length'] for row in rows], [len(text or '') for text in texts])
+        self.assertTrue(all(name not in row for row in rows))
+
+    def test_task_lists(self):
+        self.assertGreater(len(self.text), settings.TEXT_PREVIEW_LENGTH)
+        for url in ('/api/tasks/assigned-to-me/', f'/api/boards/{self.board.id}/'):
+            data = self.client.get(url, {'mode': 'list'}).json()
+            self.assert_previews(data['tasks'] if 'tasks' in data else data, 'description', [self.text, None])
+        # without list mode the full text is sent
+        self.assertEqual(self.client.get('/api/tasks/assigned-to-me/').data[0]['description'], self.text)
+
+    def test_normalized_board(self):
+        data = self.client.get(f'/api/boards/{self.board.id}/', {'mode': 'list', 'format': 'normalized'}).json()
+        self.assert_previews(data['tasks'], 'description', [self.text, None])
+        self.assertEqual(data['tasks'][0]['assignee'], self.owner.id)
+        self.assertEqual(set(data['users']), {str(self.owner.id)})
+        data = self.client.get(f'/api/boards/{self.board.id}/', {'format': 'normalized'}).json()
+        self.assertEqual(data['tasks'][0]['description'], self.text)
+
+    def test_comments(self):
+        response = self.client.get(f'/api/tasks/{self.task.id}/comments/', {'mode': 'list'})
+        self.assert_previews(response.data, 'content', [self.text])
+        response = self.client.get(f'/api/tasks/{self.task.id}/comments/{self.comment.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['content'], self.text)
+
+    def test_task_is_not_modified(self):
+        url = f'/api/tasks/{self.task.id}/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['description'], self.text)
+        self.assertEqual(response['ETag'], '"1"')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"1"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.client.patch(url, {'title': 'Changed'}, format='json')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='W/"1"').status_code, 200)
+
+    def test_non_members_are_refused(self):
+        client = self.client_for(self.outsider)
+        response = client.get(f'/api/tasks/{self.task.id}/')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data, {'error': 'You must be a member or owner of the board to view this task.'})
+        response = client.get(f'/api/tasks/{self.task.id}/comments/{self.comment.id}/')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data, {'error': 'You must be a member or owner of the board to view comments.'})
+
+
+class PurgeDeletedBoardsTests(KanmindTestCase):
+
+    def test_purge_empties_every_board_table_in_batches(self):
+        owner = self.make_user('owner')
+        member = self.make_user('member')
+        board = self.make_board(owner, [member])
+        now = timezone.now()
+        for number in range(2):
+            task = self.make_task(board)
+            task.comments.create(user=member, content='Comment')
+            archived = ArchivedTasks.objects.create(
+                id=1000 + number, board=board, title='Old', status='done', priority='low', created_at=now, updated_at=now
+            )
+            archived.comments.create(id=1000 + number, user=member, content='Old comment', created_at=now)
+            ActivityLog.objects.create(board=board, task_id=task.id, user=owner, verb='commented', created_at=now)
+            TaskStatusHistory.record(board.id, task.id, None, 'to-do', now)
+            OverdueTasks.objects.create(
+                snapshot_date=date(2026, 1, number + 1), task_id=task.id, board=board, title='Task',
+                status='to-do', priority='low', due_date=date(2025, 12, 1), days_overdue=1
+            )
+            BoardFlowMetrics.objects.create(board=board, day=date(2026, 1, number + 1))
+        self.assertEqual(self.client_for(owner).delete(f'/api/boards/{board.id}/').status_code, 204)
+
+        out = StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_deleted_boards', '--batch-size', '1', '--pause', '0', stdout=out)
+        self.assertIn(f'board {board.id}: 4 comments, 4 tasks, 1 members deleted', out.getvalue())
+        self.assertFalse(Boards.all_objects.filter(id=board.id).exists())
+        for model in (Tasks, Comments, ArchivedTasks, ArchivedComments, BoardMember, ActivityLog, TaskStatusHistory, OverdueTasks, BoardFlowMetrics):
+            self.assertFalse(model.objects.exists(), model.__name__)
+        self.assertIsNotNone(BoardPurge.objects.get(board_id=board.id).finished_at)
+        # the rows of every table went in batches of one, not in the cascade of the board row
+        deletes = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('DELETE')]
+        for table in ('comments', 'tasks', 'archived_tasks', 'activity_log', 'task_status_history', 'overdue_tasks', 'board_flow_metrics'):
+            batches = [sql for sql in deletes if sql.startswith(f'DELETE FROM "{table}" WHERE "{table}"."id" IN')]
+            self.assertEqual(len(batches), 2, table)
+
+
+class ArchiveDoneTasksTests(KanmindTestCase):
+
+    def test_tasks_changed_after_selection_stay(self):
+        owner = self.make_user('owner')
+        board = self.make_board(owner)
+        tasks = [self.make_task(board, status='done') for _ in range(3)]
+        comment = tasks[0].comments.create(user=owner, content='Comment')
+        Tasks.objects.update(updated_at=timezone.now() - timedelta(days=60))
+        atomic = sharding.atomic
+
+        def change_then_atomic():
+            # another request reopens one task and edits another between the selection and the move
+            Tasks.objects.filter(id=tasks[1].id).update(status='review')
+            Tasks.objects.filter(id=tasks[2].id).update(updated_at=timezone.now())
+            return atomic()
+
+        out = StringIO()
+        with mock.patch.object(sharding, 'atomic', side_effect=change_then_atomic):
+            call_command('archive_done_tasks', '--days', '30', stdout=out)
+        self.assertIn('1 task(s) archived from 1 board(s).', out.getvalue())
+        self.assertEqual(list(ArchivedTasks.objects.values_list('id', flat=True)), [tasks[0].id])
+        self.assertEqual(list(ArchivedComments.objects.values_list('id', flat=True)), [comment.id])
+        self.assertEqual(list(Tasks.objects.order_by('id').values_list('id', flat=True)), [tasks[1].id, tasks[2].id])
+
+
+class BatchTests(KanmindTestCase):
+
+    def setUp(self):
+        # a board of the owner with a member, and a board the member cannot see
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.member = self.make_user('member')
+        self.board = self.make_board(self.owner, [self.member])
+        self.task = self.make_task(self.board)
+        self.task.comments.create(user=self.member, content='Comment')
+        self.private = self.make_board(self.make_user('outsider'))
+        self.client = self.client_for(self.member)
+
+    def batch(self, *items):
+        # post the sub-requests and return the list of results
+        response = self.client.post('/api/batch/', {'requests': list(items)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_mixed_get_requests(self):
+        paths = ['/api/boards/', f'/api/boards/{self.board.id}/', f'/api/tasks/{self.task.id}/comments/']
+        results = self.batch(
+            *paths, {'path': '/api/tasks/assigned-to-me/'}, '/api/unknown/', {'path': '/api/boards/', 'method': 'POST'}
+        )
+        self.assertEqual([result['status'] for result in results], [200, 200, 200, 200, 404, 405])
+        for path, result in zip(paths, results):
+            self.assertEqual(result['body'], self.client.get(path).json(), path)
+        self.assertEqual(results[5]['body'], {'error': 'Only GET requests can be batched.'})
+
+    def test_permission_failures_are_reported_per_item(self):
+        results = self.batch(f'/api/boards/{self.private.id}/', f'/api/boards/{self.board.id}/')
+        self.assertEqual([result['status'] for result in results], [403, 200])
+        self.assertEqual(results[0]['body'], self.client.get(f'/api/boards/{self.private.id}/').json())
+        self.assertEqual(results[1]['body']['id'], self.board.id)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_item_limit(self):
+        response = self.client.post('/api/batch/', {'requests': ['/api/boards/'] * 3}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'At most 2 requests per batch.'})
+        self.assertEqual(len(self.batch(*['/api/boards/'] * 2)), 2)
+
+    def test_sub_requests_run_as_the_batch_user(self):
+        with CaptureQueriesContext(connection) as queries:
+            results = self.batch('/api/boards/', '/api/tasks/assigned-to-me/', '/api/metrics/')
+        # the token is looked up once, for the batch request
+        self.assertEqual(len([query for query in queries.captured_queries if 'FROM "authtoken_token"' in query['sql']]), 1)
+        self.assertEqual([board['id'] for board in results[0]['body']], [self.board.id])
+        # the member is no admin, so the metrics refuse the sub-request
+        self.assertEqual(results[2]['status'], 403)
+        self.assertEqual(APIClient().post('/api/batch/', {'requests': ['/api/boards/']}, format='json').status_code, 401)
+
+    def test_file_downloads_are_refused_and_closed(self):
+        User.objects.filter(id=self.member.id).update(is_staff=True)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        Path(directory.name, 'slow.prof').write_bytes(b'stats')
+        downloads = []
+
+        def file_response(*args, **kwargs):
+            # keep the download the profile view builds
+            downloads.append(FileResponse(*args, **kwargs))
+            return downloads[-1]
+
+        with self.settings(PROFILE_DIR=directory.name), mock.patch('kanmind_app.api.views.FileResponse', side_effect=file_response):
+            results = self.batch('/api/profiles/slow/', '/api/boards/')
+        self.assertEqual([result['status'] for result in results], [400, 200])
+        self.assertEqual(results[0]['body'], {'error': 'This endpoint cannot be batched.'})
+        self.assertTrue(downloads[0].file_to_stream.closed)
+
+
+class ThrottlingTests(KanmindTestCase):
+    throttled = True
+
+    def setUp(self):
+        # a board read limit of three requests per minute
+        super().setUp()
+        rates = mock.patch.dict(BoardReadThrottle.THROTTLE_RATES, {'board-read': '3/min'})
+        rates.start()
+        self.addCleanup(rates.stop)
+        self.user = self.make_user('user')
+
+    def test_drained_bucket_answers_429_until_it_refills(self):
+        client = self.client_for(self.user)
+        with mock.patch('core.throttling.time') as clock:
+            clock.time.return_value = 1000.0
+            statuses = [client.get('/api/boards/').status_code for _ in range(3)]
+            self.assertEqual(statuses, [200, 200, 200])
+            response = client.get('/api/boards/')
+            self.assertEqual(response.status_code, 429)
+            # one token every 20 seconds
+            self.assertEqual(response['Retry-After'], '20')
+            # other clients have their own bucket
+            self.assertEqual(self.client_for(self.make_user('other')).get('/api/boards/').status_code, 200)
+            clock.time.return_value = 1019.0
+            self.assertEqual(client.get('/api/boards/').status_code, 429)
+            clock.time.return_value = 1020.0
+            self.assertEqual(client.get('/api/boards/').status_code, 200)
+            self.assertEqual(client.get('/api/boards/').status_code, 429)
+
+    def test_other_methods_are_not_counted(self):
+        client = self.client_for(self.user)
+        for number in range(5):
+            self.assertEqual(client.post('/api/boards/', {'title': f'Board {number}'}, format='json').status_code, 201)
+        self.assertEqual(client.get('/api/boards/').status_code, 200)
+
+
+class ConcurrencyLimitTests(KanmindTestCase):
+
+    def request(self):
+        # a plain request for the middleware
+        return APIRequestFactory().get('/api/boards/')
+
+    def assert_busy(self, response):
+        # the middleware sheds load with 503 and a retry hint
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertEqual(json.loads(response.content), {'error': 'Server is busy, please retry later.'})
+
+    @override_settings(MAX_CONCURRENT_REQUESTS=2, CONCURRENCY_RETRY_AFTER=2)
+    def test_requests_above_the_limit_answer_503(self):
+        middleware = ConcurrencyLimitMiddleware(lambda request: HttpResponse('ok'))
+        # two requests in flight hold both slots
+        for _ in range(2):
+            middleware.slots.acquire()
+        self.assert_busy(middleware(self.request()))
+        middleware.slots.release()
+        self.assertEqual(middleware(self.request()).status_code, 200)
+        # the finished request gave its slot back
+        self.assertEqual(middleware(self.request()).status_code, 200)
+
+    @override_settings(MAX_CONCURRENT_REQUESTS=1, CONCURRENCY_RETRY_AFTER=2)
+    def test_async_requests_share_the_limit(self):
+        async def view(request):
+            return HttpResponse('ok')
+
+        middleware = ConcurrencyLimitMiddleware(view)
+        middleware.slots.acquire()
+        self.assert_busy(asyncio.run(middleware(self.request())))
+        middleware.slots.release()
+        self.assertEqual(asyncio.run(middleware(self.request())).status_code, 200)
+
+
+class TaskPositionTests(KanmindTestCase):
+
+    def setUp(self):
+        # a to-do column with four tasks created through the api
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.board = self.make_board(self.owner)
+        self.client = self.client_for(self.owner)
+        self.tasks = [self.create_task(f'Task {number}') for number in range(4)]
+
+    def create_task(self, title, status='to-do'):
+        # create a task at the end of its column and return its id
+        data = {'board': self.board.id, 'title': title, 'status': status, 'priority': 'low'}
+        response = self.client.post('/api/tasks/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['id']
+
+    def column(self, status='to-do'):
+        # return the task ids of a column in card order
+        return list(Tasks.objects.filter(board=self.board, status=status).order_by('position', 'id').values_list('id', flat=True))
+
+    def move(self, task_id, **data):
+        # move a task and return the response
+        return self.client.post(f'/api/tasks/{task_id}/move/', data, format='json')
+
+    def test_key_between(self):
+        self.assertEqual(key_between(None, None), 'a0')
+        self.assertEqual(key_between('a0', None), 'a1')
+        self.assertEqual(key_between(None, 'a0'), 'Zz')
+        self.assertEqual(key_between('a0', 'a1'), 'a0V')
+        self.assertEqual(key_between('a0', 'a0V'), 'a0G')
+        for a, b in (('a1', 'a0'), ('a0', 'a0')):
+            with self.assertRaises(ValueError):
+                key_between(a, b)
+
+    def test_random_insertions_keep_their_order(self):
+        keys = []
+        generator = random.Random(7)
+        for _ in range(300):
+            index = generator.randint(0, len(keys))
+            before = keys[index - 1] if index else None
+            after = keys[index] if index < len(keys) else None
+            key = key_between(before, after)
+            self.assertTrue((before is None or before < key) and (after is None or key < after))
+            keys.insert(index, key)
+        self.assertEqual(keys, sorted(keys))
+
+    def test_new_tasks_go_to_the_end(self):
+        self.assertEqual(self.column(), self.tasks)
+        self.assertEqual(list(Tasks.objects.filter(id__in=self.tasks).order_by('id').values_list('position', flat=True)), ['a0', 'a1', 'a2', 'a3'])
+
+    def test_moves_between_neighbours_and_to_both_ends(self):
+        first, second, third, fourth = self.tasks
+        response = self.move(fourth, after_id=first, before_id=second)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'id': fourth, 'status': 'to-do', 'position': 'a0V'})
+        self.assertEqual(self.column(), [first, fourth, second, third])
+        # head and tail
+        self.assertEqual(self.move(third, before_id=first).status_code, 200)
+        self.assertEqual(self.column(), [third, first, fourth, second])
+        self.assertEqual(self.move(third, after_id=second).status_code, 200)
+        self.assertEqual(self.column(), [first, fourth, second, third])
+        # only the moved row was written
+        self.assertEqual(Tasks.objects.get(id=first).position, 'a0')
+
+    def test_move_to_another_column(self):
+        done = self.create_task('Done', status='done')
+        self.assertEqual(self.move(self.tasks[0], status='done').status_code, 200)
+        self.assertEqual(self.column('done'), [done, self.tasks[0]])
+        self.assertEqual(self.move(self.tasks[1], status='done', before_id=done).status_code, 200)
+        self.assertEqual(self.column('done'), [self.tasks[1], done, self.tasks[0]])
+        self.assertEqual(self.column(), self.tasks[2:])
+        self.assertEqual(self.move(self.tasks[2], status='done', after_id=self.tasks[3]).status_code, 400)
+
+    def test_rebalance_keeps_the_order(self):
+        first, second = self.tasks[:2]
+        # keys grow when tasks keep being dropped right below the first one
+        for task_id in self.tasks[2:] * 10:
+            self.assertEqual(self.move(task_id, after_id=first, before_id=self.column()[1]).status_code, 200)
+        order = self.column()
+        self.assertGreater(max(len(key) for key in Tasks.objects.values_list('position', flat=True)), 4)
+        self.assertEqual(Tasks.rebalance_column(self.board.id, 'to-do'), 4)
+        self.assertEqual(self.column(), order)
+        self.assertEqual(list(Tasks.objects.filter(id__in=order).order_by('position').values_list('position', flat=True)), ['a0', 'a1', 'a2', 'a3'])
+
+    def test_tied_positions_are_repaired(self):
+        # what concurrent creates in one column produce: both read the same last key
+        position = Tasks.next_position(self.board.id, 'to-do')
+        tied = [self.make_task(self.board, position=position).id for _ in range(2)]
+        self.assertEqual(self.column(), self.tasks + tied)
+        out = StringIO()
+        call_command('rebalance_task_positions', stdout=out)
+        self.assertIn('1 column(s) rebalanced.', out.getvalue())
+        self.assertEqual(self.column(), self.tasks + tied)
+        self.assertEqual(len(set(Tasks.objects.values_list('position', flat=True))), 6)
+
+    def test_move_between_tied_tasks_renumbers_the_column(self):
+        position = Tasks.next_position(self.board.id, 'to-do')
+        tied = [self.make_task(self.board, position=position).id for _ in range(2)]
+        self.assertEqual(self.move(self.tasks[0], after_id=tied[0], before_id=tied[1]).status_code, 200)
+        self.assertEqual(self.column(), self.tasks[1:] + [tied[0], self.tasks[0], tied[1]])
+
+
+class CommentPaginationTests(KanmindTestCase):
+
+    def setUp(self):
+        # five comments, the middle three written at the same time (ids break the tie)
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.task = self.make_task(self.make_board(self.owner))
+        self.comments = [self.task.comments.create(user=self.owner, content=f'Comment {number}').id for number in range(5)]
+        start = timezone.now()
+        for comment_id, seconds in zip(self.comments, (0, 1, 1, 1, 2)):
+            Comments.objects.filter(id=comment_id).update(created_at=start + timedelta(seconds=seconds))
+        self.client = self.client_for(self.owner)
+
+    def page(self, url, **params):
+        # get one page and return the comment ids and the links by rel
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        links = {}
+        for link in filter(None, response.get('Link', '').split(', ')):
+            target, rel = link.split('; ')
+            links[rel[5:-1]] = target[1:-1]
+        return [comment['id'] for comment in response.data], links
+
+    def test_after_and_before_cursors(self):
+        ids, links = self.page(f'/api/tasks/{self.task.id}/comments/', limit=2)
+        self.assertEqual(ids, self.comments[:2])
+        self.assertEqual(set(links), {'next'})
+        ids, links = self.page(links['next'])
+        self.assertEqual(ids, self.comments[2:4])
+        self.assertEqual(set(links), {'next', 'prev'})
+        ids, last_links = self.page(links['next'])
+        self.assertEqual(ids, self.comments[4:])
+        self.assertEqual(set(last_links), {'prev'})
+        # walking back returns the same pages
+        ids, links = self.page(last_links['prev'])
+        self.assertEqual(ids, self.comments[2:4])
+        ids, links = self.page(links['prev'])
+        self.assertEqual(ids, self.comments[:2])
+        self.assertEqual(set(links), {'next'})
+
+    def test_bad_parameters(self):
+        url = f'/api/tasks/{self.task.id}/comments/'
+        for params, error in (
+            ({'after': 'not-a-cursor'}, 'Invalid cursor.'),
+            ({'after': 'x', 'before': 'y'}, 'Use either before or after, not both.'),
+            ({'limit': '0'}, 'Limit must be positive.'),
+        ):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data, {'error': error})
+
+
+class BoardColumnsTests(KanmindTestCase):
+
+    def setUp(self):
+        # five to-do tasks (the last two without due date, due dates reversed) and two in review
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.board = self.make_board(self.owner)
+        today = timezone.localdate()
+        self.todo = [
+            self.make_task(self.board, position=key, due_date=today + timedelta(days=3 - number) if number < 3 else None).id
+            for number, key in enumerate(sequential_keys(5))
+        ]
+        self.review = [self.make_task(self.board, status='review', position=key).id for key in sequential_keys(2)]
+        self.url = f'/api/boards/{self.board.id}/columns/'
+        self.client = self.client_for(self.owner)
+
+    def get(self, **params):
+        # get the columns and check the status code
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_first_window_of_every_column(self):
+        columns = self.get(limit=2)
+        self.assertEqual([column['status'] for column in columns], ['to-do', 'in-progress', 'review', 'done'])
+        self.assertEqual([column['total'] for column in columns], [5, 0, 2, 0])
+        self.assertEqual([task['id'] for task in columns[0]['tasks']], self.todo[:2])
+        self.assertEqual([task['id'] for task in columns[2]['tasks']], self.review)
+        self.assertIsNotNone(columns[0]['next'])
+        self.assertEqual([column['next'] for column in columns[1:]], [None, None, None])
+
+    def test_cursor_loads_more_of_one_column(self):
+        cursor = self.get(limit=2)[0]['next']
+        ids = []
+        while cursor:
+            [column] = self.get(status='to-do', after=cursor, limit=2)
+            self.assertEqual(column['total'], 5)
+            ids.extend(task['id'] for task in column['tasks'])
+            cursor = column['next']
+        self.assertEqual(ids, self.todo[2:])
+
+    def test_due_date_order_puts_tasks_without_date_last(self):
+        [column] = self.get(status='to-do', order='due_date', limit=2)
+        self.assertEqual([task['id'] for task in column['tasks']], [self.todo[2], self.todo[1]])
+        [column] = self.get(status='to-do', order='due_date', after=column['next'], limit=2)
+        self.assertEqual([task['id'] for task in column['tasks']], [self.todo[0], self.todo[3]])
+        [column] = self.get(status='to-do', order='due_date', after=column['next'], limit=2)
+        self.assertEqual([task['id'] for task in column['tasks']], [self.todo[4]])
+        self.assertIsNone(column['next'])
+
+    def test_bad_parameters(self):
+        for params, error in (
+            ({'order': 'title'}, 'Order must be one of: position, due_date'),
+            ({'after': 'abc'}, 'A valid status is required with after.'),
+            ({'limit': 'many'}, 'Limit must be an integer.'),
+        ):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data, {'error': error})
+
+
+class ActivityTests(KanmindTestCase):
+
+    def setUp(self):
+        # a private buffer that only flushes when asked (or when full)
+        super().setUp()
+        patcher = mock.patch.object(activity, 'buffer', activity.ActivityBuffer(max_size=100, interval=60))
+        self.buffer = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.owner = self.make_user('owner')
+        self.member = self.make_user('member')
+        self.board = self.make_board(self.owner, [self.member])
+        self.task = self.make_task(self.board)
+        self.client = self.client_for(self.owner)
+
+    def test_events_are_buffered_until_the_feed_is_read(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/tasks/{self.task.id}/', {'status': 'review', 'assignee_id': self.member.id}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'/api/tasks/{self.task.id}/comments/', {'content': 'Done?'}, format='json')
+        self.assertEqual(len(self.buffer.events), 3)
+        self.assertFalse(ActivityLog.objects.exists())
+        # the feed writes the pending events first and lists them newest first
+        response = self.client.get(f'/api/boards/{self.board.id}/activity/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.buffer.events, [])
+        self.assertEqual([event['verb'] for event in response.data], ['commented', 'assigned', 'status_changed'])
+        self.assertEqual(response.data[2]['payload'], {'old': 'to-do', 'new': 'review'})
+        self.assertEqual(response.data[2]['user']['id'], self.owner.id)
+
+    def test_rolled_back_changes_record_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError):
+                with transaction.atomic():
+                    activity.record(self.board.id, 'commented', user=self.owner, task_id=self.task.id)
+                    raise DatabaseError('rolled back')
+            activity.record(self.board.id, 'commented', user=self.member, task_id=self.task.id)
+        self.assertEqual([event.user for event in self.buffer.events], [self.member])
+
+    def test_full_buffer_flushes_in_one_insert(self):
+        buffer = activity.ActivityBuffer(max_size=3, interval=60)
+        events = [
+            ActivityLog(board=self.board, task_id=self.task.id, verb='commented', created_at=timezone.now())
+            for _ in range(3)
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            for event in events[:2]:
+                buffer.append(event)
+            self.assertFalse(ActivityLog.objects.exists())
+            buffer.append(events[2])
+        self.assertEqual(ActivityLog.objects.count(), 3)
+        self.assertEqual(len([query for query in queries.captured_queries if query['sql'].startswith('INSERT')]), 1)
+
+
+class DueTasksTests(KanmindTestCase):
+
+    def setUp(self):
+        # open and done tasks with and without due date, and a task on a board the user cannot see
+        super().setUp()
+        self.user = self.make_user('user')
+        board = self.make_board(self.user)
+        self.tasks = {
+            day: self.make_task(board, status=task_status, due_date=date(2026, 3, day)).id
+            for day, task_status in ((5, 'review'), (1, 'to-do'), (10, 'done'), (3, 'in-progress'))
+        }
+        self.make_task(board)
+        self.make_task(self.make_board(self.make_user('outsider')), due_date=date(2026, 3, 2))
+        self.client = self.client_for(self.user)
+
+    def due(self, **params):
+        # list due tasks and return their ids
+        response = self.client.get('/api/tasks/due/', params)
+        self.assertEqual(response.status_code, 200)
+        return [task['id'] for task in response.data]
+
+    def snapshot(self, day, *args):
+        # store the overdue snapshot of a day and return the command output
+        out = StringIO()
+        call_command('snapshot_overdue_tasks', '--date', day, *args, stdout=out)
+        return out.getvalue()
+
+    def test_open_tasks_by_due_date(self):
+        self.assertEqual(self.due(), [self.tasks[1], self.tasks[3], self.tasks[5]])
+        self.assertEqual(self.due(status='done'), [self.tasks[10]])
+        self.assertEqual(self.due(after='2026-03-01', before='2026-03-05'), [self.tasks[3]])
+        response = self.client.get('/api/tasks/due/', {'limit': 2})
+        self.assertEqual([task['id'] for task in response.data], [self.tasks[1], self.tasks[3]])
+        self.assertIn('next=', response['Link'])
+        self.assertEqual(self.client.get('/api/tasks/due/', {'before': '03/05/2026'}).data, {'error': 'before must be a date (YYYY-MM-DD).'})
+
+    def test_snapshot_lists_overdue_tasks(self):
+        # every board is stored, the list only shows the user's boards
+        self.assertIn('4 overdue task(s) stored for 2026-03-06, 0 expired row(s) removed.', self.snapshot('2026-03-06'))
+        # running the same day again replaces its rows
+        self.snapshot('2026-03-06')
+        self.assertEqual(OverdueTasks.objects.count(), 4)
+        response = self.client.get('/api/tasks/overdue/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['task_id'], row['days_overdue']) for row in response.data],
+            [(self.tasks[1], 5), (self.tasks[3], 3), (self.tasks[5], 1)]
+        )
+        # a later snapshot becomes the default, old ones expire after --keep-days
+        Tasks.objects.filter(id=self.tasks[1]).update(status='done')
+        self.assertIn('3 overdue task(s) stored for 2026-03-20, 0 expired row(s) removed.', self.snapshot('2026-03-20'))
+        self.assertEqual([row['task_id'] for row in self.client.get('/api/tasks/overdue/').data], [self.tasks[3], self.tasks[5]])
+        self.assertEqual(len(self.client.get('/api/tasks/overdue/', {'date': '2026-03-06'}).data), 3)
+        self.assertIn('4 expired row(s) removed.', self.snapshot('2026-03-20', '--keep-days', '10'))
+        self.assertEqual(self.client.get('/api/tasks/overdue/', {'date': '2026-03-06'}).data, [])
+
+
+class CompressionTests(KanmindTestCase):
+
+    def setUp(self):
+        # a board whose detail payload is well above GZIP_MIN_LENGTH
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.board = self.make_board(self.owner)
+        for number in range(10):
+            self.make_task(self.board, title=f'Task {number}', description='Long description. ' * 20)
+        self.client = self.client_for(self.owner)
+        self.url = f'/api/boards/{self.board.id}/'
+
+    def test_cached_gzip_body_is_served_without_compressing_again(self):
+        with mock.patch.object(compression, 'compress', wraps=compression.compress) as compress:
+            first = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            # the payload is compressed once, when it is cached
+            self.assertEqual(compress.call_count, 1)
+            second = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(compress.call_count, 1)
+        for response in (first, second):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Content-Length'], str(len(response.content)))
+            self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(first.content, second.content)
+        data = json.loads(gzip.decompress(second.content))
+        self.assertEqual(len(data['tasks']), 10)
+        self.assertGreater(len(json.dumps(data)), settings.GZIP_MIN_LENGTH)
+        self.assertEqual(metrics.snapshot()['compression.precompressed'], 2)
+
+    def test_clients_without_gzip_get_the_json(self):
+        self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(len(response.json()['tasks']), 10)
+
+    def test_small_responses_stay_plain(self):
+        response = self.client.get(f'/api/tasks/{self.board.tasks.first().id}/comments/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.json(), [])
+
+
+class ProfilerTests(KanmindTestCase):
+
+    def setUp(self):
+        # profiles go to a temporary directory
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.admin = self.make_user('admin')
+        User.objects.filter(id=self.admin.id).update(is_staff=True)
+        self.board = self.make_board(self.admin)
+
+    def profile(self, **options):
+        # run one board request through the full middleware chain with the profiler settings
+        with self.settings(PROFILE_DIR=self.directory, **options):
+            self.assertEqual(self.client_for(self.admin).get(f'/api/boards/{self.board.id}/').status_code, 200)
+
+    def test_slow_sampled_requests_are_kept(self):
+        self.profile(PROFILE_SAMPLE_RATE=1, PROFILE_SLOW_MS=0)
+        [meta] = ProfileStore(self.directory, 10 ** 6).list()
+        self.assertEqual((meta['url_name'], meta['method'], meta['path'], meta['status']), ('boards-detail', 'GET', f'/api/boards/{self.board.id}/', 200))
+        self.assertGreater(meta['queries'], 0)
+        self.assertTrue((self.directory / f'{meta["name"]}.prof').exists())
+        # fast requests and a zero sample rate keep nothing
+        self.profile(PROFILE_SAMPLE_RATE=1, PROFILE_SLOW_MS=60_000)
+        self.profile(PROFILE_SAMPLE_RATE=0, PROFILE_SLOW_MS=0)
+        self.assertEqual(len(list(self.directory.glob('*.prof'))), 1)
+
+    def test_oldest_dumps_are_rotated_out(self):
+        store = ProfileStore(self.directory, max_bytes=250)
+        profiler = mock.Mock(dump_stats=lambda path: Path(path).write_bytes(b'x' * 100))
+        names = []
+        for number in range(3):
+            names.append(store.save(profiler, {'created_at': number})['name'])
+            # distinct modification times, oldest first
+            os.utime(self.directory / f'{names[-1]}.prof', (1000 + number, 1000 + number))
+        self.assertEqual([meta['name'] for meta in store.list()], [names[2], names[1]])
+        self.assertFalse((self.directory / f'{names[0]}.json').exists())
+        # the newest dump stays even when it alone is above the cap
+        ProfileStore(self.directory, max_bytes=50).rotate()
+        self.assertEqual([meta['name'] for meta in store.list()], [names[2]])
+
+    def test_endpoints(self):
+        self.profile(PROFILE_SAMPLE_RATE=1, PROFILE_SLOW_MS=0)
+        client = self.client_for(self.admin)
+        with self.settings(PROFILE_DIR=self.directory):
+            [meta] = client.get('/api/profiles/').data
+            self.assertGreater(meta['size'], 0)
+            response = client.get(f'/api/profiles/{meta["name"]}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), (self.directory / f'{meta["name"]}.prof').read_bytes())
+            self.assertEqual(client.get('/api/profiles/unknown/').data, {'error': 'Profile not found'})
+            self.assertEqual(self.client_for(self.make_user('member')).get('/api/profiles/').status_code, 403)
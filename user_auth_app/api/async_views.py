@@ -0,0 +1,114 @@
+# standard bib imports
+import json
+from asgiref.sync import sync_to_async
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+
+# third party imports
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import ValidationError
+
+# local imports
+from core.throttling import LoginThrottle
+from user_auth_app.hashing import pool, HashQueueFull
+from .serializers import RegistrationSerializer
+
+
+def read_json(request):
+    # parse the json body (an empty dict for invalid input)
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def busy_response():
+    # answer with 503 when the hashing queue is full
+    response = JsonResponse({'error': 'Server is busy, please retry later.'}, status=503)
+    response['Retry-After'] = '1'
+    return response
+
+
+async def check_throttle(request):
+    # apply the login throttle (the bucket store is synchronous)
+    throttle = LoginThrottle()
+    if await sync_to_async(throttle.allow_request)(request, None):
+        return None
+    response = JsonResponse({'detail': 'Request was throttled.'}, status=429)
+    response['Retry-After'] = str(int(throttle.wait()) + 1)
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def login_view(request):
+    # reject clients over their login budget
+    throttled = await check_throttle(request)
+    if throttled:
+        return throttled
+    # read credentials
+    data = read_json(request)
+    email, password = data.get('email'), data.get('password')
+    if not email or not password:
+        return JsonResponse({'non_field_errors': ['Both email and password are required.']}, status=400)
+    # look up the user without blocking the event loop
+    user = await User.objects.filter(email=email).afirst()
+    try:
+        if user is None or not user.is_active:
+            # hash anyway so unknown emails take as long as wrong passwords
+            await pool.run(make_password, password)
+            valid = False
+        else:
+            # check_password rehashes the stored hash when the hasher policy changed
+            valid = await pool.run(user.check_password, password)
+    except HashQueueFull:
+        return busy_response()
+    if not valid:
+        return JsonResponse({'non_field_errors': ['Invalid email or password.']}, status=400)
+    # creates or retrieves an authentication token for the user
+    token, created = await Token.objects.aget_or_create(user=user)
+    return JsonResponse({
+        'token': token.key,
+        'fullname': user.username,
+        'email': user.email,
+        'user_id': user.id
+    }, status=200)
+
+
+@csrf_exempt
+@require_POST
+async def registration_view(request):
+    # reject clients over their registration budget
+    throttled = await check_throttle(request)
+    if throttled:
+        return throttled
+    # validate input with the regular registration serializer
+    serializer = RegistrationSerializer(data=read_json(request))
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=200)
+    if serializer.validated_data['password'] != serializer.validated_data['repeated_password']:
+        return JsonResponse({'error': 'passwords dont match'}, status=400)
+    # reject taken emails before spending a hash on them (save() checks again for races)
+    if await User.objects.filter(email=serializer.validated_data['email']).aexists():
+        return JsonResponse({'error': ['This email address already exists.']}, status=400)
+    # hash the password in the worker pool
+    try:
+        password_hash = await pool.run(make_password, serializer.validated_data['password'])
+    except HashQueueFull:
+        return busy_response()
+    # save the account and get its token
+    try:
+        account = await sync_to_async(serializer.save)(password_hash=password_hash)
+    except ValidationError as e:
+        return JsonResponse(e.detail, status=400, safe=False)
+    token, created = await Token.objects.aget_or_create(user=account)
+    return JsonResponse({
+        'token': token.key,
+        'fullname': account.username,
+        'email': account.email,
+        'user_id': account.id
+    }, status=200)
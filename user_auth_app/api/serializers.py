@@ -29,8 +29,8 @@ class RegistrationSerializer(serializers.ModelSerializer):
             }
         }
 
-    # check if passwords match
-    def save(self):
+    # check if passwords match (password_hash lets callers hash the password elsewhere)
+    def save(self, password_hash=None):
         # extract validated data for password, repeated password, email, and username
         fullname = self. validated_data['username']
         pw = self.validated_data['password']
@@ -57,7 +57,10 @@ class RegistrationSerializer(serializers.ModelSerializer):
                        last_name=last_name)
         
         # hash the password before saving to ensure security
-        account.set_password(pw)
+        if password_hash:
+            account.password = password_hash
+        else:
+            account.set_password(pw)
         account.save()  # save the user to the database
         
         return account  # return the newly created user instance
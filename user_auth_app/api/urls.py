@@ -6,9 +6,13 @@ from rest_framework.authtoken.views import obtain_auth_token
 
 # local imports
 from .views import RegistrationView, CustomLoginView
+from .async_views import registration_view, login_view
 
 
 urlpatterns = [
     path('registration/', RegistrationView.as_view(), name='registration'),
-    path('login/', CustomLoginView.as_view(), name='login')
+    path('login/', CustomLoginView.as_view(), name='login'),
+    # async variants that hash passwords in a worker pool instead of the request thread
+    path('async/registration/', registration_view, name='async-registration'),
+    path('async/login/', login_view, name='async-login'),
 ]
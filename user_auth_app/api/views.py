@@ -10,6 +10,7 @@ from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.response import Response
 
 # local imports
+from core.throttling import LoginThrottle
 from user_auth_app.models import UserProfile
 from .serializers import UserProfileSerializer, RegistrationSerializer, CustomAuthTokenSerializer
 
@@ -24,6 +25,7 @@ from .serializers import UserProfileSerializer, RegistrationSerializer, CustomAu
 
 class RegistrationView(APIView):
     permission_classes = [AllowAny] # gives permission to use this view at any time
+    throttle_classes = [LoginThrottle] # limits registration attempts per client
 
     def post(self, request):
         serializer = RegistrationSerializer(data=request.data)
@@ -47,6 +49,9 @@ class RegistrationView(APIView):
 class CustomLoginView(ObtainAuthToken):
     # allows access to all users without requiring authentication
     permission_classes = [AllowAny]
+
+    # limits login attempts per client
+    throttle_classes = [LoginThrottle]
     
     # sets the serializer class to handle user authentication
     serializer_class = CustomAuthTokenSerializer
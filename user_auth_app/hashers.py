@@ -0,0 +1,15 @@
+# standard bib imports
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class PolicyPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # PBKDF2 with the iteration count taken from PASSWORD_HASH_ITERATIONS. stored hashes
+    # with a different count (higher or lower) are rehashed on the next successful login,
+    # because check_password() calls its setter whenever must_update() is true.
+    algorithm = 'pbkdf2_sha256'
+
+    @property
+    def iterations(self):
+        # fall back to Django's default when no policy is configured
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
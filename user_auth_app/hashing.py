@@ -0,0 +1,43 @@
+# standard bib imports
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+
+class HashQueueFull(Exception):
+    # raised when too many hashing jobs are waiting
+    pass
+
+
+class PasswordHashPool:
+    # runs password hashing in a bounded thread pool (hashlib releases the GIL while hashing)
+
+    def __init__(self, workers, max_pending):
+        # size the pool and limit the number of queued plus running jobs
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, fn, *args):
+        # queue a job or fail fast when the queue is full
+        if not self.slots.acquire(blocking=False):
+            raise HashQueueFull()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    async def run(self, fn, *args):
+        # await a job without blocking the event loop
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+# one pool per process, sized to the cpu cores unless configured
+pool = PasswordHashPool(
+    getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1,
+    getattr(settings, 'PASSWORD_HASH_MAX_PENDING', 64),
+)
@@ -0,0 +1,82 @@
+# standard bib imports
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory
+
+# local imports
+from user_auth_app.api.async_views import login_view
+from user_auth_app.api.views import CustomLoginView
+
+EMAIL = 'bench-login@example.com'
+PASSWORD = 'bench-login-password'
+
+
+class Command(BaseCommand):
+    help = 'Compares login throughput of the sync view and the async pool backed view under concurrency.'
+
+    def add_arguments(self, parser):
+        # define load shape
+        parser.add_argument('--requests', type=int, default=64, help='Logins per run.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent logins.')
+
+    def handle(self, *args, **options):
+        # create a throwaway user and always remove it again
+        user = User.objects.create_user(username='bench-login', email=EMAIL, password=PASSWORD)
+        body = json.dumps({'email': EMAIL, 'password': PASSWORD})
+        try:
+            sync_rate = self.bench_sync(body, options['requests'], options['concurrency'])
+            async_rate = self.bench_async(body, options['requests'], options['concurrency'])
+        finally:
+            user.delete()
+        self.stdout.write(f"sync view, one thread (how ASGI runs sync views): {sync_rate['serial']:.1f} logins/s")
+        self.stdout.write(f"sync view, {options['concurrency']} threads: {sync_rate['threaded']:.1f} logins/s")
+        self.stdout.write(f"async view, {options['concurrency']} concurrent: {async_rate:.1f} logins/s")
+
+    def bench_sync(self, body, total, concurrency):
+        # call the DRF view serially and from a thread pool
+        factory = RequestFactory()
+        view = CustomLoginView.as_view(throttle_classes=[])
+
+        def login(_):
+            response = view(factory.post('/api/login/', body, content_type='application/json'))
+            assert response.status_code == 200, response.data
+
+        start = time.perf_counter()
+        for i in range(total):
+            login(i)
+        serial = total / (time.perf_counter() - start)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(login, range(total)))
+        threaded = total / (time.perf_counter() - start)
+        return {'serial': serial, 'threaded': threaded}
+
+    def bench_async(self, body, total, concurrency):
+        # run the async view with a bounded number of in-flight logins
+        factory = AsyncRequestFactory()
+
+        async def run():
+            limit = asyncio.Semaphore(concurrency)
+
+            async def login():
+                async with limit:
+                    response = await login_view(factory.post('/api/async/login/', body, content_type='application/json'))
+                    assert response.status_code == 200, response.content
+
+            start = time.perf_counter()
+            await asyncio.gather(*(login() for _ in range(total)))
+            return total / (time.perf_counter() - start)
+
+        # the throttle would stop the benchmark, so it is disabled for the run
+        from user_auth_app.api import async_views
+        original = async_views.check_throttle
+        async_views.check_throttle = sync_to_async(lambda request: None)
+        try:
+            return asyncio.run(run())
+        finally:
+            async_views.check_throttle = original
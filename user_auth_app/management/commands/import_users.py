@@ -0,0 +1,194 @@
+# standard bib imports
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import transaction, DatabaseError
+from django.db.models.functions import Lower
+
+# third party imports
+from rest_framework.authtoken.models import Token
+
+# local imports
+from kanmind_app.models import Boards, BoardMember
+from kanmind_app.api.cache import invalidate_board
+from kanmind_app.sharding import shard_for_id, sharding_enabled
+from kanmind_app.signals import replicate_users
+from user_auth_app.models import UserSearchKey
+from user_auth_app.search import search_keys
+
+
+def setup_worker():
+    # hashing processes need configured settings for make_password (spawned processes start empty)
+    import django
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = 'Creates users with tokens from a CSV (fullname,email,password[,boards]), hashing passwords in parallel.'
+
+    def add_arguments(self, parser):
+        # define input, batch size, parallelism and boards every user joins
+        parser.add_argument('csv_path', help='CSV file with a header row, - reads stdin.')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows hashed and inserted together.')
+        parser.add_argument('--workers', type=int, default=None, help='Hashing processes (cpu count by default).')
+        parser.add_argument('--board', type=int, action='append', default=[], help='Board every user joins (repeatable).')
+
+    def handle(self, *args, **options):
+        # make sure the shared boards exist before anything is written
+        shared_boards = self.load_boards(options['board'])
+        missing = set(options['board']) - set(shared_boards)
+        if missing:
+            raise CommandError(f'Unknown board(s): {", ".join(map(str, sorted(missing)))}.')
+        self.created = 0
+        self.errors = 0
+        self.hash_seconds = 0.0
+        self.seen_emails = set()
+        self.seen_usernames = set()
+        self.touched_boards = {}
+        workers = options['workers'] or os.cpu_count() or 1
+        start = time.perf_counter()
+        handle = sys.stdin if options['csv_path'] == '-' else open(options['csv_path'], newline='', encoding='utf-8')
+        try:
+            reader = csv.DictReader(handle)
+            if not reader.fieldnames or not {'fullname', 'email', 'password'} <= set(reader.fieldnames):
+                raise CommandError('The CSV needs the columns fullname, email and password.')
+            # line numbers start after the header row
+            rows = enumerate(reader, start=2)
+            with ProcessPoolExecutor(max_workers=workers, initializer=setup_worker) as executor:
+                while True:
+                    chunk = list(islice(rows, options['batch_size']))
+                    if not chunk:
+                        break
+                    self.import_chunk(chunk, shared_boards, executor, workers)
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+        # drop cached board payloads that now miss the new members
+        for board in self.touched_boards.values():
+            invalidate_board(board)
+        elapsed = time.perf_counter() - start
+        rate = self.created / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{self.created} user(s) created, {self.errors} row(s) failed in {elapsed:.1f}s '
+            f'({rate:.1f} users/s, {self.hash_seconds:.1f}s hashing with {workers} process(es))'
+        )
+        if self.errors:
+            self.stdout.write(self.style.WARNING('See the errors above for the rows that were skipped.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('All rows imported.'))
+
+    def load_boards(self, board_ids):
+        # return the active boards with the given ids by id, looked up on their shards
+        boards = {}
+        for board_id in set(board_ids):
+            board = Boards.objects.using(shard_for_id(board_id)).filter(id=board_id).first()
+            if board:
+                boards[board_id] = board
+        return boards
+
+    def fail(self, line, message):
+        # report a skipped row
+        self.errors += 1
+        self.stderr.write(f'line {line}: {message}')
+
+    def import_chunk(self, chunk, shared_boards, executor, workers):
+        # validate the rows, hash their passwords in parallel and insert them together
+        valid = self.validate(chunk)
+        if not valid:
+            return
+        # boards named in the csv are looked up once per chunk
+        board_ids = {board_id for row in valid for board_id in row['boards']}
+        boards = {**self.load_boards(board_ids - set(shared_boards)), **shared_boards}
+        started = time.perf_counter()
+        passwords = [row['password'] for row in valid]
+        hashes = list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // workers)))
+        self.hash_seconds += time.perf_counter() - started
+        users = []
+        for row, password in zip(valid, hashes):
+            name_parts = row['fullname'].split(maxsplit=1)
+            users.append(User(
+                username=row['fullname'], email=row['email'], password=password,
+                first_name=name_parts[0], last_name=name_parts[1] if len(name_parts) > 1 else ''
+            ))
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+                Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users])
+                # bulk_create sends no post_save, so the search keys are written here
+                UserSearchKey.objects.bulk_create(
+                    [UserSearchKey(user=user, key=key) for user in users for key in search_keys(user)],
+                    ignore_conflicts=True
+                )
+        except DatabaseError as e:
+            for row in valid:
+                self.fail(row['line'], f'not inserted ({e}).')
+            return
+        self.created += len(users)
+        # copy the users to the board shards (no post_save here either)
+        if sharding_enabled():
+            replicate_users(users)
+        self.add_memberships(valid, users, boards, shared_boards)
+
+    def validate(self, chunk):
+        # return the usable rows of a chunk and report the others
+        valid = []
+        for line, row in chunk:
+            fullname = (row.get('fullname') or '').strip()
+            email = (row.get('email') or '').strip()
+            password = row.get('password') or ''
+            try:
+                board_ids = [int(value) for value in (row.get('boards') or '').replace(';', ' ').split()]
+            except ValueError:
+                self.fail(line, 'boards must be board ids separated by ;.')
+                continue
+            if not fullname or not password:
+                self.fail(line, 'fullname and password are required.')
+                continue
+            try:
+                validate_email(email)
+            except ValidationError:
+                self.fail(line, f'invalid email {email!r}.')
+                continue
+            if email.lower() in self.seen_emails:
+                self.fail(line, f'{email} appears twice in the file.')
+                continue
+            if fullname in self.seen_usernames:
+                self.fail(line, f'{fullname} appears twice in the file.')
+                continue
+            self.seen_emails.add(email.lower())
+            self.seen_usernames.add(fullname)
+            valid.append({'line': line, 'fullname': fullname, 'email': email, 'password': password, 'boards': board_ids})
+        # skip users that already exist (one query per field and chunk, emails compared case-insensitively)
+        existing = User.objects.annotate(email_lower=Lower('email')).filter(email_lower__in=[row['email'].lower() for row in valid])
+        emails = set(existing.values_list('email_lower', flat=True))
+        usernames = set(User.objects.filter(username__in=[row['fullname'] for row in valid]).values_list('username', flat=True))
+        usable = []
+        for row in valid:
+            if row['email'].lower() in emails:
+                self.fail(row['line'], f'{row["email"]} already exists.')
+            elif row['fullname'] in usernames:
+                self.fail(row['line'], f'{row["fullname"]} already exists.')
+            else:
+                usable.append(row)
+        return usable
+
+    def add_memberships(self, rows, users, boards, shared_boards):
+        # add the users to their boards with batched inserts on each board's shard
+        memberships = {}
+        for row, user in zip(rows, users):
+            for board_id in set(row['boards']) | set(shared_boards):
+                if board_id not in boards:
+                    self.stderr.write(f'line {row["line"]}: unknown board {board_id} skipped.')
+                    continue
+                memberships.setdefault(shard_for_id(board_id), []).append(BoardMember(user_id=user.id, board_id=board_id))
+                self.touched_boards[board_id] = boards[board_id]
+        for alias, members in memberships.items():
+            BoardMember.objects.using(alias).bulk_create(members, batch_size=500, ignore_conflicts=True)
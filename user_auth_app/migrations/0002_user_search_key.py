@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2026-10-19 03:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from user_auth_app.search import search_keys
+
+
+def backfill_search_keys(apps, schema_editor):
+    # store the search keys of all existing users (of the database being migrated, not the routed one)
+    alias = schema_editor.connection.alias
+    User = apps.get_model('auth', 'User')
+    UserSearchKey = apps.get_model('user_auth_app', 'UserSearchKey')
+    rows = [UserSearchKey(user_id=user.id, key=key) for user in User.objects.using(alias).iterator() for key in search_keys(user)]
+    UserSearchKey.objects.using(alias).bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_auth_app', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_search_keys',
+                'constraints': [models.UniqueConstraint(fields=('key', 'user'), name='user_search_keys_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_search_keys, migrations.RunPython.noop),
+    ]
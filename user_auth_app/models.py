@@ -1,10 +1,11 @@
 # standard bib imports
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 
 # third party imports
 
 # local imports
+from .search import search_keys, KEY_MAX_LENGTH
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -13,3 +14,27 @@ class UserProfile(models.Model):
 
     def __str__(self):
         return self.user.username
+
+
+class UserSearchKey(models.Model):
+    # link search key to its user
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_keys')
+    # stores a normalized email, name or name part (see search.normalize)
+    key = models.CharField(max_length=KEY_MAX_LENGTH)
+
+    class Meta:
+        # define database table name
+        db_table = 'user_search_keys'
+        # a user is stored once per key
+        constraints = [models.UniqueConstraint(fields=['key', 'user'], name='user_search_keys_unique')]
+
+    @classmethod
+    def refresh_for(cls, user):
+        # replace the stored keys of a user with the keys of its current fields
+        keys = search_keys(user)
+        with transaction.atomic():
+            cls.objects.filter(user=user).exclude(key__in=keys).delete()
+            cls.objects.bulk_create([cls(user=user, key=key) for key in keys], ignore_conflicts=True)
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,68 @@
+# standard bib imports
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# upper bound used to turn a prefix into a range over the search keys
+PREFIX_END = '\U0010ffff'
+# longest stored key (UserSearchKey.key), longer keys and prefixes are cut to it
+KEY_MAX_LENGTH = 255
+
+
+def normalize(text):
+    # lowercase and strip accents so "Jörg" and "jorg" produce the same key
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold().strip()
+
+
+def search_keys(user):
+    # return the normalized prefixes a user can be found by
+    keys = {normalize(user.email), normalize(user.username), normalize(user.first_name), normalize(user.last_name)}
+    keys.update(normalize(part) for part in user.username.split())
+    keys.add(normalize(f'{user.first_name} {user.last_name}'))
+    keys.discard('')
+    return {key[:KEY_MAX_LENGTH] for key in keys}
+
+
+def prefix_range(prefix):
+    # build the key__gte / key__lt range covering every key starting with prefix
+    return {'key__gte': prefix, 'key__lt': prefix + PREFIX_END}
+
+
+class UserSearchCache:
+    # small per-user LRU of recent search results so retyped prefixes skip the database
+
+    def __init__(self, per_user, max_users, ttl):
+        # remember the limits and keep one ordered dict of prefixes per user
+        self.per_user = per_user
+        self.max_users = max_users
+        self.ttl = ttl
+        self.users = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id, prefix):
+        # return a fresh cached result or None
+        with self.lock:
+            entries = self.users.get(user_id)
+            if entries is None or prefix not in entries:
+                return None
+            expires, results = entries[prefix]
+            if expires < time.monotonic():
+                del entries[prefix]
+                return None
+            entries.move_to_end(prefix)
+            self.users.move_to_end(user_id)
+            return results
+
+    def set(self, user_id, prefix, results):
+        # store a result and evict the least recently used prefixes and users
+        with self.lock:
+            entries = self.users.setdefault(user_id, OrderedDict())
+            entries[prefix] = (time.monotonic() + self.ttl, results)
+            entries.move_to_end(prefix)
+            self.users.move_to_end(user_id)
+            while len(entries) > self.per_user:
+                entries.popitem(last=False)
+            while len(self.users) > self.max_users:
+                self.users.popitem(last=False)
@@ -0,0 +1,18 @@
+# standard bib imports
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+# local imports
+from .models import UserSearchKey
+
+# user fields the search keys are built from
+SEARCH_FIELDS = {'email', 'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=User)
+def refresh_search_keys(sender, instance, update_fields=None, raw=False, **kwargs):
+    # rebuild the search keys unless the save only touched unrelated fields (last_login, password)
+    if raw or (update_fields is not None and not SEARCH_FIELDS & set(update_fields)):
+        return
+    UserSearchKey.refresh_for(instance)
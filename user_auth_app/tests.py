@@ -1,3 +1,191 @@
-from django.test import TestCase
+# standard bib imports
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.contrib.auth.hashers import get_hashers, PBKDF2PasswordHasher
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+# third party imports
+from rest_framework.authtoken.models import Token
+
+# local imports
+from kanmind_app.models import BoardMember
+from kanmind_app.tests import KanmindTestCase, KanmindTransactionTestCase
+from user_auth_app.hashing import pool, HashQueueFull
+from user_auth_app.models import UserSearchKey
+from user_auth_app.search import search_keys, KEY_MAX_LENGTH
+
+# the password hasher policy of the rehash tests (few iterations keep them fast)
+POLICY_HASHERS = ['user_auth_app.hashers.PolicyPBKDF2PasswordHasher']
+
+
+class AsyncAuthTests(KanmindTestCase):
+
+    def register(self, email, password='secret-pass'):
+        # post a registration to the async endpoint
+        data = {'fullname': 'New User', 'email': email, 'password': password, 'repeated_password': password}
+        return self.client.post('/api/async/registration/', data, format='json')
+
+    def test_registration(self):
+        response = self.register('new@example.com')
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(email='new@example.com')
+        self.assertEqual(response.json()['token'], user.auth_token.key)
+        self.assertTrue(user.check_password('secret-pass'))
+
+    def test_taken_email_is_rejected_before_hashing(self):
+        self.make_user('taken')
+        with mock.patch.object(pool, 'submit', wraps=pool.submit) as submit:
+            response = self.register('taken@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': ['This email address already exists.']})
+        submit.assert_not_called()
+
+    def test_full_hash_queue_answers_busy(self):
+        user = User.objects.create_user(username='user', email='user@example.com', password='secret-pass')
+        with mock.patch.object(pool, 'submit', side_effect=HashQueueFull):
+            responses = [
+                self.client.post('/api/async/login/', {'email': user.email, 'password': 'secret-pass'}, format='json'),
+                self.register('new@example.com'),
+            ]
+        for response in responses:
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+            self.assertEqual(response.json(), {'error': 'Server is busy, please retry later.'})
+        self.assertFalse(User.objects.filter(email='new@example.com').exists())
+
+    def test_wrong_password(self):
+        User.objects.create_user(username='user', email='user@example.com', password='secret-pass')
+        response = self.client.post('/api/async/login/', {'email': 'user@example.com', 'password': 'wrong'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'non_field_errors': ['Invalid email or password.']})
+
+
+class PasswordRehashTests(KanmindTransactionTestCase):
+    # check_password saves the new hash from a hashing thread, so the rows have to be committed
+
+    def login(self, password):
+        # post credentials to the async login
+        return self.client.post('/api/async/login/', {'email': 'user@example.com', 'password': password}, format='json')
+
+    def test_login_rehashes_with_the_current_iterations(self):
+        with override_settings(PASSWORD_HASHERS=POLICY_HASHERS, PASSWORD_HASH_ITERATIONS=1000):
+            user = User.objects.create_user(username='user', email='user@example.com', password='secret-pass')
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+        with override_settings(PASSWORD_HASHERS=POLICY_HASHERS, PASSWORD_HASH_ITERATIONS=2000):
+            response = self.login('secret-pass')
+            self.assertEqual(response.status_code, 200)
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith('pbkdf2_sha256$2000$'))
+            self.assertTrue(user.check_password('secret-pass'))
+
+    def test_failed_login_keeps_the_old_hash(self):
+        with override_settings(PASSWORD_HASHERS=POLICY_HASHERS, PASSWORD_HASH_ITERATIONS=1000):
+            user = User.objects.create_user(username='user', email='user@example.com', password='secret-pass')
+        with override_settings(PASSWORD_HASHERS=POLICY_HASHERS, PASSWORD_HASH_ITERATIONS=2000):
+            self.assertEqual(self.login('wrong').status_code, 400)
+        old_hash = user.password
+        user.refresh_from_db()
+        self.assertEqual(user.password, old_hash)
+
+
+class PasswordHasherSettingsTests(SimpleTestCase):
+
+    def test_every_configured_hasher_can_hash(self):
+        # a hasher whose library is missing would only fail when a user with such a hash logs in
+        for hasher in get_hashers():
+            options = {'iterations': 1} if isinstance(hasher, PBKDF2PasswordHasher) else {}
+            encoded = hasher.encode('secret-pass', hasher.salt(), **options)
+            self.assertTrue(hasher.verify('secret-pass', encoded), hasher.algorithm)
+
+
+class UserSearchTests(KanmindTestCase):
+
+    def test_keys_fit_the_key_column(self):
+        user = User.objects.create_user(username='long', email='long@example.com', first_name='a' * 150, last_name='b' * 150)
+        self.assertEqual(len(f'{user.first_name} {user.last_name}'), 301)
+        self.assertEqual(max(len(key) for key in search_keys(user)), KEY_MAX_LENGTH)
+        self.assertEqual(set(UserSearchKey.objects.filter(user=user).values_list('key', flat=True)), search_keys(user))
+
+    def test_long_prefixes_find_cut_keys(self):
+        user = User.objects.create_user(username='long', email='long@example.com', first_name='a' * 150, last_name='b' * 150)
+        searcher = self.make_user('searcher')
+        response = self.client_for(searcher).get('/api/users/search/', {'q': f'{"a" * 150} {"b" * 130}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['id'] for item in response.data], [user.id])
+
+
+class ImportUsersTests(KanmindTestCase):
+
+    def setUp(self):
+        # two boards to join
+        super().setUp()
+        self.owner = self.make_user('owner')
+        self.boards = [self.make_board(self.owner) for _ in range(2)]
+
+    def run_import(self, content, *args):
+        # import a csv file and return stdout and stderr
+        out, err = StringIO(), StringIO()
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as handle:
+            handle.write(content)
+            handle.flush()
+            call_command('import_users', handle.name, '--workers', '1', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_users_get_tokens_and_search_keys(self):
+        out, err = self.run_import(
+            'fullname,email,password\n'
+            'Ada Lovelace,ada@example.com,secret-pass\n'
+            'Alan Turing,alan@example.com,secret-pass\n'
+        )
+        self.assertIn('2 user(s) created, 0 row(s) failed', out)
+        self.assertEqual(err, '')
+        for email in ('ada@example.com', 'alan@example.com'):
+            user = User.objects.get(email=email)
+            self.assertTrue(user.check_password('secret-pass'))
+            self.assertEqual(len(Token.objects.get(user=user).key), 40)
+            self.assertEqual(set(UserSearchKey.objects.filter(user=user).values_list('key', flat=True)), search_keys(user))
+        self.assertEqual(User.objects.get(email='ada@example.com').last_name, 'Lovelace')
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        out, err = self.run_import(
+            'fullname,email,password,boards\n'
+            'Good User,good@example.com,secret-pass,\n'
+            'No Password,nopass@example.com,,\n'
+            'Bad Email,not-an-email,secret-pass,\n'
+            'Twice,GOOD@example.com,secret-pass,\n'
+            'Existing,OWNER@Example.com,secret-pass,\n'
+            'Bad Boards,boards@example.com,secret-pass,first;second\n'
+        )
+        self.assertIn('1 user(s) created, 5 row(s) failed', out)
+        self.assertEqual(err.splitlines(), [
+            'line 3: fullname and password are required.',
+            "line 4: invalid email 'not-an-email'.",
+            'line 5: GOOD@example.com appears twice in the file.',
+            'line 7: boards must be board ids separated by ;.',
+            'line 6: OWNER@Example.com already exists.',
+        ])
+        self.assertEqual(list(User.objects.exclude(id=self.owner.id).values_list('email', flat=True)), ['good@example.com'])
+
+    def test_memberships_are_inserted_in_batches(self):
+        first, second = self.boards
+        with CaptureQueriesContext(connection) as queries:
+            out, err = self.run_import(
+                'fullname,email,password,boards\n'
+                f'User One,one@example.com,secret-pass,{second.id}\n'
+                'User Two,two@example.com,secret-pass,\n'
+                'User Three,three@example.com,secret-pass,999\n',
+                '--board', str(first.id)
+            )
+        self.assertIn('3 user(s) created, 0 row(s) failed', out)
+        self.assertEqual(err, 'line 4: unknown board 999 skipped.\n')
+        self.assertEqual(
+            set(BoardMember.objects.values_list('user__email', 'board_id')),
+            {('one@example.com', first.id), ('one@example.com', second.id), ('two@example.com', first.id), ('three@example.com', first.id)}
+        )
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT') and 'INTO "board_members"' in query['sql']]
+        self.assertEqual(len(inserts), 1)